@@ -0,0 +1,44 @@
+import http
+from aiohttp import web
+import src.utils.routedecos
+import src.utils.apitokens
+from src.exceptions import GenericErrorException
+
+
+@src.utils.routedecos.bearer_auth
+async def post(
+        _r: web.Request,
+        token: str = "",
+        **_kwargs,
+):
+    """
+    ---
+    description: |
+      Exchanges a Discord token for a short-lived API token, which can be used as
+      a Bearer token in its place and is verified without contacting Discord.
+      Request a new one with the Discord token once it expires.
+    tags:
+    - Authentication
+    responses:
+      "200":
+        description: Returns the API token.
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                token:
+                  type: string
+                  description: The API token.
+                expires_on:
+                  type: integer
+                  description: Timestamp of when the token expires.
+      "401":
+        description: "`discord_token` is missing or invalid."
+    """
+    if src.utils.apitokens.is_api_token(token):
+        raise GenericErrorException("Must use a Discord token", status_code=http.HTTPStatus.UNAUTHORIZED)
+
+    discord_profile = await src.utils.routedecos.get_discord_profile(token)
+    api_token, expires_on = src.utils.apitokens.issue_token(discord_profile)
+    return web.json_response({"token": api_token, "expires_on": expires_on})
@@ -0,0 +1,79 @@
+import http
+from aiohttp import web
+import src.changes
+from src.db.queries.changes import get_change_events
+
+EVENTS_LIMIT = 100
+TIMEOUT_DEFAULT = 25
+TIMEOUT_MAX = 60
+
+
+async def get(request: web.Request) -> web.Response:
+    """
+    ---
+    description: |
+      Returns the edits made to maps, completions, config variables and users after an event.
+      If there are none yet, waits up to `timeout` seconds for one to happen before returning,
+      so it can be polled in a loop to stay in sync.
+    tags:
+    - Changes
+    parameters:
+    - in: query
+      name: since
+      required: false
+      schema:
+        type: integer
+      description: |
+        Only return events after this one. Pass the `next` value of the previous response.
+        Defaults to `0`, returning every event from the first one.
+    - in: query
+      name: timeout
+      required: false
+      schema:
+        type: integer
+      description: |
+        How many seconds to wait for a new event, if there are none. Defaults to `25`,
+        can't be higher than `60`. Use `0` to return immediately.
+    responses:
+      "200":
+        description: |
+          Returns at most 100 events, sorted by ID. If there are more, `next` can be used to get them
+          right away.
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                events:
+                  type: array
+                  items:
+                    $ref: "#/components/schemas/ChangeEvent"
+                next:
+                  type: integer
+                  description: The ID of the last event returned, or `since` if there are none.
+      "400":
+        description: Invalid request, the error will be specified in the `errors` key.
+    """
+    try:
+        since = int(request.query.get("since", "0"))
+        if since < 0:
+            raise ValueError
+    except ValueError:
+        return web.json_response(
+            {"errors": {"since": "Must be a non-negative event ID"}},
+            status=http.HTTPStatus.BAD_REQUEST,
+        )
+
+    try:
+        timeout = min(TIMEOUT_MAX, max(0, int(request.query.get("timeout", str(TIMEOUT_DEFAULT)))))
+    except ValueError:
+        timeout = TIMEOUT_DEFAULT
+
+    events = await get_change_events(since, EVENTS_LIMIT)
+    if not len(events) and timeout and await src.changes.wait_for_change(since, timeout):
+        events = await get_change_events(since, EVENTS_LIMIT)
+
+    return web.json_response({
+        "events": [event.to_dict() for event in events],
+        "next": events[-1].id if len(events) else since,
+    })
@@ -1,6 +1,10 @@
 from aiohttp import web
 from src.db.queries.completions import get_recent
 
+
+cache_ttl = 60
+cache_tags = ["completion", "map"]
+
 AMOUNT = 5
 
 
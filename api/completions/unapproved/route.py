@@ -1,6 +1,7 @@
 import math
 from aiohttp import web
 from src.db.queries.completions import get_unapproved_completions
+from src.utils.cursors import encode_cursor, decode_cursor
 
 
 PAGE_ENTRIES = 50
@@ -21,6 +22,12 @@ async def get(request: web.Request) -> web.Response:
       schema:
         type: integer
       description: Pagination. Defaults to `1`.
+    - in: query
+      name: after
+      required: false
+      schema:
+        type: string
+      description: The `next` cursor of the previous page. Takes precedence over `page`.
     responses:
       "200":
         description: Returns an array of `ListCompletionWithMeta`.
@@ -35,6 +42,10 @@ async def get(request: web.Request) -> web.Response:
                 pages:
                   type: integer
                   description: The total number of pages.
+                next:
+                  type: string
+                  nullable: true
+                  description: Cursor to pass as `after` to get the next page.
                 completions:
                   type: array
                   description: The unapproved completions.
@@ -47,12 +58,23 @@ async def get(request: web.Request) -> web.Response:
     else:
         page = max(1, int(page))
 
+    after = None
+    if "after" in request.query:
+        after = decode_cursor(request.query["after"], str, int)
+
     completions, count = await get_unapproved_completions(
         idx_start=(page-1)*PAGE_ENTRIES,
         amount=PAGE_ENTRIES,
+        after=after,
     )
+
+    next_cursor = None
+    if len(completions) == PAGE_ENTRIES:
+        next_cursor = encode_cursor(completions[-1].map.code, completions[-1].id)
+
     return web.json_response({
         "total": count,
         "pages": math.ceil(count/PAGE_ENTRIES),
+        "next": next_cursor,
         "completions": [cmp.to_dict() for cmp in completions],
     })
@@ -1,4 +1,3 @@
-import asyncio
 from aiohttp import web
 from src.db.queries.completions import get_completion
 import http
@@ -36,9 +35,6 @@ async def put(
     if int(profile["id"]) in [x if isinstance(x, int) else x.id for x in resource.user_ids]:
         raise GenericErrorException("Cannot edit or accept your own completion", status_code=http.HTTPStatus.FORBIDDEN)
 
-    await accept_completion(resource.id, int(profile["id"]))
-    asyncio.create_task(update_run_webhook(resource))
-
     dict_res = {
         "accept": True,
         "black_border": resource.black_border,
@@ -52,5 +48,7 @@ async def put(
         },
         "format": resource.format,
     }
-    asyncio.create_task(src.log.log_action("completion", "post", resource.id, dict_res, profile["id"]))
+    async with src.log.logged_edit("completion", "post", resource.id, dict_res, profile["id"]) as conn:
+        await accept_completion(resource.id, int(profile["id"]), conn=conn)
+    await update_run_webhook(resource)
     return web.Response(status=http.HTTPStatus.NO_CONTENT)
@@ -1,4 +1,3 @@
-import asyncio
 from aiohttp import web
 from src.db.queries.completions import get_completion
 import http
@@ -78,15 +77,16 @@ async def put(
     if isinstance(data, web.Response):
         return data
 
-    await edit_completion(
-        resource.id,
-        data["black_border"],
-        data["no_geraldo"],
-        data["format"],
-        data["lcc"],
-        [int(uid) for uid in data["user_ids"]],
-        accept=int(discord_profile["id"]),
-    )
-    asyncio.create_task(update_run_webhook(resource))
-    asyncio.create_task(src.log.log_action("completion", "post", resource.id, data, discord_profile["id"]))
+    async with src.log.logged_edit("completion", "post", resource.id, data, discord_profile["id"]) as conn:
+        await edit_completion(
+            resource.id,
+            data["black_border"],
+            data["no_geraldo"],
+            data["format"],
+            data["lcc"],
+            [int(uid) for uid in data["user_ids"]],
+            accept=int(discord_profile["id"]),
+            conn=conn,
+        )
+    await update_run_webhook(resource)
     return web.Response(status=http.HTTPStatus.NO_CONTENT)
@@ -1,4 +1,3 @@
-import asyncio
 from aiohttp import web
 from src.db.queries.completions import get_completion
 import http
@@ -35,8 +34,7 @@ async def delete(
         return err_resp
 
     profile = json_data["user"]
-    await delete_completion(resource.id, hard_delete=False)
-    asyncio.create_task(update_run_webhook(resource, fail=True))
-
-    asyncio.create_task(src.log.log_action("completion", "delete", resource.id, None, profile["id"]))
+    async with src.log.logged_edit("completion", "delete", resource.id, None, profile["id"]) as conn:
+        await delete_completion(resource.id, hard_delete=False, conn=conn)
+    await update_run_webhook(resource, fail=True)
     return web.Response(status=http.HTTPStatus.NO_CONTENT)
@@ -1,5 +1,4 @@
 from aiohttp import web
-import asyncio
 import http
 from src.db.queries.completions import get_completion, edit_completion, delete_completion
 from src.utils.validators import validate_completion
@@ -98,15 +97,16 @@ async def put(
     if isinstance(data, web.Response):
         return data
 
-    await edit_completion(
-        resource.id,
-        data["black_border"],
-        data["no_geraldo"],
-        data["format"],
-        data["lcc"],
-        [int(uid) for uid in data["user_ids"]],
-    )
-    asyncio.create_task(src.log.log_action("completion", "put", resource.id, data, discord_profile["id"]))
+    async with src.log.logged_edit("completion", "put", resource.id, data, discord_profile["id"]) as conn:
+        await edit_completion(
+            resource.id,
+            data["black_border"],
+            data["no_geraldo"],
+            data["format"],
+            data["lcc"],
+            [int(uid) for uid in data["user_ids"]],
+            conn=conn,
+        )
     return web.Response(status=http.HTTPStatus.NO_CONTENT)
 
 
@@ -150,10 +150,9 @@ async def delete(
         )
 
     if not resource.deleted_on:
-        reject = resource.accepted_by is None
-        if reject:
-            asyncio.create_task(update_run_webhook(resource, fail=True))
-        await delete_completion(resource.id, hard_delete=False)
-        asyncio.create_task(src.log.log_action("completion", "delete", resource.id, None, discord_profile["id"]))
+        async with src.log.logged_edit("completion", "delete", resource.id, None, discord_profile["id"]) as conn:
+            await delete_completion(resource.id, hard_delete=False, conn=conn)
+        if resource.accepted_by is None:
+            await update_run_webhook(resource, fail=True)
 
     return web.Response(status=http.HTTPStatus.NO_CONTENT)
@@ -1,12 +1,16 @@
-import asyncio
 from aiohttp import web
 from src.utils.misc import index_where
 from src.db.queries.misc import get_config, update_config
 import src.utils.routedecos
 import src.log
+from src.utils.formats.formatinfo import get_points_table
 from src.exceptions import MissingPermsException
 
 
+cache_ttl = 300
+cache_tags = ["config"]
+
+
 async def get(_r: web.Request):
     """
     ---
@@ -112,6 +116,7 @@ async def put(
     if len(formats_change) == 0:
         raise MissingPermsException("edit:config")
 
-    changed_vars = await update_config(json_body["config"], formats_change)
-    asyncio.create_task(src.log.log_action("config", "put", None, json_body["config"], discord_profile["id"]))
+    async with src.log.logged_edit("config", "put", None, json_body["config"], discord_profile["id"]) as conn:
+        changed_vars = await update_config(json_body["config"], formats_change, conn=conn)
+    get_points_table.invalidate()
     return web.json_response({"errors": {}, "data": changed_vars})
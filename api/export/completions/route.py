@@ -0,0 +1,45 @@
+from aiohttp import web
+from src.db.queries.exports import stream_completions
+from src.utils.streaming import get_export_params, stream_rows
+
+
+async def get(request: web.Request) -> web.StreamResponse:
+    """
+    ---
+    description: |
+      Exports every accepted completion, one per line. Array fields are separated by `;`
+      in CSV exports, and timestamps are in seconds.
+    tags:
+    - Completions
+    parameters:
+    - in: query
+      name: output
+      required: false
+      schema:
+        type: string
+        enum: [ndjson, csv]
+      description: The format of the export. Defaults to `ndjson`.
+    - in: query
+      name: since
+      required: false
+      schema:
+        type: integer
+      description: |
+        Only export completions submitted, edited or deleted after this timestamp, in seconds.
+        Deleted completions are only exported when this is set.
+    responses:
+      "200":
+        description: |
+          Streams the completions, ordered by ID. Each has the keys `id`, `map`, `format`,
+          `black_border`, `no_geraldo`, `lcc_leftover`, `users`, `subm_proof_img`,
+          `subm_proof_vid`, `submitted_on`, `updated_on` and `deleted_on`.
+        content:
+          application/x-ndjson: {}
+          text/csv: {}
+      "400":
+        description: Invalid request, the error will be specified in the `errors` key.
+      "503":
+        description: Too many exports are in progress.
+    """
+    output, since = get_export_params(request)
+    return await stream_rows(request, stream_completions(since), output, "completions")
@@ -0,0 +1,37 @@
+from aiohttp import web
+from src.db.queries.exports import stream_leaderboards
+from src.exceptions import ValidationException
+from src.utils.streaming import get_export_params, stream_rows
+
+
+async def get(request: web.Request) -> web.StreamResponse:
+    """
+    ---
+    description: Exports every entry of every leaderboard, one per line.
+    tags:
+    - Completions
+    parameters:
+    - in: query
+      name: output
+      required: false
+      schema:
+        type: string
+        enum: [ndjson, csv]
+      description: The format of the export. Defaults to `ndjson`.
+    responses:
+      "200":
+        description: |
+          Streams the entries, ordered by leaderboard and placement. Each has the keys
+          `lb_format`, `lb_type`, `placement`, `user_id`, `name` and `score`.
+        content:
+          application/x-ndjson: {}
+          text/csv: {}
+      "400":
+        description: Invalid request, the error will be specified in the `errors` key.
+      "503":
+        description: Too many exports are in progress.
+    """
+    output, since = get_export_params(request)
+    if since is not None:
+        raise ValidationException({"since": "Leaderboards can only be exported whole"})
+    return await stream_rows(request, stream_leaderboards(), output, "leaderboard")
@@ -0,0 +1,43 @@
+from aiohttp import web
+from src.db.queries.exports import stream_maps
+from src.utils.streaming import get_export_params, stream_rows
+
+
+async def get(request: web.Request) -> web.StreamResponse:
+    """
+    ---
+    description: |
+      Exports every map with its current metadata, one per line, including deleted ones.
+      Timestamps are in seconds.
+    tags:
+    - Maps
+    parameters:
+    - in: query
+      name: output
+      required: false
+      schema:
+        type: string
+        enum: [ndjson, csv]
+      description: The format of the export. Defaults to `ndjson`.
+    - in: query
+      name: since
+      required: false
+      schema:
+        type: integer
+      description: Only export maps edited after this timestamp, in seconds.
+    responses:
+      "200":
+        description: |
+          Streams the maps, ordered by code. Each has the keys `code`, `name`, `placement_curver`,
+          `placement_allver`, `difficulty`, `botb_difficulty`, `remake_of`, `optimal_heros`,
+          `r6_start`, `map_data`, `map_preview_url`, `deleted_on` and `updated_on`.
+        content:
+          application/x-ndjson: {}
+          text/csv: {}
+      "400":
+        description: Invalid request, the error will be specified in the `errors` key.
+      "503":
+        description: Too many exports are in progress.
+    """
+    output, since = get_export_params(request)
+    return await stream_rows(request, stream_maps(since), output, "maps")
@@ -2,6 +2,10 @@ from aiohttp import web
 from src.db.queries.format import get_formats
 
 
+cache_ttl = 300
+cache_tags = ["format"]
+
+
 async def get(
         _r: web.Request,
 ) -> web.Response:
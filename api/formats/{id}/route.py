@@ -1,5 +1,6 @@
 import http
 import src.utils.routedecos
+import src.utils.responsecache
 from aiohttp import web
 from src.db.queries.format import get_format, edit_format
 from src.utils.validators import validate_format
@@ -143,5 +144,6 @@ async def put(
         json_data["map_submission_wh"],
         json_data["run_submission_wh"],
     )
+    src.utils.responsecache.invalidate("format")
 
     return web.Response(status=http.HTTPStatus.NO_CONTENT)
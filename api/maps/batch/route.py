@@ -0,0 +1,52 @@
+import http
+from aiohttp import web
+from src.db.queries.maps import get_maps
+
+MAX_BATCH_SIZE = 50
+
+cache_ttl = 300
+cache_tags = ["map", "completion", "config"]
+
+
+async def get(request: web.Request) -> web.Response:
+    """
+    ---
+    description: |
+      Returns the data of several maps at once. Maps that don't exist are left out,
+      and the rest are in the same order as `codes`.
+    tags:
+    - Maps
+    parameters:
+    - in: query
+      name: codes
+      required: true
+      schema:
+        type: array
+        items:
+          type: string
+      description: The codes of the maps, comma-separated. At most 50.
+    responses:
+      "200":
+        content:
+          application/json:
+            schema:
+              type: array
+              items:
+                $ref: "#/components/schemas/Map"
+      "400":
+        description: Invalid request, the error will be specified in the `errors` key.
+    """
+    codes = list(dict.fromkeys(code for code in request.query.get("codes", "").split(",") if len(code)))
+    if not len(codes):
+        return web.json_response(
+            {"errors": {"codes": "Missing map codes"}},
+            status=http.HTTPStatus.BAD_REQUEST,
+        )
+    if len(codes) > MAX_BATCH_SIZE:
+        return web.json_response(
+            {"errors": {"codes": f"Can't get more than {MAX_BATCH_SIZE} maps at once"}},
+            status=http.HTTPStatus.BAD_REQUEST,
+        )
+
+    maps = await get_maps(codes)
+    return web.json_response([m.to_dict() for m in maps])
@@ -5,8 +5,12 @@ from src.db.queries.leaderboard import get_leaderboard
 from src.db.queries.subqueries import LeaderboardType
 from typing import get_args
 from src.utils.misc import MAPLIST_FORMATS
+from src.utils.cursors import encode_cursor, decode_cursor
 
 
+cache_ttl = 60
+cache_tags = ["map", "completion", "config"]
+
 PAGE_ENTRIES = 50
 
 
@@ -23,6 +27,12 @@ async def get(request: web.Request):
       schema:
         type: integer
       description: Pagination. Defaults to `1`.
+    - in: query
+      name: after
+      required: false
+      schema:
+        type: string
+      description: The `next` cursor of the previous page. Takes precedence over `page`.
     - in: query
       name: format
       required: false
@@ -50,6 +60,10 @@ async def get(request: web.Request):
                 pages:
                   type: integer
                   description: The total number of pages.
+                next:
+                  type: string
+                  nullable: true
+                  description: Cursor to pass as `after` to get the next page.
                 entries:
                   type: array
                   items:
@@ -82,16 +96,26 @@ async def get(request: web.Request):
         )
     page = max(1, int(request.query.get("page", "1")))
 
+    after = None
+    if "after" in request.query:
+        after = decode_cursor(request.query["after"], int, int)
+
     lb, total = await get_leaderboard(
         format=ml_format,
         amount=PAGE_ENTRIES,
         idx_start=PAGE_ENTRIES * (page-1),
         type=value,
+        after=after,
     )
     pages = math.ceil(total/PAGE_ENTRIES)
 
+    next_cursor = None
+    if len(lb) == PAGE_ENTRIES:
+        next_cursor = encode_cursor(lb[-1].position, lb[-1].user.id)
+
     return web.json_response({
         "total": total,
         "pages": pages,
+        "next": next_cursor,
         "entries": [entry.to_dict() for entry in lb],
     })
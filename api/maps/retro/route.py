@@ -2,6 +2,10 @@ from aiohttp import web
 from src.db.queries.maps import get_retro_maps
 
 
+cache_ttl = 300
+cache_tags = ["map"]
+
+
 async def get(_r: web.Request) -> web.Response:
     """
     ---
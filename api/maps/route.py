@@ -1,4 +1,3 @@
-import asyncio
 import src.utils.routedecos
 import http
 import src.http
@@ -12,6 +11,10 @@ from src.utils.formats.formatinfo import format_info
 from src.exceptions import MissingPermsException
 
 
+cache_ttl = 300
+cache_tags = ["map", "config", "format"]
+
+
 async def get(request: web.Request):
     """
     ---
@@ -129,7 +132,7 @@ async def post(
     if len(missing_perms_on):
         raise MissingPermsException("create:map", missing_perms_on)
 
-    await add_map(json_body)
-    asyncio.create_task(map_change_update_map_submission_wh(json_body["code"], json_body))
-    asyncio.create_task(src.log.log_action("map", "post", None, json_body, discord_profile["id"]))
+    async with src.log.logged_edit("map", "post", None, json_body, discord_profile["id"]) as conn:
+        await add_map(json_body, conn=conn)
+    await map_change_update_map_submission_wh(json_body["code"], json_body)
     return web.Response(status=http.HTTPStatus.CREATED)
@@ -1,4 +1,3 @@
-import asyncio
 import http
 from aiohttp import web
 import src.utils.routedecos
@@ -7,7 +6,7 @@ from src.requests import ninja_kiwi_api
 from config import MEDIA_BASE_URL
 from src.utils.embeds import get_mapsubm_embed, send_map_submission_wh, update_map_submission_wh
 from src.db.queries.mapsubmissions import add_map_submission, get_map_submissions_by_message, reject_submission
-from src.utils.files import save_image
+from src.utils.files import save_spooled, SpooledFile
 from src.exceptions import ValidationException, MissingPermsException, GenericErrorException
 
 
@@ -17,7 +16,7 @@ async def post(
         _r: web.Request,
         json_data: dict = None,
         permissions: "src.db.models.Permissions" = None,
-        files: list[tuple[str, bytes] | None] = None,
+        files: list[SpooledFile | None] = None,
         **_kwargs,
 ) -> web.Response:
     if not permissions.has_in_any("create:map_submission"):
@@ -32,7 +31,7 @@ async def post(
 
     proof_fname = None
     if files[0]:
-        proof_fname, _fp = await save_image(files[0][1], files[0][0].split(".")[-1])
+        proof_fname, _fp = await save_spooled(files[0])
         embeds[0]["image"] = {"url": f"{MEDIA_BASE_URL}/{proof_fname}"}
     wh_data = {"embeds": embeds}
 
@@ -47,9 +46,7 @@ async def post(
         edit=(prev_submission is not None),
     )
 
-    asyncio.create_task(
-        send_map_submission_wh(prev_submission, json_data["format"], submission_id, wh_data)
-    )
+    await send_map_submission_wh(prev_submission, json_data["format"], submission_id, wh_data)
     return web.Response(status=http.HTTPStatus.CREATED)
 
 
@@ -76,5 +73,5 @@ async def delete(
         raise MissingPermsException("delete:map_submission", resource.format_id)
 
     await reject_submission(resource.code, resource.format_id, json_data["user"]["id"])
-    asyncio.create_task(update_map_submission_wh(resource, fail=True))
+    await update_map_submission_wh(resource, fail=True)
     return web.Response(status=http.HTTPStatus.NO_CONTENT)
@@ -1,9 +1,9 @@
-import asyncio
 import math
+from datetime import datetime
 import http
 import aiohttp.hdrs
 from aiohttp import web
-from src.utils.files import save_image
+from src.utils.files import spool_part, save_spooled
 import src.utils.routedecos
 from src.utils.validators import validate_map_submission, check_prev_map_submission
 from src.requests import ninja_kiwi_api
@@ -18,6 +18,7 @@ from src.db.queries.mapsubmissions import (
 )
 from src.utils.formats.formatinfo import format_info
 from src.exceptions import MissingPermsException, ValidationException, GenericErrorException
+from src.utils.cursors import encode_cursor, decode_cursor
 
 PAGE_ENTRIES = 50
 
@@ -91,8 +92,7 @@ async def post(
         while part := await reader.next():
             if part.name == "proof_completion":
                 proof_ext = part.headers[aiohttp.hdrs.CONTENT_TYPE].split("/")[-1]
-                file_contents = await part.read(decode=False)
-                proof_fname, _fpath = await save_image(file_contents, proof_ext)
+                proof_fname, _fpath = await save_spooled(await spool_part(part, proof_ext))
             elif part.name == "data":
                 data = await part.json()
     elif request.content_type == "application/json":
@@ -132,9 +132,7 @@ async def post(
         edit=(prev_submission is not None),
     )
 
-    asyncio.create_task(
-        send_map_submission_wh(prev_submission, data["format"], submission_id, wh_data)
-    )
+    await send_map_submission_wh(prev_submission, data["format"], submission_id, wh_data)
     return web.Response(status=http.HTTPStatus.NO_CONTENT if prev_submission is not None else http.HTTPStatus.CREATED)
 
 
@@ -151,6 +149,12 @@ async def get(request: web.Request) -> web.Response:
       schema:
         type: integer
       description: Pagination. Defaults to `1`.
+    - in: query
+      name: after
+      required: false
+      schema:
+        type: string
+      description: The `next` cursor of the previous page. Takes precedence over `page`.
     - in: query
       name: pending
       required: false
@@ -174,6 +178,10 @@ async def get(request: web.Request) -> web.Response:
                 pages:
                   type: integer
                   description: The total number of pages.
+                next:
+                  type: string
+                  nullable: true
+                  description: Cursor to pass as `after` to get the next page.
                 submissions:
                   type: array
                   items:
@@ -186,13 +194,24 @@ async def get(request: web.Request) -> web.Response:
     if show not in ["pending", "all"]:
         show = "pending"
 
+    after = None
+    if "after" in request.query:
+        after = decode_cursor(request.query["after"], datetime.fromisoformat, int)
+
     total, submissions = await get_map_submissions(
         omit_rejected=(show == "pending"),
         idx_start=PAGE_ENTRIES * (page - 1),
         amount=PAGE_ENTRIES,
+        after=after,
     )
+
+    next_cursor = None
+    if len(submissions) == PAGE_ENTRIES:
+        next_cursor = encode_cursor(submissions[-1].created_on.isoformat(), submissions[-1].id)
+
     return web.json_response({
         "total": total,
         "pages": math.ceil(total/PAGE_ENTRIES),
+        "next": next_cursor,
         "submissions": [sub.to_dict() for sub in submissions],
     })
@@ -1,4 +1,3 @@
-import asyncio
 from aiohttp import web
 import http
 import src.log
@@ -56,5 +55,5 @@ async def delete(
         raise ValidationException({"format_id": "Must be numeric"})
 
     await reject_submission(code, format_id, discord_profile["id"])
-    asyncio.create_task(update_map_submission_wh(resource, fail=True))
+    await update_map_submission_wh(resource, fail=True)
     return web.Response(status=http.HTTPStatus.NO_CONTENT)
@@ -1,4 +1,3 @@
-import asyncio
 from aiohttp import web
 import math
 import http
@@ -157,17 +156,18 @@ async def post(
     if isinstance(data, web.Response):
         return data
 
-    comp_id = await add_completion(
-        resource.code,
-        data["black_border"],
-        data["no_geraldo"],
-        data["format"],
-        data["lcc"],
-        [int(uid) for uid in data["user_ids"]],
-        int(discord_profile["id"]),
-        subm_proof=data["subm_proof"],
-    )
-    asyncio.create_task(src.log.log_action("completion", "post", resource.id, data, discord_profile["id"]))
+    async with src.log.logged_edit("completion", "post", resource.id, data, discord_profile["id"]) as conn:
+        comp_id = await add_completion(
+            resource.code,
+            data["black_border"],
+            data["no_geraldo"],
+            data["format"],
+            data["lcc"],
+            [int(uid) for uid in data["user_ids"]],
+            int(discord_profile["id"]),
+            subm_proof=data["subm_proof"],
+            conn=conn,
+        )
 
     return web.json_response(
         data["user_ids"],
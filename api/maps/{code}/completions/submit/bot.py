@@ -1,10 +1,9 @@
 import http
-from aiohttp import web, FormData
+from aiohttp import web
 import asyncio
-import json
 import src.http
 import src.utils.routedecos
-from src.utils.files import save_image
+from src.utils.files import save_spooled, SpooledFile
 from src.utils.validators import validate_completion_submission
 from src.utils.formats.formatinfo import format_info
 from src.db.queries.maps import get_map
@@ -22,7 +21,7 @@ compl_files = [f"proof_completion[{n}]" for n in range(MAX_FILES)]
 @src.utils.routedecos.validate_resource_exists(get_map, "code", partial=True)
 async def post(
         _r: web.Request,
-        files: list[tuple[str, bytes] | None] = None,
+        files: list[SpooledFile | None] = None,
         json_data: dict = None,
         resource: "src.db.models.PartialMap" = None,
         permissions: "src.db.models.Permissions" = None,
@@ -39,7 +38,6 @@ async def post(
         raise ValidationException({"format": "That map does not accept completions for that format"})
 
     if not permissions.has_in_any("create:completion_submission"):
-        # TODO Remove images inserted in this request
         raise MissingPermsException("create:completion_submission")
     elif permissions.has("require:completion_submission:recording", json_data["format"]) \
             and len(json_data["video_proof_url"]) == 0:
@@ -47,7 +45,7 @@ async def post(
 
     discord_profile = json_data["user"]
     proofs_finfo = await asyncio.gather(*[
-        save_image(file[1], file[0].split(".")[-1])
+        save_spooled(file)
         for file in files
         if file is not None
     ])
@@ -82,15 +80,7 @@ async def post(
             "image": {"url": proof_urls[i]},
         })
 
-    msg_data = {"embeds": embeds}
-
-    form_data = FormData()
-    payload_json = json.dumps(msg_data)
-    form_data.add_field("payload_json", payload_json)
-
-    asyncio.create_task(
-        send_run_webhook(run_id, json_data["format"], form_data, payload_json)
-    )
+    await send_run_webhook(run_id, json_data["format"], {"embeds": embeds})
 
     return web.Response(
         status=http.HTTPStatus.CREATED,
@@ -1,12 +1,11 @@
-import asyncio
 import http
+import asyncio
 import aiohttp.hdrs
-from aiohttp import web, FormData
-import json
+from aiohttp import web
 import src.http
 from http import HTTPStatus
 import src.utils.routedecos
-from src.utils.files import save_image
+from src.utils.files import spool_part, save_spooled
 from src.utils.validators import validate_completion_submission
 from src.db.queries.maps import get_map
 from src.db.queries.completions import submit_run
@@ -105,7 +104,7 @@ async def post(
     embeds = []
     hook_url = ""
     data = None
-    proof_fnames: list[str] = []
+    proof_saves: list[asyncio.Task] = []
 
     if not request.content_type.startswith("multipart/"):
         return web.json_response(
@@ -115,11 +114,11 @@ async def post(
 
     reader = await request.multipart()
     while part := await reader.next():
-        if part.name == "proof_completion" and len(proof_fnames) < MAX_FILES:
+        if part.name == "proof_completion" and len(proof_saves) < MAX_FILES:
             proof_ext = part.headers[aiohttp.hdrs.CONTENT_TYPE].split("/")[-1]
-            file_contents = await part.read(decode=False)
-            fname, _fpath = await save_image(file_contents, proof_ext)
-            proof_fnames.append(f"{MEDIA_BASE_URL}/{fname}")
+            spooled = await spool_part(part, proof_ext)
+            # Processed while the rest of the request is read
+            proof_saves.append(asyncio.create_task(save_spooled(spooled)))
 
         elif part.name == "data":
             data = await part.json()
@@ -139,7 +138,7 @@ async def post(
 
             embeds = await get_runsubm_embed(data, discord_profile, resource)
 
-    proof_fnames = [url for url in proof_fnames if url is not None]
+    proof_fnames = [f"{MEDIA_BASE_URL}/{fname}" for fname, _fpath in await asyncio.gather(*proof_saves)]
     if not (len(embeds) and len(proof_fnames)):
         return web.json_response(status=HTTPStatus.BAD_REQUEST)
 
@@ -171,13 +170,7 @@ async def post(
             "image": {"url": proof_fnames[i]},
         })
 
-    form_data = FormData()
-
-    json_data = {"embeds": embeds}
-    payload_json = json.dumps(json_data)
-    form_data.add_field("payload_json", payload_json)
-
-    asyncio.create_task(send_run_webhook(run_id, data["format"], form_data, payload_json))
+    await send_run_webhook(run_id, data["format"], {"embeds": embeds})
     return web.Response(
         status=http.HTTPStatus.CREATED,
         headers={"Location": f"/completions/{run_id}"}
@@ -1,4 +1,3 @@
-import asyncio
 import http
 from aiohttp import web
 import src.utils.routedecos
@@ -81,12 +80,13 @@ async def put(
     if len(transfer_formats) == 0:
         raise MissingPermsException("edit:completion")
 
-    await transfer_all_completions(
-        resource.code,
-        json_body["code"],
-        transfer_formats,
-    )
-    asyncio.create_task(
-        src.log.log_action("completion", "put", resource.code, json_body["code"], discord_profile["id"])
-    )
+    async with src.log.logged_edit(
+        "completion", "put", resource.code, json_body["code"], discord_profile["id"]
+    ) as conn:
+        await transfer_all_completions(
+            resource.code,
+            json_body["code"],
+            transfer_formats,
+            conn=conn,
+        )
     return web.Response(status=http.HTTPStatus.NO_CONTENT)
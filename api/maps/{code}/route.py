@@ -1,4 +1,3 @@
-import asyncio
 from aiohttp import web
 import http
 import src.log
@@ -10,6 +9,10 @@ import src.utils.routedecos
 from src.exceptions import MissingPermsException
 
 
+cache_ttl = 300
+cache_tags = ["map", "completion", "config"]
+
+
 @src.utils.routedecos.validate_resource_exists(get_map, "code")
 async def get(_r: web.Request, resource: "src.db.models.Map" = None):
     """
@@ -100,9 +103,9 @@ async def put(
         if not permissions.has("edit:map", format_id) and format_info[format_id].key in json_body:
             del json_body[format_info[format_id].key]
 
-    await edit_map(json_body, resource)
-    asyncio.create_task(map_change_update_map_submission_wh(resource.code, json_body))
-    asyncio.create_task(src.log.log_action("map", "put", resource.code, json_body, discord_profile["id"]))
+    async with src.log.logged_edit("map", "put", resource.code, json_body, discord_profile["id"]) as conn:
+        await edit_map(json_body, resource, conn=conn)
+    await map_change_update_map_submission_wh(resource.code, json_body)
     return web.Response(status=http.HTTPStatus.NO_CONTENT)
 
 
@@ -150,6 +153,6 @@ async def delete(
         if permissions.has("delete:map", format_id):
             fields_values.append(format_info[format_id].key)
 
-    await delete_map(resource.code, map_current=resource, keys=fields_values)
-    asyncio.create_task(src.log.log_action("map", "delete", resource.code, None, discord_profile["id"]))
+    async with src.log.logged_edit("map", "delete", resource.code, None, discord_profile["id"]) as conn:
+        await delete_map(resource.code, map_current=resource, keys=fields_values, conn=conn)
     return web.Response(status=http.HTTPStatus.NO_CONTENT)
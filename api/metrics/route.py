@@ -0,0 +1,106 @@
+import hmac
+import http
+import config
+from aiohttp import web
+import src.http
+import src.db.connection
+import src.utils.images
+import src.utils.routedecos
+
+
+@src.utils.routedecos.bearer_auth
+async def get(_r: web.Request, token: str = "", **_kwargs) -> web.Response:
+    """
+    ---
+    description: |
+      Returns usage statistics of the database connection pool, the image workers and the cache
+      of requests to other APIs. Requires
+      `METRICS_TOKEN` to be set in the config and used as the Bearer token.
+    tags:
+    - Metrics
+    responses:
+      "200":
+        description: Returns the pool's statistics.
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                database:
+                  type: object
+                  properties:
+                    size:
+                      type: integer
+                      description: Connections currently open.
+                    min_size:
+                      type: integer
+                    max_size:
+                      type: integer
+                    busy:
+                      type: integer
+                      description: Open connections that are not idle.
+                    saturation:
+                      type: number
+                      description: "`busy` over `max_size`."
+                    in_use:
+                      type: integer
+                      description: Connections currently held by queries.
+                    waiting:
+                      type: integer
+                      description: Queries currently waiting for a connection.
+                    acquired:
+                      type: integer
+                      description: Connections acquired since startup.
+                    wait_avg_ms:
+                      type: number
+                    wait_max_ms:
+                      type: number
+                images:
+                  type: object
+                  description: Uploaded images converted to WebP.
+                  properties:
+                    processed:
+                      type: integer
+                    skipped:
+                      type: integer
+                      description: Images that were already saved, so weren't converted again.
+                    in_progress:
+                      type: integer
+                      description: Images being converted or waiting for a free worker.
+                    stages:
+                      type: object
+                      description: |
+                        Average and max duration of each stage, in `avg_ms` and `max_ms`.
+                        The stages are `queued`, `decode`, `resize` and `encode`.
+                http_cache:
+                  type: object
+                  description: Responses to requests to Discord and Ninja Kiwi's APIs, since startup.
+                  properties:
+                    memory_hits:
+                      type: integer
+                    disk_hits:
+                      type: integer
+                    misses:
+                      type: integer
+                    hit_ratio:
+                      type: number
+                    evicted:
+                      type: integer
+                      description: Responses dropped to make space for new ones.
+                    expired:
+                      type: integer
+      "401":
+        description: Your token is missing or invalid.
+      "404":
+        description: Metrics are disabled.
+    """
+    if not hasattr(config, "METRICS_TOKEN"):
+        return web.Response(status=http.HTTPStatus.NOT_FOUND)
+    if not hmac.compare_digest(token.encode(), config.METRICS_TOKEN.encode()):
+        return web.Response(status=http.HTTPStatus.UNAUTHORIZED)
+
+    return web.json_response({
+        "database": src.db.connection.metrics.to_dict(),
+        "images": src.utils.images.metrics.to_dict(),
+        "http_cache": src.http.cache_metrics.to_dict(),
+    })
@@ -2,8 +2,10 @@ import http
 from aiohttp import web
 from typing import get_args
 from src.utils.types import SearchEntity
+import src.utils.searchindex
 from src.db.queries.search import search
 from src.db.models import PartialMap, PartialUser
+from src.utils.misc import list_rm_dupe
 
 LIMIT_DEFAULT = 5
 MIN_Q_LENGTH = 1
@@ -14,7 +16,9 @@ async def get(
 ) -> web.Response:
     """
     ---
-    description: Searches a resource in the database.
+    description: |
+      Searches maps by name, code or alias, and users by name. Exact matches come first,
+      then names starting with the query or with a word starting with it, then similar ones.
     tags:
     - Search
     parameters:
@@ -72,10 +76,10 @@ async def get(
         )
 
     entities = get_args(SearchEntity)
-    req_entities = request.query.get("type", "user").split(",")
-    for i in range(len(req_entities)-1, -1, -1):
-        if req_entities[i] not in entities:
-            req_entities.pop(i)
+    req_entities = [
+        entity for entity in list_rm_dupe(request.query.get("type", "user").split(","))
+        if entity in entities
+    ]
 
     try:
         limit = min(50, int(request.query.get("limit", str(LIMIT_DEFAULT))))
@@ -87,7 +91,15 @@ async def get(
         PartialMap: "map",
     }
 
-    results = await search(request.query["q"], req_entities, limit)
+    query = request.query["q"]
+    results = []
+    if "map" in req_entities and src.utils.searchindex.is_enabled():
+        req_entities.remove("map")
+        results += (await src.utils.searchindex.get_map_index()).search(query, limit)
+    if len(req_entities):
+        results += await search(query, req_entities, limit)
+    results = sorted(results, key=lambda x: x[0], reverse=True)[:limit]
+
     return web.json_response([
         {"type": types_str[type(res)], "data": res.to_dict()}
         for _s, res in results
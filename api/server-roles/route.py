@@ -1,9 +1,11 @@
+import http
 import asyncio
 from aiohttp import web
 from src.requests import discord_api
 import src.utils.routedecos
+import src.utils.apitokens
 from src.utils.misc import extract
-from src.exceptions import MissingPermsException
+from src.exceptions import MissingPermsException, GenericErrorException
 
 load_guild_roles_sem = asyncio.Semaphore(4)
 
@@ -71,6 +73,9 @@ async def get(
     """Utility endpoint that gets valid guilds/roles for role picking sections on the website."""
     if not permissions.has_in_any("edit:achievement_roles"):
         raise MissingPermsException("edit:achievement_roles")
+    if src.utils.apitokens.is_api_token(token):
+        # Needs to look up the user's guilds on Discord
+        raise GenericErrorException("Must use a Discord token", status_code=http.HTTPStatus.UNAUTHORIZED)
 
     bot_guilds = []
     valid_guilds = filter_valid_guilds(await discord_api().get_user_guilds(token))
@@ -1,4 +1,5 @@
 import http
+import src.log
 import re
 from aiohttp import web
 from src.db.queries.users import edit_user, get_user_min, get_user_perms
@@ -107,11 +108,15 @@ async def put(
         )
 
     oak = json_body["oak"] if json_body["oak"] is not None else None
-    await edit_user(
-        discord_profile["id"],
-        json_body["name"],
-        oak,
-    )
+    async with src.log.logged_edit(
+        "user", "put", discord_profile["id"], {"name": json_body["name"]}, discord_profile["id"]
+    ) as conn:
+        await edit_user(
+            discord_profile["id"],
+            json_body["name"],
+            oak,
+            conn=conn,
+        )
     return web.json_response({
         "errors": {},
         "data": {
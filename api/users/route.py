@@ -1,9 +1,10 @@
 import http
+import src.log
 from aiohttp import web
 from src.db.queries.users import create_user
 from src.utils.validators import validate_discord_user
 import src.utils.routedecos
-from src.exceptions import MissingPermsException
+from src.exceptions import MissingPermsException, ValidationException
 
 
 @src.utils.routedecos.bearer_auth
@@ -14,6 +15,7 @@ async def post(
         _r: web.Request,
         json_body: dict = None,
         permissions: "src.db.modules.Permissions" = None,
+        discord_profile: dict = None,
         **_kwargs,
 ) -> web.Response:
     """
@@ -50,16 +52,12 @@ async def post(
     if not permissions.has("create:user", None):
         raise MissingPermsException("create:user")
 
-    success = await create_user(json_body["discord_id"], json_body["name"])
-    if success:
-        return web.Response(status=http.HTTPStatus.CREATED)
-
-    return web.json_response(
-        {
-            "errors": {
+    async with src.log.logged_edit(
+        "user", "post", json_body["discord_id"], {"name": json_body["name"]}, discord_profile["id"]
+    ) as conn:
+        if not await create_user(json_body["discord_id"], json_body["name"], conn=conn):
+            raise ValidationException({
                 "discord_id": "One or both of these already exists",
                 "name": "One or both of these already exists",
-            },
-        },
-        status=http.HTTPStatus.BAD_REQUEST,
-    )
+            })
+    return web.Response(status=http.HTTPStatus.CREATED)
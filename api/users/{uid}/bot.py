@@ -1,5 +1,6 @@
 from aiohttp import web
 import http
+import src.log
 import src.utils.routedecos
 from src.db.queries.users import get_user, edit_user, get_user_min, get_user_perms
 from src.requests import ninja_kiwi_api
@@ -43,9 +44,13 @@ async def put(
         return web.Response(status=http.HTTPStatus.UNAUTHORIZED)
 
     oak = json_data["oak"] if len(json_data["oak"]) else None
-    await edit_user(
-        request.match_info["uid"],
-        resource.name,
-        oak,
-    )
+    async with src.log.logged_edit(
+        "user", "put", resource.id, {"name": resource.name}, request.match_info["uid"]
+    ) as conn:
+        await edit_user(
+            request.match_info["uid"],
+            resource.name,
+            oak,
+            conn=conn,
+        )
     return web.Response(status=http.HTTPStatus.OK)
@@ -2,6 +2,7 @@ from aiohttp import web
 import math
 import src.utils.routedecos
 from src.db.queries.users import get_completions_by, get_user_min
+from src.utils.cursors import encode_cursor, decode_cursor
 
 PAGE_ENTRIES = 50
 
@@ -35,6 +36,12 @@ async def get(
       schema:
         type: integer
       description: Pagination. Defaults to `1`.
+    - in: query
+      name: after
+      required: false
+      schema:
+        type: string
+      description: The `next` cursor of the previous page. Takes precedence over `page`.
     responses:
       "200":
         description: Returns an array of `ListCompletion`.
@@ -49,6 +56,10 @@ async def get(
                 pages:
                   type: integer
                   description: The total number of pages.
+                next:
+                  type: string
+                  nullable: true
+                  description: Cursor to pass as `after` to get the next page.
                 completions:
                   type: array
                   description: The player's completions
@@ -70,14 +81,26 @@ async def get(
 
     formats = [int(fmt) for fmt in request.query.get("formats", "1,51").split(",") if fmt.isnumeric()]
 
+    after = None
+    if "after" in request.query:
+        after = decode_cursor(request.query["after"], str, bool, bool, bool, int)
+
     completions, count = await get_completions_by(
         request.match_info["uid"],
         formats,
         idx_start=(page-1)*PAGE_ENTRIES,
         amount=PAGE_ENTRIES,
+        after=after,
     )
+
+    next_cursor = None
+    if len(completions) == PAGE_ENTRIES:
+        last = completions[-1]
+        next_cursor = encode_cursor(last.map.code, last.black_border, last.no_geraldo, last.current_lcc, last.id)
+
     return web.json_response({
         "total": count,
         "pages": math.ceil(count/PAGE_ENTRIES),
+        "next": next_cursor,
         "completions": [cmp.to_dict() for cmp in completions],
     })
@@ -1,4 +1,5 @@
 import http
+import src.log
 
 from aiohttp import web
 import src.utils.routedecos
@@ -104,6 +105,9 @@ async def patch(
             status=http.HTTPStatus.FORBIDDEN,
         )
 
-    await add_roles(resource.id, to_grant)
-    await remove_roles(resource.id, to_delete)
+    async with src.log.logged_edit(
+        "user", "put", resource.id, {"roles": json_body["roles"]}, discord_profile["id"]
+    ) as conn:
+        await add_roles(resource.id, to_grant, conn=conn)
+        await remove_roles(resource.id, to_delete, conn=conn)
     return web.Response(status=http.HTTPStatus.NO_CONTENT)
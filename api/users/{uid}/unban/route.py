@@ -1,4 +1,5 @@
 import http
+import src.log
 from aiohttp import web
 import src.utils.routedecos
 from src.db.queries.users import unban_user
@@ -11,6 +12,7 @@ from src.exceptions import MissingPermsException
 async def post(
         request: web.Request,
         permissions: "src.db.models.Permissions" = None,
+        discord_profile: dict = None,
         **_kwargs,
 ) -> web.Response:
     """
@@ -31,6 +33,7 @@ async def post(
 
     user_id = request.match_info.get("uid", "0")
     if user_id.isnumeric():
-        await unban_user(user_id)
+        async with src.log.logged_edit("user", "put", user_id, {"is_banned": False}, discord_profile["id"]) as conn:
+            await unban_user(user_id, conn=conn)
 
     return web.Response(status=http.HTTPStatus.NO_CONTENT)
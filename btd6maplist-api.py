@@ -13,19 +13,34 @@ import aiohttp_client_cache
 from aiohttp import web
 import src.http
 import src.log
+import src.changes
+import src.webhooks
+import src.utils.images
 import src.db.connection
 import src.db.models
+import src.utils.responsecache
 from src.exceptions import ServerException
 from src.utils.colors import green, yellow, blue, red, cyan
 
 
+# Expired responses are dropped from memory this often, and from the disk every this many times
+HTTP_CACHE_SWEEP = 60
+HTTP_CACHE_DISK_SWEEP = 60 * 6
+
+
 # https://docs.aiohttp.org/en/v3.8.5/web_advanced.html#complex-applications
 async def init_client_session(_app):
-    cache = aiohttp_client_cache.FileBackend(
-        cache_name=os.path.join(config.PERSISTENT_DATA_PATH, ".cache", "aiohttp-requests.db"),
+    disk_path = None
+    if not hasattr(config, "HTTP_CACHE_DISK") or config.HTTP_CACHE_DISK:
+        disk_path = os.path.join(config.PERSISTENT_DATA_PATH, ".cache", "http")
+    cache = src.http.TieredBackend(
+        memory_bytes=config.HTTP_CACHE_MEMORY_BYTES if hasattr(config, "HTTP_CACHE_MEMORY_BYTES") else 16 * 1024**2,
+        disk_path=disk_path,
+        disk_bytes=config.HTTP_CACHE_DISK_BYTES if hasattr(config, "HTTP_CACHE_DISK_BYTES") else 256 * 1024**2,
         expire_after=0,
         urls_expire_after={
-            "data.ninjakiwi.com": 3600*24,
+            # Results are cached by NinjaKiwiClient. Its shortest TTL, so missing maps and users aren't kept longer
+            "data.ninjakiwi.com": 60,
             "discord.com/api/v10/users/@me/guilds": 60*5,
             "discord.com/api/v10/guilds/*/roles": 60*5,
             "discord.com": 60*60,
@@ -38,13 +53,21 @@ async def init_client_session(_app):
         async with aiohttp_client_cache.CachedSession(cache=cache) as session:
             src.http.set_session(session)
             src.http.set_bot_pubkey(config.BOT_PUBKEY)
+            ticks = 0
             while True:
-                await session.delete_expired_responses()
-                await asyncio.sleep(3600 * 24 * 5)
+                # The disk cache is only trimmed once in a while, since every response is read
+                if ticks % HTTP_CACHE_DISK_SWEEP == 0:
+                    await cache.delete_expired_responses()
+                else:
+                    cache.expire_memory()
+                ticks += 1
+                await asyncio.sleep(HTTP_CACHE_SWEEP)
 
     tasks = [
         asyncio.create_task(init_session()),
         asyncio.create_task(src.log.init_log()),
+        asyncio.create_task(src.changes.listen_changes()),
+        asyncio.create_task(src.webhooks.run_outbox()),
     ]
 
     yield
@@ -52,6 +75,8 @@ async def init_client_session(_app):
     [t.cancel() for t in tasks]
     with contextlib.suppress(asyncio.CancelledError):
         [await t for t in tasks]
+    await src.log.flush()
+    src.utils.images.shutdown()
 
 
 def start_db_connection(init_database: bool = True):
@@ -111,12 +136,17 @@ def cors_route(handler, cors_options):
 
     @functools.wraps(handler)
     async def inner(request: web.Request) -> web.Response:
-        response = await handler(request)
+        request["cors_headers"] = {}
         if "Origin" in request.headers:
             for allowed_origin in cors_regex:
                 if re.match(cors_regex[allowed_origin], request.headers["Origin"]):
-                    response.headers["Access-Control-Allow-Origin"] = request.headers["Origin"]
+                    request["cors_headers"]["Access-Control-Allow-Origin"] = request.headers["Origin"]
                     break
+
+        response = await handler(request)
+        # Streamed responses already sent their headers, and must add these themselves
+        if not response.prepared:
+            response.headers.update(request["cors_headers"])
         return response
 
     return inner
@@ -169,12 +199,14 @@ def get_routes(cur_path: None | list = None) -> list:
                 if api_route_str.endswith("/bot"):
                     api_route_str = api_route_str[:-4] + " 🤖"
                 print(f"{routecolor(method.upper())}\t{api_route_str}")
-                handler = cors_route(
-                    response_on_exception(
-                        getattr(route, method),
-                    ),
-                    cors_origins,
-                )
+                handler = response_on_exception(getattr(route, method))
+                if method == "get" and hasattr(route, "cache_ttl"):
+                    handler = src.utils.responsecache.cached_route(
+                        handler,
+                        route.cache_ttl,
+                        route.cache_tags if hasattr(route, "cache_tags") else [],
+                    )
+                handler = cors_route(handler, cors_origins)
                 routes.append(routefunc(api_route, handler))
                 methods.append(method.upper())
             if len(methods):
@@ -20,3 +20,47 @@ BOT_TOKEN = "bot-token.jwt"
 BOT_UA = "DiscordBot (https://localhost:3000, 1.0)"
 
 CORS_ORIGINS = ["*"]
+
+# Secrets for the tokens issued by /auth/token. New tokens are signed with the last one,
+# and all are accepted, so append a new one to rotate and remove old ones once they expire.
+# If omitted, a random one is generated every time the server starts.
+# API_TOKEN_SECRETS = ["some-long-random-string"]
+# API_TOKEN_TTL = 3600
+
+# Connection pool. These are the defaults.
+# DB_POOL_MIN_SIZE = 10
+# DB_POOL_MAX_SIZE = 10
+# DB_COMMAND_TIMEOUT = None
+# DB_STATEMENT_CACHE_SIZE = 100
+# DB_MAX_INACTIVE_LIFETIME = 300.0
+# Max connections a single request uses at once to run independent queries
+# DB_FANOUT_LIMIT = 4
+
+# Bearer token for GET /metrics. The endpoint is disabled if omitted.
+# METRICS_TOKEN = "some-long-random-string"
+
+# Search maps in memory instead of querying the database. The index is rebuilt when a map changes.
+# SEARCH_INDEX_IN_MEMORY = False
+
+# The changelog is rotated once it's bigger than this many bytes, or on the first change of a new day.
+# LOG_MAX_SIZE = 10 * 1024**2
+# Compress rotated changelogs with gzip
+# LOG_COMPRESS = False
+
+# Processes converting uploaded images to WebP, and the max width and height they're resized to.
+# IMAGE_WORKERS = 4
+# IMAGE_MAX_DIMENSION = 4096
+
+# Uploaded files bigger than this many bytes are rejected
+# MAX_UPLOAD_SIZE = 5 * 1024**2
+
+# Exports streamed at once, each holding a database connection. Others are rejected with a 503.
+# EXPORT_MAX_CONCURRENT = 4
+
+# Outbound HTTP responses are cached in memory up to this many bytes, and on disk unless HTTP_CACHE_DISK is False
+# HTTP_CACHE_MEMORY_BYTES = 16 * 1024**2
+# HTTP_CACHE_DISK = True
+# HTTP_CACHE_DISK_BYTES = 256 * 1024**2
+
+# Rendered medal banners are kept on disk up to this many bytes
+# BANNER_DISK_BYTES = 64 * 1024**2
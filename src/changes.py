@@ -0,0 +1,67 @@
+import asyncio
+import asyncpg
+import src.db.connection
+from src.db.queries.changes import get_latest_change_id, number_change_events
+from src.utils.colors import purple, red
+
+CHANNEL = "change_events"
+# Seconds to wait before reconnecting after losing the connection
+RECONNECT_DELAY = 5
+
+latest_id = 0
+new_change = asyncio.Event()
+# The connection LISTENing for changes, None while reconnecting
+listener: asyncpg.Connection | None = None
+
+
+def on_notify(_conn, _pid, _channel, payload: str) -> None:
+    global latest_id, new_change
+    latest_id = max(latest_id, int(payload))
+    # Wakes everyone waiting on the current event, the next ones wait on a new one
+    new_change.set()
+    new_change = asyncio.Event()
+
+
+async def listen_changes():
+    """
+    Keeps `latest_id` up to date through LISTEN, on a connection outside the pool.
+    If the connection is lost it reconnects, and catches up on the events it missed.
+    """
+    global listener
+    while True:
+        try:
+            listener = await src.db.connection.connect()
+            lost = asyncio.get_running_loop().create_future()
+            listener.add_termination_listener(lambda _conn: lost.done() or lost.set_result(None))
+            await listener.add_listener(CHANNEL, on_notify)
+            # Events committed right before a crash might not have been numbered
+            await number_change_events(conn=listener)
+            on_notify(listener, None, CHANNEL, str(await get_latest_change_id(conn=listener)))
+            print(f"{purple('[Changes]')} Listening for changes")
+            await lost
+            print(f"{purple('[Changes]')} {red('Lost the connection, reconnecting')}")
+        except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+            print(f"{purple('[Changes]')} {red('Error while listening for changes')}: {exc}")
+        finally:
+            if listener is not None:
+                listener.terminate()
+            listener = None
+        await asyncio.sleep(RECONNECT_DELAY)
+
+
+async def wait_for_change(since: int, timeout: float) -> bool:
+    """
+    Waits until there's an event newer than `since`, for at most `timeout` seconds.
+    Returns whether there is one.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while latest_id <= since:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return False
+        try:
+            await asyncio.wait_for(new_change.wait(), remaining)
+        except asyncio.TimeoutError:
+            return False
+    return True
@@ -1,10 +1,70 @@
 import os
+import time
+import asyncio
 import asyncpg
+import contextlib
 import config
 from src.utils.colors import red, purple
 from functools import wraps
-
-pool: asyncpg.Pool | None
+from collections.abc import Awaitable, Callable
+
+pool: asyncpg.Pool | None = None
+
+
+class PoolMetrics:
+    """Counters on connections acquired through `acquire`."""
+    def __init__(self):
+        self.waiting = 0
+        self.in_use = 0
+        self.acquired = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.waiting -= 1
+        self.acquired += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def to_dict(self) -> dict:
+        size = pool.get_size() if pool else 0
+        max_size = pool.get_max_size() if pool else 0
+        busy = size - (pool.get_idle_size() if pool else 0)
+        return {
+            "size": size,
+            "min_size": pool.get_min_size() if pool else 0,
+            "max_size": max_size,
+            "busy": busy,
+            "saturation": busy / max_size if max_size else 0,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "wait_avg_ms": self.wait_total / self.acquired * 1000 if self.acquired else 0,
+            "wait_max_ms": self.wait_max * 1000,
+        }
+
+
+metrics = PoolMetrics()
+
+
+def connection_params() -> dict:
+    return {
+        "user": config.DB_USER,
+        "password": config.DB_PSWD,
+        "database": config.DB_NAME,
+        "host": config.DB_HOST,
+        "port": config.DB_PORT if hasattr(config, "DB_PORT") else 5432,
+        "server_settings": {
+            "application_name": "btd6maplist-api",
+            # Threshold of the % operator, used by search
+            "pg_trgm.similarity_threshold": "0.1",
+        },
+    }
+
+
+async def connect() -> asyncpg.Connection:
+    """A connection outside the pool, for the ones that must be held for the whole app's lifetime."""
+    return await asyncpg.connect(**connection_params())
 
 
 async def start(should_init_database: bool = True):
@@ -12,9 +72,13 @@ async def start(should_init_database: bool = True):
     try:
         os.makedirs(os.path.join(config.PERSISTENT_DATA_PATH, "data"), exist_ok=True)
         pool = await asyncpg.create_pool(
-            user=config.DB_USER, password=config.DB_PSWD,
-            database=config.DB_NAME, host=config.DB_HOST,
-            port=config.DB_PORT if hasattr(config, "DB_PORT") else 5432,
+            **connection_params(),
+            min_size=config.DB_POOL_MIN_SIZE if hasattr(config, "DB_POOL_MIN_SIZE") else 10,
+            max_size=config.DB_POOL_MAX_SIZE if hasattr(config, "DB_POOL_MAX_SIZE") else 10,
+            command_timeout=config.DB_COMMAND_TIMEOUT if hasattr(config, "DB_COMMAND_TIMEOUT") else None,
+            statement_cache_size=config.DB_STATEMENT_CACHE_SIZE if hasattr(config, "DB_STATEMENT_CACHE_SIZE") else 100,
+            max_inactive_connection_lifetime=config.DB_MAX_INACTIVE_LIFETIME
+                if hasattr(config, "DB_MAX_INACTIVE_LIFETIME") else 300.0,
         )
         print(f"{purple('[PSQL]')} Connected")
         if should_init_database:
@@ -27,16 +91,69 @@ async def start(should_init_database: bool = True):
 def postgres(wrapped):
     @wraps(wrapped)
     async def wrapper(*args, **kwargs):
-        if "conn" in kwargs:
+        if kwargs.get("conn") is not None:
             return await wrapped(*args, **kwargs)
 
         if pool is None:
             return
-        async with pool.acquire() as conn:
-            return await wrapped(*args, **kwargs, conn=conn)
+        async with acquire() as conn:
+            return await wrapped(*args, **{**kwargs, "conn": conn})
     return wrapper
 
 
+async def fan_out(
+        *calls: Callable[..., Awaitable],
+        conn: "asyncpg.pool.PoolConnectionProxy" = None,
+        limit: int | None = None,
+) -> list:
+    """
+    Runs independent queries concurrently, each on its own connection and at most `limit` at a time.
+    Each call gets the connection as the `conn` kwarg. If `conn` is passed, they run one after
+    the other on it instead, so queries inside a transaction still see its changes.
+    Shouldn't be called while holding a connection, or it could starve the pool.
+    """
+    if conn is not None:
+        return [await call(conn=conn) for call in calls]
+
+    if limit is None:
+        limit = config.DB_FANOUT_LIMIT if hasattr(config, "DB_FANOUT_LIMIT") else 4
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(call: Callable[..., Awaitable]):
+        async with semaphore, acquire() as own_conn:
+            return await call(conn=own_conn)
+
+    tasks = [asyncio.ensure_future(run(call)) for call in calls]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        # The others' results won't be used, but their connections must be given back
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+@contextlib.asynccontextmanager
+async def acquire():
+    """`pool.acquire` that keeps track of how long it waited, in `metrics`."""
+    metrics.waiting += 1
+    started = time.perf_counter()
+    acquired = False
+    try:
+        async with pool.acquire() as conn:
+            metrics.record_wait(time.perf_counter() - started)
+            acquired = True
+            metrics.in_use += 1
+            try:
+                yield conn
+            finally:
+                metrics.in_use -= 1
+    finally:
+        if not acquired:
+            metrics.waiting -= 1
+
+
 @postgres
 async def init_database(test: bool = False, conn=None):
     await update_schema(conn=conn)
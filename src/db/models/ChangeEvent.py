@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass
+class ChangeEvent:
+    """
+    type: object
+    properties:
+      id:
+        type: integer
+        description: The event's ID. Events are sorted by it.
+      type:
+        type: string
+        enum: [map, completion, config, user]
+      action:
+        type: string
+        enum: [post, put, delete]
+      entity_id:
+        type: string
+        nullable: true
+        description: The ID of what changed, if known.
+      data:
+        nullable: true
+        description: The data submitted along with the change, if any.
+      created_on:
+        type: integer
+        description: Timestamp of the change, in seconds.
+    """
+    id: int
+    type: str
+    action: str
+    entity_id: str | None
+    data: dict | list | str | None
+    created_on: datetime
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "action": self.action,
+            "entity_id": self.entity_id,
+            "data": self.data,
+            "created_on": int(self.created_on.timestamp()),
+        }
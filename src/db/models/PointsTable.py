@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class PointsTable:
+    """
+    Contents of `listmap_points`. It's keyed by placement only: every list
+    format reads the same point config, so they all give the same points.
+    """
+    version: int
+    points: dict[int, float]
+
+    @property
+    def map_count(self) -> int:
+        return len(self.points)
@@ -1,5 +1,6 @@
 import re
 import yaml
+from .PointsTable import PointsTable
 from .Config import Config
 from .maps import Map, PartialMap, MinimalMap, RetroMap
 from .challenges import LCC, ListCompletion, ListCompletionWithMeta
@@ -10,6 +11,7 @@ from .MapSubmission import MapSubmission
 from .AchievementRole import DiscordRole, AchievementRole, RoleUpdateAction
 from .Format import Format
 from .Permissions import Permissions
+from .ChangeEvent import ChangeEvent
 
 entities = [
     RetroMap,
@@ -32,6 +34,7 @@ entities = [
     AchievementRole,
     RoleUpdateAction,
     Format,
+    ChangeEvent,
 ]
 
 swagger_definitions_str = """
@@ -0,0 +1,59 @@
+import json
+import src.db.connection
+from src.db.models import ChangeEvent
+postgres = src.db.connection.postgres
+
+
+@postgres
+async def insert_change_event(
+        etype: str,
+        action: str,
+        eid: str | None,
+        entity: dict | list | str | None,
+        who: str | None,
+        conn=None,
+) -> None:
+    await conn.execute(
+        """
+        INSERT INTO change_events (etype, action, eid, entity, who)
+        VALUES ($1, $2, $3, $4::jsonb, $5)
+        """,
+        etype, action, eid, json.dumps(entity), who,
+    )
+
+
+@postgres
+async def number_change_events(conn=None) -> None:
+    """Gives committed events their place in the feed. Shouldn't be run in a transaction."""
+    await conn.execute("SELECT number_change_events()")
+
+
+@postgres
+async def get_latest_change_id(conn=None) -> int:
+    return await conn.fetchval("SELECT COALESCE(MAX(seq), 0) FROM change_events")
+
+
+@postgres
+async def get_change_events(since: int, limit: int, conn=None) -> list[ChangeEvent]:
+    payload = await conn.fetch(
+        """
+        SELECT seq, etype, action, eid, entity, created_on
+        FROM change_events
+        WHERE seq > $1
+        ORDER BY seq
+        LIMIT $2
+        """,
+        since, limit,
+    )
+    return [
+        ChangeEvent(
+            row["seq"],
+            row["etype"],
+            row["action"],
+            row["eid"],
+            json.loads(row["entity"]),
+            row["created_on"],
+        )
+        for row in payload
+    ]
+
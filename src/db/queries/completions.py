@@ -3,6 +3,7 @@ import asyncpg.pool
 import src.db.connection
 from src.db.models import ListCompletionWithMeta, LCC, PartialUser, PartialMap
 from src.utils.misc import list_rm_dupe
+from src.utils.cache import cache_for
 postgres = src.db.connection.postgres
 
 
@@ -308,10 +309,27 @@ async def delete_completion(
 async def get_unapproved_completions(
         idx_start: int = 0,
         amount: int = 50,
+        after: tuple[str, int] | None = None,
         conn=None,
 ) -> tuple[list[ListCompletionWithMeta], int]:
+    """
+    If `after` is a (map_code, run_id) pair, returns the runs right after it
+    instead of skipping `idx_start` rows.
+    """
+    args = [amount]
+    if after is None:
+        args.append(idx_start)
+        total_count = "COUNT(*) OVER()"
+        filter_after = ""
+        offset = "OFFSET $2"
+    else:
+        args.extend(after)
+        total_count = "0"
+        filter_after = "AND (c.map, c.id) > ($2, $3)"
+        offset = ""
+
     payload = await conn.fetch(
-        """
+        f"""
         WITH unapproved_runs AS (
             SELECT
                 c.id AS run_id,
@@ -324,6 +342,7 @@ async def get_unapproved_completions(
                 ON cm.completion = c.id
             WHERE cm.deleted_on IS NULL
                 AND cm.accepted_by IS NULL
+                {filter_after}
         ),
         unique_runs AS (
             SELECT DISTINCT ON (run.run_id)
@@ -349,19 +368,18 @@ async def get_unapproved_completions(
                 ON cp.run = run.run_id
             JOIN maps m
                 ON m.code = run.map
-            JOIN latest_maps_meta(NOW()::timestamp) mlm
+            JOIN current_map_list_meta mlm
                 ON m.code = mlm.code
             WHERE mlm.deleted_on IS NULL
         )
         SELECT 
-            COUNT(*) OVER() AS total_count, uq.*
+            {total_count} AS total_count, uq.*
         FROM unique_runs uq
-        ORDER BY uq.map
-        LIMIT $2
-        OFFSET $1
+        ORDER BY uq.map, uq.run_id
+        LIMIT $1
+        {offset}
         """,
-        idx_start,
-        amount
+        *args
     )
 
     completions = [
@@ -401,9 +419,29 @@ async def get_unapproved_completions(
         for run in payload
     ]
 
+    if after is not None:
+        return completions, await get_unapproved_completions_count(conn=conn)
     return completions, payload[0][0] if len(payload) else 0
 
 
+@cache_for(10)
+@postgres
+async def get_unapproved_completions_count(conn=None) -> int:
+    return await conn.fetchval(
+        """
+        SELECT COUNT(*)
+        FROM latest_completions cm
+        JOIN completions c
+            ON cm.completion = c.id
+        JOIN current_map_list_meta mlm
+            ON mlm.code = c.map
+        WHERE cm.deleted_on IS NULL
+            AND cm.accepted_by IS NULL
+            AND mlm.deleted_on IS NULL
+        """
+    )
+
+
 @postgres
 async def accept_completion(cid: int, who: int, conn: asyncpg.pool.PoolConnectionProxy = None) -> None:
     await conn.execute(
@@ -477,7 +515,7 @@ async def get_recent(limit: int = 5, formats: list[int] = None, conn=None) -> li
                 ON ply.run = run.run_meta_id
             LEFT JOIN completion_proofs cp
                 ON cp.run = run.run_id
-            JOIN latest_maps_meta(NOW()::timestamp) mlm
+            JOIN current_map_list_meta mlm
                 ON mlm.code = run.map
             JOIN maps m
                 ON m.code = run.map
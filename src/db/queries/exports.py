@@ -0,0 +1,94 @@
+from datetime import datetime
+from typing import AsyncIterator
+import src.db.connection
+
+# Rows fetched from the server-side cursor at a time
+PREFETCH = 500
+
+
+async def stream_query(query: str, *args) -> AsyncIterator["asyncpg.Record"]:
+    """
+    Yields the rows of a query through a server-side cursor, on a single snapshot.
+    The connection is held until the iteration is over.
+    """
+    async with src.db.connection.acquire() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            async for row in conn.cursor(query, *args, prefetch=PREFETCH):
+                yield row
+
+
+def stream_completions(since: datetime | None = None) -> AsyncIterator["asyncpg.Record"]:
+    """
+    Every accepted completion. If `since` is given, only the ones created, edited
+    or deleted after it, deleted ones included with their `deleted_on`.
+    """
+    return stream_query(
+        f"""
+        SELECT
+            c.id, c.map, cm.format, cm.black_border, cm.no_geraldo, lcc.leftover AS lcc_leftover,
+            ARRAY(
+                SELECT ply.user_id
+                FROM comp_players ply
+                WHERE ply.run = cm.id
+                ORDER BY ply.user_id
+            ) AS users,
+            ARRAY(
+                SELECT cp.proof_url
+                FROM completion_proofs cp
+                WHERE cp.run = c.id
+                    AND cp.proof_type = 0
+                ORDER BY cp.proof_url
+            ) AS subm_proof_img,
+            ARRAY(
+                SELECT cp.proof_url
+                FROM completion_proofs cp
+                WHERE cp.run = c.id
+                    AND cp.proof_type = 1
+                ORDER BY cp.proof_url
+            ) AS subm_proof_vid,
+            c.submitted_on, cm.created_on AS updated_on, cm.deleted_on
+        FROM latest_completions cm
+        JOIN completions c
+            ON c.id = cm.completion
+        LEFT JOIN leastcostchimps lcc
+            ON lcc.id = cm.lcc
+        WHERE cm.accepted_by IS NOT NULL
+            {
+                "AND cm.deleted_on IS NULL" if since is None else
+                "AND (cm.created_on >= $1 OR cm.deleted_on >= $1)"
+            }
+        ORDER BY c.id
+        """,
+        *([] if since is None else [since]),
+    )
+
+
+def stream_maps(since: datetime | None = None) -> AsyncIterator["asyncpg.Record"]:
+    """Every map with its current metadata, optionally only the ones edited after `since`."""
+    return stream_query(
+        f"""
+        SELECT
+            m.code, m.name, mlm.placement_curver, mlm.placement_allver, mlm.difficulty,
+            mlm.botb_difficulty, mlm.remake_of, mlm.optimal_heros, m.r6_start, m.map_data,
+            m.map_preview_url, mlm.deleted_on, mlm.created_on AS updated_on
+        FROM maps m
+        JOIN current_map_list_meta mlm
+            ON m.code = mlm.code
+        {"" if since is None else "WHERE mlm.created_on >= $1"}
+        ORDER BY m.code
+        """,
+        *([] if since is None else [since]),
+    )
+
+
+def stream_leaderboards() -> AsyncIterator["asyncpg.Record"]:
+    """Every entry of every stored leaderboard."""
+    return stream_query(
+        """
+        SELECT le.lb_format, le.lb_type, le.placement, le.user_id, u.name, le.score
+        FROM leaderboard_entries le
+        JOIN users u
+            ON u.discord_id = le.user_id
+        ORDER BY le.lb_format, le.lb_type, le.placement, le.user_id DESC
+        """
+    )
@@ -1,6 +1,7 @@
 import src.db.connection
 from src.db.models import LeaderboardEntry, PartialUser
-from src.db.queries.subqueries import leaderboard_name, LeaderboardType
+from src.db.queries.subqueries import LeaderboardType
+from src.utils.cache import cache_for
 postgres = src.db.connection.postgres
 
 
@@ -24,21 +25,68 @@ async def get_leaderboard(
         amount: int = 50,
         format: int = 1,
         type: LeaderboardType = "points",
+        after: tuple[int, int] | None = None,
         conn=None,
 ) -> tuple[list[LeaderboardEntry], int]:
+    """
+    If `after` is a (placement, user_id) pair, returns the entries right after it
+    instead of skipping `idx_start` rows.
+    """
+    if after is not None:
+        payload = await conn.fetch(
+            """
+            SELECT
+                0,
+                lb.score, lb.placement,
+                u.discord_id, u.name
+            FROM leaderboard_entries lb
+            JOIN users u
+                ON u.discord_id = lb.user_id
+            WHERE lb.lb_format = $2
+                AND lb.lb_type = $3
+                AND lb.placement >= $4
+                AND (lb.placement > $4 OR lb.user_id < $5)
+            ORDER BY lb.placement, lb.user_id DESC
+            LIMIT $1
+            """,
+            amount, format, type, *after
+        )
+        entries, _ = get_lb_list(payload)
+        return entries, await get_leaderboard_count(format, type, conn=conn)
+
     payload = await conn.fetch(
-        f"""
+        """
         SELECT
             COUNT(*) OVER(),
             lb.score, lb.placement,
             u.discord_id, u.name
-        FROM {leaderboard_name(format, type)} lb
+        FROM leaderboard_entries lb
         JOIN users u
             ON u.discord_id = lb.user_id
-        ORDER BY lb.placement
+        WHERE lb.lb_format = $3
+            AND lb.lb_type = $4
+        ORDER BY lb.placement, lb.user_id DESC
         LIMIT $1
         OFFSET $2
         """,
-        amount, idx_start
+        amount, idx_start, format, type
     )
     return get_lb_list(payload)
+
+
+@cache_for(10)
+@postgres
+async def get_leaderboard_count(
+        format: int,
+        type: LeaderboardType,
+        conn=None,
+) -> int:
+    return await conn.fetchval(
+        """
+        SELECT COUNT(*)
+        FROM leaderboard_entries
+        WHERE lb_format = $1
+            AND lb_type = $2
+        """,
+        format, type
+    )
@@ -1,4 +1,5 @@
 import asyncio
+import functools
 from datetime import datetime
 import src.db.connection
 from src.db.models import (
@@ -10,8 +11,9 @@ from src.db.models import (
     PartialUser,
     RetroMap,
 )
-from src.db.queries.subqueries import get_int_config
+from src.db.queries.subqueries import get_int_config, maps_meta_at
 from src.utils.misc import list_rm_dupe
+from src.utils.cache import cache_for
 from src.utils.formats.formats import format_keys
 postgres = src.db.connection.postgres
 
@@ -22,9 +24,7 @@ async def get_list_maps(
         curver: bool = True,
         timestamp: datetime | None = None
 ) -> list[MinimalMap]:
-    if timestamp is None:
-        timestamp = datetime.now()
-
+    args = [] if timestamp is None else [timestamp]
     placement_vname = "placement_curver" if curver else "placement_allver"
     payload = await conn.fetch(
         f"""
@@ -48,7 +48,7 @@ async def get_list_maps(
             placement_curver,
             map_preview_url
         FROM maps m
-        JOIN latest_maps_meta($1) mlm
+        JOIN {maps_meta_at(timestamp, 1)} mlm
             ON m.code = mlm.code
         LEFT JOIN verified_current vc
             ON m.code = vc.map
@@ -57,7 +57,7 @@ async def get_list_maps(
             AND deleted_on IS NULL
         ORDER BY {placement_vname} ASC
         """,
-        timestamp
+        *args
     )
     return [
         MinimalMap(
@@ -78,16 +78,16 @@ async def get_maps_by_idx(
         timestamp: datetime | None = None,
         conn: "asyncpg.pool.PoolConnectionProxy" = None,
 ) -> list[MinimalMap]:
-    if timestamp is None:
-        timestamp = datetime.now()
-
     allowed_keys = ["difficulty", "botb_difficulty"]
     if idx not in allowed_keys:
         return []
 
-    args = [timestamp]
+    args = []
     if filter_val is not None:
         args.append(filter_val)
+    mlm_source = maps_meta_at(timestamp, len(args)+1)
+    if timestamp is not None:
+        args.append(timestamp)
 
     payload = await conn.fetch(
         f"""
@@ -104,13 +104,13 @@ async def get_maps_by_idx(
             m.map_preview_url,
             vc.map IS NOT NULL AS is_verified
         FROM maps m
-        JOIN latest_maps_meta($1) mlm
+        JOIN {mlm_source} mlm
             ON mlm.code = m.code
         LEFT JOIN verified_current vc
             ON m.code = vc.map
         WHERE {idx} IS NOT NULL
             AND deleted_on IS NULL
-            {("AND mlm." + idx + " = $2") if filter_val is not None else ""}
+            {("AND mlm." + idx + " = $1") if filter_val is not None else ""}
         """,
         *args,
     )
@@ -133,8 +133,9 @@ async def get_nostalgia_pack(
         timestamp: datetime | None = None,
         conn: "asyncpg.pool.PoolConnectionProxy" = None,
 ) -> list[MinimalMap]:
-    if timestamp is None:
-        timestamp = datetime.now()
+    args = [filter_val]
+    if timestamp is not None:
+        args.append(timestamp)
 
     payload = await conn.fetch(
         f"""
@@ -155,7 +156,7 @@ async def get_nostalgia_pack(
             rg.game_id, rg.category_id, rg.subcategory_id,
             rg.game_name, rg.category_name, rg.subcategory_name
         FROM maps m
-        JOIN latest_maps_meta($2) mlm
+        JOIN {maps_meta_at(timestamp, 2)} mlm
             ON mlm.code = m.code
         LEFT JOIN verified_current vc
             ON m.code = vc.map
@@ -168,8 +169,7 @@ async def get_nostalgia_pack(
         WHERE rm.game_id = $1
             AND deleted_on IS NULL
         """,
-        filter_val,
-        timestamp,
+        *args,
     )
 
     return [
@@ -195,129 +195,116 @@ async def get_nostalgia_pack(
     ]
 
 
+def map_lookup_probes(identifier: str) -> tuple[list[str], list[int]]:
+    """The keys and priorities of map_lookup_keys an identifier can match."""
+    placement_key = None
+    if identifier.isnumeric() and abs(int(identifier)) < 1000:  # Current version index
+        placement_key = str(int(identifier))
+    elif identifier.startswith("@") and identifier[1:].isnumeric():  # All versions idx
+        identifier = identifier[1:]
+        placement_key = f"@{int(identifier)}"
+
+    probes = [
+        (identifier, 1),
+        (identifier.lower(), 2),
+        (identifier.lower(), 4),
+        (identifier.replace(" ", "_").lower(), 4),
+        (identifier, 6),
+        (identifier.lower(), 7),
+    ]
+    if placement_key is not None:
+        probes.append((placement_key, 3))
+    return [key for key, _p in probes], [priority for _k, priority in probes]
+
+
+@cache_for(300, maxsize=1024)
+async def resolve_map_code(
+        identifier: str,
+        conn: "asyncpg.pool.PoolConnectionProxy" = None,
+) -> str | None:
+    """
+    Cached `lookup_map_code`. Must be cleared whenever a map changes, once it's committed,
+    and shouldn't be used in a transaction or it could cache changes that aren't.
+    """
+    return await lookup_map_code(identifier, conn=conn)
+
+
 @postgres
-async def get_map(
+async def lookup_map_code(
+        identifier: str,
+        conn: "asyncpg.pool.PoolConnectionProxy" = None,
+) -> str | None:
+    """
+    Returns the code of the map an identifier refers to: its code, name,
+    placement, or alias.
+    """
+    keys, priorities = map_lookup_probes(identifier)
+    return await conn.fetchval(
+        """
+        SELECT k.code
+        FROM map_lookup_keys k
+        JOIN UNNEST($1::text[], $2::int[]) AS probe(key, priority)
+            ON k.key = probe.key
+            AND k.priority = probe.priority
+        ORDER BY k.priority, k.code
+        LIMIT 1
+        """,
+        keys, priorities,
+    )
+
+
+@postgres
+async def get_map_row(
         code: str,
-        partial: bool = False,
         timestamp: datetime | None = None,
         conn: "asyncpg.pool.PoolConnectionProxy" = None,
-) -> Map | PartialMap | None:
-    if timestamp is None:
-        timestamp = datetime.now()
+) -> "asyncpg.Record | None":
+    """Identifiers are resolved on the current list even if `timestamp` is given."""
+    resolve = lookup_map_code if conn.is_in_transaction() else resolve_map_code
+    map_code = await resolve(code, conn=conn)
+    if map_code is None:
+        return None
+    payload = await get_map_rows([map_code], timestamp=timestamp, conn=conn)
+    return payload[0] if len(payload) else None
 
-    columns = """
-        m.code, m.name, mlm.placement_curver, mlm.placement_allver, mlm.difficulty, m.r6_start,
-        m.map_data, mlm.deleted_on, mlm.optimal_heros, m.map_preview_url, mlm.botb_difficulty,
-        mlm.remake_of
-        """
-    placement_union = ""
-    if code.isnumeric() and abs(int(code)) < 1000:  # Current version index
-        placement_union = f"""
-            UNION
-            
-            SELECT 3 AS ord, {columns}
-            FROM maps m
-            JOIN latest_maps_meta($3) mlm
-                ON m.code = mlm.code
-            WHERE mlm.placement_curver = $1::int
-                AND mlm.deleted_on IS NULL
-        """
-    elif code.startswith("@") and code[1:].isnumeric():  # All versions idx
-        code = code[1:]
-        placement_union = f"""
-            UNION
-            
-            SELECT 3 AS ord, {columns}
-            FROM maps m
-            JOIN latest_maps_meta($3) mlm
-                ON m.code = mlm.code
-            WHERE mlm.placement_allver = $1::int
-                AND mlm.deleted_on IS NULL
-        """
 
-    pl_map = await conn.fetchrow(
+@postgres
+async def get_map_rows(
+        codes: list[str],
+        timestamp: datetime | None = None,
+        conn: "asyncpg.pool.PoolConnectionProxy" = None,
+) -> list["asyncpg.Record"]:
+    mlm_source = maps_meta_at(timestamp, 2)
+    extra_args = [] if timestamp is None else [timestamp]
+    return await conn.fetch(
         f"""
-        WITH config_values AS (
-            SELECT
-                (SELECT value::int FROM config WHERE name='current_btd6_ver') AS current_btd6_ver
-        ),
-        verified_maps AS (
-            SELECT v.map, COUNT(*) > 0 AS is_verified
-            FROM verifications v
-            CROSS JOIN config_values cv
-            WHERE v.version=cv.current_btd6_ver
-            GROUP BY v.map
-        ),
-        possible_map AS (
-            SELECT *
-            FROM (
-                SELECT 1 AS ord, {columns}
-                FROM maps m
-                JOIN latest_maps_meta($3) mlm
-                    ON m.code = mlm.code
-                WHERE m.code = $1
-                    AND mlm.deleted_on IS NULL
-                
-                UNION
-                
-                SELECT 2 AS ord, {columns}
-                FROM maps m
-                JOIN latest_maps_meta($3) mlm
-                    ON m.code = mlm.code
-                WHERE LOWER(m.name) = LOWER($1)
-                    AND mlm.deleted_on IS NULL
-                
-                UNION
-                
-                SELECT 4 AS ord, {columns}
-                FROM maps m
-                JOIN map_list_meta mlm
-                    ON m.code = mlm.code
-                JOIN map_aliases a
-                    ON m.code = a.map
-                WHERE LOWER(a.alias) = LOWER($1)
-                    OR LOWER(a.alias) = LOWER($2)
-                
-                {placement_union}
-                
-                UNION
-
-                (
-                    SELECT 6 AS ord, {columns}
-                    FROM maps m
-                    JOIN map_list_meta mlm
-                        ON m.code = mlm.code
-                    WHERE m.code = $1
-                        AND mlm.deleted_on IS NOT NULL
-                    ORDER BY mlm.created_on DESC
-                )
-                
-                UNION
-
-                (
-                    SELECT 7 AS ord, {columns}
-                    FROM maps m
-                    JOIN map_list_meta mlm
-                        ON m.code = mlm.code
-                    WHERE LOWER(m.name) = LOWER($1)
-                        AND mlm.deleted_on IS NOT NULL
-                    ORDER BY mlm.created_on DESC
-                )
-            ) possible
-            ORDER BY ord
-            LIMIT 1
-        )
         SELECT
-            m.code, m.name, m.placement_curver, m.placement_allver, m.difficulty,
-            m.r6_start, m.map_data, v.is_verified, m.deleted_on,
-            m.optimal_heros, m.map_preview_url, m.botb_difficulty,
-            m.remake_of
-        FROM possible_map m
-        LEFT JOIN verified_maps v
-            ON v.map = m.code
+            m.code, m.name, mlm.placement_curver, mlm.placement_allver, mlm.difficulty,
+            m.r6_start, m.map_data, mlm.deleted_on, mlm.optimal_heros, m.map_preview_url,
+            mlm.botb_difficulty, mlm.remake_of,
+            (
+                SELECT TRUE
+                FROM verifications v
+                WHERE v.map = m.code
+                    AND v.version = (SELECT value::int FROM config WHERE name='current_btd6_ver')
+                LIMIT 1
+            ) AS is_verified
+        FROM maps m
+        JOIN {mlm_source} mlm
+            ON m.code = mlm.code
+        WHERE m.code = ANY($1::varchar(10)[])
         """,
-        code, code.replace(" ", "_"), timestamp,
+        codes, *extra_args,
     )
+
+
+async def get_map(
+        code: str,
+        partial: bool = False,
+        timestamp: datetime | None = None,
+        conn: "asyncpg.pool.PoolConnectionProxy" = None,
+) -> Map | PartialMap | None:
+    pl_map = await get_map_row(code, timestamp=timestamp, conn=conn)
     if pl_map is None:
         return None
 
@@ -338,59 +325,111 @@ async def get_map(
             pl_map["map_preview_url"],
         )
 
-    lccs = await get_lccs_for(map_code, conn=conn)
-    pl_codes = await conn.fetch("SELECT code, description FROM additional_codes WHERE belongs_to=$1", map_code)
-    pl_creat = await conn.fetch(
-        """
-        SELECT user_id, role, name
-        FROM creators c
-        JOIN users u
-            ON u.discord_id=c.user_id
-        WHERE map=$1
-        """,
-        map_code,
-    )
-    pl_verif = await conn.fetch(
-        f"""
-        WITH config_vars AS (
-            SELECT
-                {get_int_config("current_btd6_ver")} AS current_btd6_ver
-        )
-        SELECT user_id, version, name
-        FROM verifications v
-        CROSS JOIN config_vars cv
-        JOIN users u
-            ON u.discord_id=v.user_id
-        WHERE map=$1
-            AND (version=cv.current_btd6_ver OR version IS NULL)
-        ORDER BY version ASC NULLS FIRST
-        """,
-        map_code
-    )
-    pl_compat = await conn.fetch("SELECT status, version FROM mapver_compatibilities WHERE map=$1", map_code)
-    pl_aliases = await conn.fetch("SELECT alias FROM map_aliases WHERE map=$1", map_code)
+    return (await load_maps([pl_map], conn=conn))[0]
 
-    return Map(
-        map_code,
-        pl_map["name"],
-        pl_map["placement_curver"],
-        pl_map["placement_allver"],
-        pl_map["difficulty"],
-        pl_map["botb_difficulty"],
-        None if pl_map["remake_of"] is None else await get_retro_map(pl_map["remake_of"], conn=conn),
-        pl_map["r6_start"],
-        pl_map["map_data"],
-        pl_map["deleted_on"],
-        pl_map["optimal_heros"].split(";"),
-        pl_map["map_preview_url"],
-        [(row["user_id"], row["role"], row["name"]) for row in pl_creat],
-        [(row["code"], row["description"]) for row in pl_codes],
-        [(uid, ver/10 if ver else None, name) for uid, ver, name in pl_verif],
-        pl_map["is_verified"],
-        lccs,
-        pl_compat,
-        [row[0] for row in pl_aliases],
-    )
+
+async def get_maps(
+        codes: list[str],
+        conn: "asyncpg.pool.PoolConnectionProxy" = None,
+) -> list[Map]:
+    """Returns the maps with the given codes, in the same order, skipping the ones that don't exist."""
+    payload = await get_map_rows(codes, conn=conn)
+    rows = {row["code"]: row for row in payload}
+    return await load_maps([rows[code] for code in codes if code in rows], conn=conn)
+
+
+async def load_maps(
+        rows: list["asyncpg.Record"],
+        conn: "asyncpg.pool.PoolConnectionProxy" = None,
+) -> list[Map]:
+    """Builds full maps out of rows of get_map_rows, fetching each relation once for all of them."""
+    if not len(rows):
+        return []
+
+    codes = [row["code"] for row in rows]
+    retro_ids = list({row["remake_of"] for row in rows if row["remake_of"] is not None})
+    calls = [
+        functools.partial(get_lccs_for_maps, codes),
+        lambda conn: conn.fetch(
+            "SELECT belongs_to, code, description FROM additional_codes WHERE belongs_to = ANY($1::varchar(10)[])",
+            codes,
+        ),
+        lambda conn: conn.fetch(
+            """
+            SELECT map, user_id, role, name
+            FROM creators c
+            JOIN users u
+                ON u.discord_id=c.user_id
+            WHERE map = ANY($1::varchar(10)[])
+            """,
+            codes,
+        ),
+        lambda conn: conn.fetch(
+            f"""
+            WITH config_vars AS (
+                SELECT
+                    {get_int_config("current_btd6_ver")} AS current_btd6_ver
+            )
+            SELECT map, user_id, version, name
+            FROM verifications v
+            CROSS JOIN config_vars cv
+            JOIN users u
+                ON u.discord_id=v.user_id
+            WHERE map = ANY($1::varchar(10)[])
+                AND (version=cv.current_btd6_ver OR version IS NULL)
+            ORDER BY version ASC NULLS FIRST, user_id ASC
+            """,
+            codes,
+        ),
+        lambda conn: conn.fetch(
+            "SELECT map, status, version FROM mapver_compatibilities WHERE map = ANY($1::varchar(10)[])",
+            codes,
+        ),
+        lambda conn: conn.fetch("SELECT map, alias FROM map_aliases WHERE map = ANY($1::varchar(10)[])", codes),
+    ]
+    if len(retro_ids):
+        calls.append(functools.partial(get_retro_maps_by_id, retro_ids))
+    lccs, pl_codes, pl_creat, pl_verif, pl_compat, pl_aliases, *retro_maps = \
+        await src.db.connection.fan_out(*calls, conn=conn)
+    retro_maps = {rm.id: rm for rm in retro_maps[0]} if len(retro_maps) else {}
+
+    def by_map(records: list, get_code=lambda r: r["map"]) -> dict[str, list]:
+        grouped = {code: [] for code in codes}
+        for record in records:
+            grouped[get_code(record)].append(record)
+        return grouped
+
+    lccs = by_map(lccs, lambda lcc: lcc.map)
+    pl_codes = by_map(pl_codes, lambda r: r["belongs_to"])
+    pl_creat = by_map(pl_creat)
+    pl_verif = by_map(pl_verif)
+    pl_compat = by_map(pl_compat)
+    pl_aliases = by_map(pl_aliases)
+
+    return [
+        Map(
+            row["code"],
+            row["name"],
+            row["placement_curver"],
+            row["placement_allver"],
+            row["difficulty"],
+            row["botb_difficulty"],
+            retro_maps.get(row["remake_of"]),
+            row["r6_start"],
+            row["map_data"],
+            row["deleted_on"],
+            row["optimal_heros"].split(";"),
+            row["map_preview_url"],
+            [(r["user_id"], r["role"], r["name"]) for r in pl_creat[row["code"]]],
+            [(r["code"], r["description"]) for r in pl_codes[row["code"]]],
+            [(r["user_id"], r["version"]/10 if r["version"] else None, r["name"]) for r in pl_verif[row["code"]]],
+            row["is_verified"],
+            lccs[row["code"]],
+            [(r["status"], r["version"]) for r in pl_compat[row["code"]]],
+            [r["alias"] for r in pl_aliases[row["code"]]],
+        )
+        for row in rows
+    ]
 
 
 def parse_runs_payload(
@@ -424,7 +463,7 @@ def parse_runs_payload(
 
 
 @postgres
-async def get_lccs_for(map_code: str, conn=None) -> list[ListCompletion]:
+async def get_lccs_for_maps(map_codes: list[str], conn=None) -> list[ListCompletion]:
     payload = await conn.fetch(
         """
         SELECT DISTINCT ON (run_id)
@@ -447,11 +486,11 @@ async def get_lccs_for(map_code: str, conn=None) -> list[ListCompletion]:
             ON ply.user_id = u.discord_id
         LEFT JOIN completion_proofs cp
             ON cp.run = cm.completion
-        WHERE lbm.map = $1
+        WHERE lbm.map = ANY($1::varchar(10)[])
             AND cm.accepted_by IS NOT NULL
             AND cm.deleted_on IS NULL
         """,
-        map_code,
+        map_codes,
     )
     if not len(payload):
         return []
@@ -543,7 +582,7 @@ async def map_exists_in_format(
         f"""
         SELECT m.code
         FROM maps m
-        JOIN latest_maps_meta(NOW()::timestamp) mlm
+        JOIN current_map_list_meta mlm
             ON mlm.code = m.code
         WHERE m.code = $1
             AND mlm.{format_keys[format_id]} IS NOT NULL
@@ -560,7 +599,7 @@ async def alias_exists(alias: str, conn=None) -> bool:
         """
         SELECT al.alias
         FROM map_aliases al
-        JOIN latest_maps_meta(NOW()::timestamp) m
+        JOIN current_map_list_meta m
             ON m.code = al.map
         WHERE al.alias=$1
             AND m.deleted_on IS NULL
@@ -807,7 +846,7 @@ async def get_remake_of_code(
         """
         SELECT 
             code
-        FROM latest_maps_meta(NOW()::timestamp)
+        FROM current_map_list_meta
         WHERE remake_of = $1
             AND deleted_on IS NULL
         """,
@@ -835,7 +874,7 @@ async def set_map_list_meta(
                 {"$5::int" if "difficulty" in kwargs else "difficulty"},
                 {"$6::int" if "botb_difficulty" in kwargs else "botb_difficulty"},
                 {"$7::int" if "remake_of" in kwargs else "remake_of"}
-            FROM latest_maps_meta(NOW()::timestamp)
+            FROM current_map_list_meta
             WHERE code = $1::varchar(10)
                 AND deleted_on IS NULL
 
@@ -977,7 +1016,7 @@ async def update_list_placements(
             {curver_selector},
             {allver_selector},
             code, difficulty, botb_difficulty, optimal_heros
-        FROM latest_maps_meta(NOW()::timestamp) mlm
+        FROM current_map_list_meta mlm
         WHERE mlm.deleted_on IS NULL
             AND ({" OR ".join(selectors)})
             AND mlm.code != $1
@@ -1020,7 +1059,7 @@ async def delete_map(
                     ELSE NULL
                 END,
                 mlm.optimal_heros
-            FROM latest_maps_meta(NOW()::timestamp) mlm
+            FROM current_map_list_meta mlm
             WHERE mlm.deleted_on IS NULL
                 AND mlm.code = $1::varchar(10)
             RETURNING id, placement_allver, placement_curver
@@ -1062,7 +1101,7 @@ async def get_legacy_maps(conn=None) -> list[MinimalMap]:
             placement_curver,
             map_preview_url
         FROM maps m
-        JOIN latest_maps_meta(NOW()::timestamp) mlm
+        JOIN current_map_list_meta mlm
             ON m.code = mlm.code
         LEFT JOIN verified_current vc
             ON m.code=vc.map
@@ -1122,6 +1161,43 @@ async def get_retro_maps(conn: "asyncpg.pool.PoolConnectionProxy" = None) -> lis
     ]
 
 
+@postgres
+async def get_retro_maps_by_id(
+        map_ids: list[int],
+        conn: "asyncpg.pool.PoolConnectionProxy" = None,
+) -> list[RetroMap]:
+    payload = await conn.fetch(
+        """
+        SELECT
+            rm.name, rm.id, rm.sort_order, rm.preview_url, rm.game_id, rm.category_id, rm.subcategory_id,
+            rg.game_name, rg.category_name, rg.subcategory_name
+        FROM retro_maps rm
+        JOIN retro_games rg
+            ON rm.game_id = rg.game_id
+            AND rm.category_id = rg.category_id
+            AND rm.subcategory_id = rg.subcategory_id
+        WHERE id = ANY($1::int[])
+        """,
+        map_ids,
+    )
+
+    return [
+        RetroMap(
+            row["id"],
+            row["name"],
+            row["sort_order"],
+            row["preview_url"],
+            row["game_id"],
+            row["category_id"],
+            row["subcategory_id"],
+            row["game_name"],
+            row["category_name"],
+            row["subcategory_name"],
+        )
+        for row in payload
+    ]
+
+
 @postgres
 async def get_retro_map(map_id: int, conn: "asyncpg.pool.PoolConnectionProxy" = None) -> RetroMap | None:
     payload = await conn.fetchrow(
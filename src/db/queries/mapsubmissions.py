@@ -1,5 +1,7 @@
 import asyncio
+from datetime import datetime
 import src.db.connection
+from src.utils.cache import cache_for
 from src.utils.formats.formats import format_keys
 from src.db.models import (
     MapSubmission,
@@ -91,22 +93,22 @@ async def get_map_submission(
     return None if len(result) == 0 else result[0]
 
 
-@postgres
-async def get_map_submissions(
-        omit_rejected: bool = True,
-        idx_start: int = 0,
-        amount: int = 50,
-        on_code: str = None,
-        on_formats: list[int] = None,
-        conn: "asyncpg.pool.PoolConnectionProxy" = None,
-) -> tuple[int, list[MapSubmission]]:
+def map_submissions_filters(
+        omit_rejected: bool,
+        on_code: str | None,
+        on_formats: list[int] | None,
+        pg_idx: int,
+) -> tuple[str, list]:
+    """
+    Returns the FROM and WHERE clauses for the submissions listing, with
+    parameters numbered from `pg_idx`, and the arguments to pass along.
+    """
     join_clause = " OR ".join([
         f"ms.format_id = {format_id} AND m.{format_keys[format_id]} IS NOT NULL"
         for format_id in format_keys
     ])
 
-    args = [amount, idx_start]
-    pg_idx = 3
+    args = []
 
     filter_code = ""
     if on_code is not None:
@@ -116,17 +118,11 @@ async def get_map_submissions(
 
     filter_formats = ""
     if on_formats is not None:
-        args.append(on_formats)
+        args.append(list(on_formats))
         filter_formats = f"AND ms.format_id = ANY(${pg_idx}::int[])"
         pg_idx += 1
 
-    payload = await conn.fetch(
-        f"""
-        SELECT
-            COUNT(*) OVER() AS total_count,
-            ms.code, ms.submitter, ms.subm_notes, ms.format_id, ms.proposed,
-            ms.rejected_by, ms.created_on, ms.completion_proof, ms.wh_data, ms.wh_msg_id, 
-            ms.id
+    return f"""
         FROM map_submissions ms
         LEFT JOIN map_list_meta m
             ON ms.code = m.code
@@ -138,9 +134,50 @@ async def get_map_submissions(
             {"AND ms.rejected_by IS NULL" if omit_rejected else ""}
             {filter_code}
             {filter_formats}
-        ORDER BY ms.created_on DESC
+    """, args
+
+
+@postgres
+async def get_map_submissions(
+        omit_rejected: bool = True,
+        idx_start: int = 0,
+        amount: int = 50,
+        on_code: str = None,
+        on_formats: list[int] = None,
+        after: tuple[datetime, int] | None = None,
+        conn: "asyncpg.pool.PoolConnectionProxy" = None,
+) -> tuple[int, list[MapSubmission]]:
+    """
+    If `after` is the (created_on, id) of a submission, returns the ones
+    right after it instead of skipping `idx_start` rows.
+    """
+    args = [amount]
+    if after is None:
+        args.append(idx_start)
+        total_count = "COUNT(*) OVER()"
+        filter_after = ""
+        offset = "OFFSET $2"
+    else:
+        args.extend(after)
+        total_count = "0"
+        filter_after = "AND (ms.created_on, ms.id) < ($2, $3)"
+        offset = ""
+
+    from_where, filter_args = map_submissions_filters(omit_rejected, on_code, on_formats, len(args) + 1)
+    args += filter_args
+
+    payload = await conn.fetch(
+        f"""
+        SELECT
+            {total_count} AS total_count,
+            ms.code, ms.submitter, ms.subm_notes, ms.format_id, ms.proposed,
+            ms.rejected_by, ms.created_on, ms.completion_proof, ms.wh_data, ms.wh_msg_id, 
+            ms.id
+        {from_where}
+            {filter_after}
+        ORDER BY ms.created_on DESC, ms.id DESC
         LIMIT $1
-        OFFSET $2
+        {offset}
         """,
         *args,
     )
@@ -160,9 +197,29 @@ async def get_map_submissions(
         ) for row in payload
     ]
 
+    if after is not None:
+        total = await get_map_submissions_count(
+            omit_rejected,
+            on_code,
+            tuple(on_formats) if on_formats is not None else None,
+            conn=conn,
+        )
+        return total, submissions
     return 0 if not len(payload) else payload[0]["total_count"], submissions
 
 
+@cache_for(10)
+@postgres
+async def get_map_submissions_count(
+        omit_rejected: bool,
+        on_code: str | None,
+        on_formats: tuple[int, ...] | None,
+        conn: "asyncpg.pool.PoolConnectionProxy" = None,
+) -> int:
+    from_where, args = map_submissions_filters(omit_rejected, on_code, on_formats, 1)
+    return await conn.fetchval(f"SELECT COUNT(*) {from_where}", *args)
+
+
 @postgres
 async def reject_submission(
         code: str,
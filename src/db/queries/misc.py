@@ -1,7 +1,7 @@
 import asyncio
 from typing import Any
 import src.db.connection
-from src.db.models import Config
+from src.db.models import Config, PointsTable
 postgres = src.db.connection.postgres
 
 
@@ -55,6 +55,24 @@ async def get_config(conn: "asyncpg.pool.PoolConnectionProxy" = None) -> ConfigV
     })
 
 
+@postgres
+async def get_points_table(conn: "asyncpg.pool.PoolConnectionProxy" = None) -> PointsTable:
+    payload = await conn.fetch(
+        """
+        SELECT
+            pm.version, lp.placement, lp.points
+        FROM points_modifiers pm
+        LEFT JOIN listmap_points lp
+            ON TRUE
+        """
+    )
+
+    return PointsTable(
+        payload[0]["version"],
+        {row["placement"]: float(row["points"]) for row in payload if row["placement"] is not None},
+    )
+
+
 @postgres
 async def update_config(
         config: dict[str, Any],
@@ -1,6 +1,7 @@
 import asyncio
 import src.db.connection
 from src.db.models import Role
+from src.db.queries.users import invalidate_user_perms_if_committed
 postgres = src.db.connection.postgres
 
 
@@ -43,6 +44,7 @@ async def add_roles(uid: str | int, role_ids: list[int], conn=None) -> None:
         """,
         [(uid, rid) for rid in role_ids],
     )
+    invalidate_user_perms_if_committed(uid, conn)
 
 
 @postgres
@@ -57,3 +59,4 @@ async def remove_roles(uid: str | int, role_ids: list[int], conn=None) -> None:
         """,
         uid, role_ids,
     )
+    invalidate_user_perms_if_committed(uid, conn)
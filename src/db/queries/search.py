@@ -1,82 +1,131 @@
-import asyncio
 from src.utils.types import SearchEntity
 import src.db.connection
 from src.db.models import PartialMap, PartialUser
 postgres = src.db.connection.postgres
 
 
+def escape_like(query: str) -> str:
+    return query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def parse_map_row(row) -> PartialMap:
+    return PartialMap(
+        row["code"],
+        row["name"],
+        row["placement_curver"],
+        row["placement_allver"],
+        row["difficulty"],
+        row["botb_difficulty"],
+        row["remake_of"],
+        row["r6_start"],
+        row["map_data"],
+        None,
+        row["optimal_heros"].split(";"),
+        row["map_preview_url"],
+    )
+
+
 @postgres
 async def search(
         query: str,
         entities: list[SearchEntity],
         limit: int, conn=None
-) -> list[PartialMap | PartialUser]:
-    results = []
-
-    if "map" in entities:
-        payload = await conn.fetch(
-            """
-            SELECT
-                m.code, m.name, mlm.placement_curver, mlm.placement_allver, mlm.difficulty,
-                m.r6_start, m.map_data, mlm.optimal_heros, m.map_preview_url, mlm.botb_difficulty,
-                mlm.remake_of,
-                SIMILARITY(m.name, $1) AS simil
+) -> list[tuple[float, PartialMap | PartialUser]]:
+    """
+    Searches map names, codes, aliases and usernames by similarity or prefix,
+    ranked by `search_rank`.
+    """
+    payload = await conn.fetch(
+        """
+        WITH map_matches AS (
+            SELECT m.code, search_rank(m.name, $1) AS rank
             FROM maps m
-            JOIN latest_maps_meta(NOW()::timestamp) mlm
-                ON m.code = mlm.code
-            WHERE mlm.deleted_on IS NULL
-                AND SIMILARITY(m.name, $1) > 0.1
-            ORDER BY simil DESC
-            LIMIT $2
-            """,
-            query, limit
+            WHERE $4
+                AND (m.name % $1 OR m.name ILIKE $2 OR m.name ILIKE '% ' || $2)
+
+            UNION ALL
+
+            SELECT m.code, search_rank(m.code, $1)
+            FROM maps m
+            WHERE $4
+                AND m.code ILIKE $2
+
+            UNION ALL
+
+            SELECT a.map, search_rank(a.alias, $1)
+            FROM map_aliases a
+            WHERE $4
+                AND (a.alias % $1 OR a.alias ILIKE $2 OR a.alias ILIKE '% ' || $2)
+        ),
+        best_maps AS (
+            SELECT mm.code, MAX(mm.rank) AS rank
+            FROM map_matches mm
+            GROUP BY mm.code
         )
-        results += [
-            (
-                row["simil"],
-                PartialMap(
-                    row["code"],
-                    row["name"],
-                    row["placement_curver"],
-                    row["placement_allver"],
-                    row["difficulty"],
-                    row["botb_difficulty"],
-                    row["remake_of"],
-                    row["r6_start"],
-                    row["map_data"],
-                    None,
-                    row["optimal_heros"].split(";"),
-                    row["map_preview_url"],
-                ),
-            )
-            for row in payload
-        ]
-
-    if "user" in entities:
-        payload = await conn.fetch(
-            """
-            SELECT
-                discord_id, name, is_banned,
-                SIMILARITY(name, $1) AS simil
-            FROM users
-            WHERE SIMILARITY(name, $1) > 0.1
-            ORDER BY simil DESC
-            LIMIT $2
-            """,
-            query, limit
+        SELECT
+            'map' AS type, bm.rank,
+            m.code, m.name, mlm.placement_curver, mlm.placement_allver, mlm.difficulty,
+            m.r6_start, m.map_data, mlm.optimal_heros, m.map_preview_url, mlm.botb_difficulty,
+            mlm.remake_of,
+            NULL AS discord_id, NULL AS is_banned
+        FROM best_maps bm
+        JOIN maps m
+            ON m.code = bm.code
+        JOIN current_map_list_meta mlm
+            ON m.code = mlm.code
+        WHERE mlm.deleted_on IS NULL
+
+        UNION ALL
+
+        SELECT
+            'user', search_rank(u.name, $1),
+            NULL, u.name, NULL, NULL, NULL,
+            NULL, NULL, NULL, NULL, NULL,
+            NULL,
+            u.discord_id, u.is_banned
+        FROM users u
+        WHERE $5
+            AND (u.name % $1 OR u.name ILIKE $2 OR u.name ILIKE '% ' || $2)
+
+        ORDER BY rank DESC, name ASC
+        LIMIT $3
+        """,
+        query, escape_like(query) + "%", limit, "map" in entities, "user" in entities,
+    )
+
+    return [
+        (
+            row["rank"],
+            parse_map_row(row) if row["type"] == "map" else
+            PartialUser(
+                row["discord_id"],
+                row["name"],
+                None,
+                True,
+                row["is_banned"],
+            ),
         )
-        results += [
-            (
-                row["simil"],
-                PartialUser(
-                    row["discord_id"],
-                    row["name"],
-                    None,
-                    True,
-                    row["is_banned"],
-                ),
-            )
-            for row in payload
-        ]
-
-    return sorted(results, key=lambda x: x[0], reverse=True)[:limit]
+        for row in payload
+    ]
+
+
+@postgres
+async def get_searchable_maps(conn=None) -> list[tuple[PartialMap, list[str]]]:
+    """Returns every map that can be searched, along with its aliases."""
+    payload = await conn.fetch(
+        """
+        SELECT
+            m.code, m.name, mlm.placement_curver, mlm.placement_allver, mlm.difficulty,
+            m.r6_start, m.map_data, mlm.optimal_heros, m.map_preview_url, mlm.botb_difficulty,
+            mlm.remake_of,
+            ARRAY_REMOVE(ARRAY_AGG(a.alias), NULL) AS aliases
+        FROM maps m
+        JOIN current_map_list_meta mlm
+            ON m.code = mlm.code
+        LEFT JOIN map_aliases a
+            ON m.code = a.map
+        WHERE mlm.deleted_on IS NULL
+        GROUP BY m.code, mlm.code
+        """
+    )
+    return [(parse_map_row(row), row["aliases"]) for row in payload]
@@ -86,7 +86,7 @@ async def get_completion_submissions_by_user(
             mlm.placement_curver, mlm.placement_allver, mlm.difficulty, mlm.botb_difficulty, mlm.remake_of, mlm.optimal_heros
         FROM user_submissions us
         JOIN maps m ON us.map = m.code
-        JOIN latest_maps_meta(NOW()::timestamp) mlm ON m.code = mlm.code
+        JOIN current_map_list_meta mlm ON m.code = mlm.code
         ORDER BY us.created_on DESC
         LIMIT 50 OFFSET $2
     """
@@ -1,7 +1,10 @@
 import asyncio
 from datetime import datetime
+from functools import partial
 import src.db.connection
 from src.utils.misc import list_rm_dupe
+from src.utils.cache import cache_for
+from src.db.queries.subqueries import maps_meta_at
 from src.db.models import (
     User,
     PartialUser,
@@ -16,7 +19,6 @@ from src.db.models import (
     Permissions,
     MinimalUser,
 )
-from src.db.queries.subqueries import leaderboard_name
 postgres = src.db.connection.postgres
 
 FormatPlacement = tuple[float, int | None]
@@ -69,14 +71,52 @@ async def get_completions_by(
         idx_start: int = 0,
         amount: int = 50,
         timestamp: datetime | None = None,
+        after: tuple[str, bool, bool, bool, int] | None = None,
         conn: "asyncpg.pool.PoolConnectionProxy" = None,
 ) -> tuple[list[ListCompletion], int]:
-    if timestamp is None:
-        timestamp = datetime.now()
-
+    """
+    If `after` is the (map_code, black_border, no_geraldo, current_lcc, run_id)
+    of a run, returns the runs right after it instead of skipping `idx_start` rows.
+    """
     extra_args = []
+    filter_formats = ""
     if len(formats):
         extra_args.append(formats)
+        filter_formats = f"AND r.format = ANY(${3 + len(extra_args)}::int[])"
+
+    total_count = "COUNT(*) OVER()"
+    after_idx = None
+    if after is not None:
+        idx_start = 0
+        after_idx = 4 + len(extra_args)
+        extra_args.extend(after)
+        total_count = "0"
+
+    mlm_source = maps_meta_at(timestamp, 4 + len(extra_args))
+    if timestamp is not None:
+        extra_args.append(timestamp)
+
+    page_after = ""
+    if after_idx is not None:
+        # The page is cut out before aggregating, so only its runs are read.
+        # Booleans are sorted DESC, so they're compared negated
+        page_after = f"""
+                    AND (c.map, NOT r.black_border, NOT r.no_geraldo, NOT (r.lcc = lccs.id AND lccs.id IS NOT NULL), c.id)
+                        > (${after_idx}, NOT ${after_idx+1}::boolean, NOT ${after_idx+2}::boolean, NOT ${after_idx+3}::boolean, ${after_idx+4}::int)
+                    AND EXISTS (
+                        SELECT 1
+                        FROM {mlm_source} amlm
+                        WHERE amlm.code = c.map
+                            AND amlm.deleted_on IS NULL
+                    )
+                ORDER BY
+                    c.map ASC,
+                    r.black_border DESC,
+                    r.no_geraldo DESC,
+                    current_lcc DESC,
+                    c.id ASC
+                LIMIT $3
+        """
 
     async with conn.transaction():
         # I give up bro this planner cant do planning
@@ -100,9 +140,10 @@ async def get_completions_by(
                 LEFT JOIN lccs_by_map lccs
                     ON lccs.id = r.lcc
                 WHERE ply.user_id = $1
-                    {'AND r.format = ANY($5::int[])' if len(formats) > 0 else ''}
+                    {filter_formats}
                     AND r.accepted_by IS NOT NULL
                     AND r.deleted_on IS NULL
+                    {page_after}
             ),
             unique_runs AS (
                 SELECT DISTINCT ON (rwf.run_id)
@@ -126,26 +167,27 @@ async def get_completions_by(
                     ON cp.run = rwf.run_id
                 LEFT JOIN leastcostchimps lccs
                     ON rwf.lcc = lccs.id
-                JOIN latest_maps_meta($4) mlm
+                JOIN {mlm_source} mlm
                     ON mlm.code = rwf.map
                 JOIN maps m
                     ON m.code = mlm.code
                 WHERE mlm.deleted_on IS NULL
             )
-            SELECT COUNT(*) OVER() AS total_count, uq.*
+            SELECT {total_count} AS total_count, uq.*
             FROM unique_runs uq
             ORDER BY
                 uq.map ASC,
                 uq.black_border DESC,
                 uq.no_geraldo DESC,
-                uq.current_lcc DESC
+                uq.current_lcc DESC,
+                uq.run_id ASC
             LIMIT $3
             OFFSET $2
             """,
-            int(uid), idx_start, amount, timestamp, *extra_args,
+            int(uid), idx_start, amount, *extra_args,
         )
 
-    return [
+    completions = [
         ListCompletion(
             row["run_id"],
             PartialMap(
@@ -173,7 +215,49 @@ async def get_completions_by(
             row["subm_notes"],
         )
         for row in payload
-    ], payload[0][0] if len(payload) else 0
+    ]
+
+    if after is not None:
+        return completions, await get_completions_by_count(int(uid), tuple(formats), timestamp, conn=conn)
+    return completions, payload[0][0] if len(payload) else 0
+
+
+@cache_for(10)
+@postgres
+async def get_completions_by_count(
+        uid: int,
+        formats: tuple[int, ...],
+        timestamp: datetime | None = None,
+        conn: "asyncpg.pool.PoolConnectionProxy" = None,
+) -> int:
+    extra_args = []
+    filter_formats = ""
+    if len(formats):
+        extra_args.append(list(formats))
+        filter_formats = f"AND r.format = ANY(${1 + len(extra_args)}::int[])"
+
+    mlm_source = maps_meta_at(timestamp, 2 + len(extra_args))
+    if timestamp is not None:
+        extra_args.append(timestamp)
+
+    return await conn.fetchval(
+        f"""
+        SELECT COUNT(DISTINCT c.id)
+        FROM latest_completions r
+        JOIN completions c
+            ON r.completion = c.id
+        JOIN comp_players ply
+            ON ply.run = r.id
+        JOIN {mlm_source} mlm
+            ON mlm.code = c.map
+        WHERE ply.user_id = $1
+            {filter_formats}
+            AND r.accepted_by IS NOT NULL
+            AND r.deleted_on IS NULL
+            AND mlm.deleted_on IS NULL
+        """,
+        uid, *extra_args,
+    )
 
 
 @postgres
@@ -206,7 +290,7 @@ async def get_min_completions_by(uid: str | int, conn=None) -> list[ListCompleti
         FROM runs_with_flags rwf
         JOIN comp_players ply
             ON ply.run = rwf.run_meta_id
-        JOIN latest_maps_meta(NOW()::timestamp) m
+        JOIN current_map_list_meta m
             ON m.code = rwf.map
         WHERE ply.user_id = $1
             AND m.deleted_on IS NULL
@@ -239,25 +323,25 @@ async def get_maps_created_by(
         timestamp: datetime | None = None,
         conn: "asyncpg.pool.PoolConnectionProxy" = None,
 ) -> list[PartialMap]:
-    if timestamp is None:
-        timestamp = datetime.now()
+    args = [int(uid)]
+    if timestamp is not None:
+        args.append(timestamp)
 
     payload = await conn.fetch(
-        """
+        f"""
         SELECT
             m.code, m.name, mlm.placement_curver, mlm.placement_allver, mlm.difficulty,
             m.r6_start, m.map_data, mlm.optimal_heros, m.map_preview_url,
             mlm.botb_difficulty, mlm.remake_of
         FROM maps m
-        JOIN latest_maps_meta($2) mlm
+        JOIN {maps_meta_at(timestamp, 2)} mlm
             ON m.code = mlm.code
         JOIN creators c
             ON m.code = c.map
         WHERE c.user_id = $1
             AND mlm.deleted_on IS NULL
         """,
-        int(uid),
-        timestamp,
+        *args,
     )
     return [
         PartialMap(
@@ -284,11 +368,12 @@ async def get_user_medals(
         timestamp: datetime | None = None,
         conn: "asyncpg.pool.PoolConnectionProxy" = None,
 ) -> MaplistMedals:
-    if timestamp is None:
-        timestamp = datetime.now()
+    args = [int(uid)]
+    if timestamp is not None:
+        args.append(timestamp)
 
     payload = await conn.fetch(
-        """
+        f"""
         WITH runs_with_flags AS (
             SELECT
                 r.*,
@@ -301,7 +386,7 @@ async def get_user_medals(
         ),
         valid_maps AS MATERIALIZED (
             SELECT *
-            FROM latest_maps_meta($2::timestamp)
+            FROM {maps_meta_at(timestamp, 2)}
             WHERE deleted_on IS NULL
         ),
         medals_per_map AS (
@@ -327,8 +412,7 @@ async def get_user_medals(
             COUNT(CASE WHEN current_lcc THEN 1 END) AS current_lcc
         FROM medals_per_map
         """,
-        int(uid),
-        timestamp
+        *args
     )
 
     return MaplistMedals(
@@ -351,35 +435,14 @@ async def get_user_placements(
     if isinstance(uid, str):
         uid = int(uid)
 
-    points_lb = leaderboard_name(format_id, "points")
-    points_query = ""
-    if points_lb:
-        points_query = f"""
-        UNION ALL
-        SELECT 'points' AS lb_type, user_id, score, placement
-        FROM {points_lb}
-        """
-
     rows = await conn.fetch(
-        f"""
-        SELECT *
-        FROM (
-            SELECT 'lccs' AS lb_type, user_id, score, placement
-            FROM {leaderboard_name(format_id, "lccs")}
-            
-            UNION ALL 
-            SELECT 'no_geraldo' AS lb_type, user_id, score, placement
-            FROM {leaderboard_name(format_id, "no_geraldo")}
-            
-            UNION ALL 
-            SELECT 'black_border' AS lb_type, user_id, score, placement
-            FROM {leaderboard_name(format_id, "black_border")}
-            
-            {points_query}
-        ) AS all_format_lbs
+        """
+        SELECT lb_type, score, placement
+        FROM leaderboard_entries
         WHERE user_id = $1
+            AND lb_format = $2
         """,
-        uid
+        uid, format_id
     )
 
     positions = [
@@ -395,7 +458,8 @@ async def get_user_placements(
         "black_border": 3,
     }
     for row in rows:
-        positions[pos_to_index[row["lb_type"]]] = (row["score"], row["placement"])
+        score = row["score"] if row["lb_type"] == "points" else int(row["score"])
+        positions[pos_to_index[row["lb_type"]]] = (score, row["placement"])
 
     return MaplistProfile(*[
         x  # Flatten the list pretty much
@@ -425,7 +489,6 @@ async def get_minimal_profile(
     )
 
 
-@postgres
 async def get_user(
         id: str,
         with_completions: bool = False,
@@ -433,18 +496,25 @@ async def get_user(
         minimal: bool = False,
         conn: "asyncpg.pool.PoolConnectionProxy" = None,
 ) -> PartialUser | None:
-    if timestamp is None:
-        timestamp = datetime.now()
-
     puser = await get_user_min(id, conn=conn)
     if not puser:
         return None
     if minimal:
         return puser
 
-    comps = []
+    lb_formats = [1, 2, 51]
+    calls = [partial(get_user_placements, id, format_id) for format_id in lb_formats]
+    calls += [
+        partial(get_maps_created_by, id, timestamp=timestamp),
+        partial(get_user_medals, id),
+        partial(get_user_roles, puser.id),
+        partial(get_user_achievement_roles, puser.id),
+    ]
     if with_completions:
-        comps = await get_min_completions_by(id, conn=conn)
+        calls.append(partial(get_min_completions_by, id))
+    results = await src.db.connection.fan_out(*calls, conn=conn)
+    placements = results[:len(lb_formats)]
+    created_maps, medals, roles, achievement_roles = results[len(lb_formats):len(lb_formats)+4]
 
     return User(
         puser.id,
@@ -452,15 +522,12 @@ async def get_user(
         puser.oak,
         puser.has_seen_popup,
         puser.is_banned,
-        {
-            format_id: await get_user_placements(id, format_id, conn=conn)
-            for format_id in [1, 2, 51]
-        },
-        await get_maps_created_by(id, timestamp=timestamp, conn=conn),
-        comps,
-        await get_user_medals(id, conn=conn),
-        await get_user_roles(puser.id, conn=conn),
-        await get_user_achievement_roles(puser.id, conn=conn),
+        dict(zip(lb_formats, placements)),
+        created_maps,
+        results[-1] if with_completions else [],
+        medals,
+        roles,
+        achievement_roles,
     )
 
 
@@ -498,6 +565,7 @@ async def create_user(
             """,
             uid,
         )
+        invalidate_user_perms_if_committed(uid, conn)
 
     return inserted
 
@@ -693,14 +761,40 @@ async def get_user_achievement_roles(uid: str | int, conn=None) -> list[Achievem
     ]
 
 
-@postgres
 async def get_user_perms(
         uid: str | int,
         conn: "asyncpg.pool.PoolConnectionProxy" = None
 ) -> Permissions:
+    """Cached for a few seconds. Must call `invalidate_user_perms` after changing someone's roles."""
     if isinstance(uid, str):
         uid = int(uid)
+    return await get_user_perms_by_id(uid, conn=conn)
+
+
+def invalidate_user_perms(uid: str | int | None = None) -> None:
+    """If `uid` is None, invalidates everyone's permissions."""
+    if uid is None:
+        get_user_perms_by_id.clear()
+    else:
+        get_user_perms_by_id.invalidate(int(uid))
 
+
+def invalidate_user_perms_if_committed(uid: str | int, conn: "asyncpg.pool.PoolConnectionProxy") -> None:
+    """
+    Invalidates someone's permissions after changing them on `conn`, unless it's in a transaction.
+    Otherwise they could be loaded again before it commits, and it's up to whoever commits it.
+    Edits made in `src.log.logged_edit` are invalidated by `src.log.log_action`.
+    """
+    if not conn.is_in_transaction():
+        invalidate_user_perms(uid)
+
+
+@cache_for(10, maxsize=1024)
+@postgres
+async def get_user_perms_by_id(
+        uid: int,
+        conn: "asyncpg.pool.PoolConnectionProxy" = None
+) -> Permissions:
     payload = await conn.fetch(
         """
         SELECT
@@ -744,6 +838,7 @@ async def ban_user(
             """,
             uid,
         )
+    invalidate_user_perms_if_committed(uid, conn)
 
 
 @postgres
@@ -777,3 +872,4 @@ async def unban_user(
             """,
             uid,
         )
+    invalidate_user_perms_if_committed(uid, conn)
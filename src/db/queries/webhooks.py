@@ -0,0 +1,143 @@
+import json
+from typing import Literal
+import src.db.connection
+postgres = src.db.connection.postgres
+
+WebhookAction = Literal["post", "patch", "delete"]
+WebhookEntity = Literal["completion", "map_submission"]
+
+
+@postgres
+async def enqueue_webhooks(
+        messages: list[tuple[str, WebhookAction, str | None, dict | None, WebhookEntity | None, int | None]],
+        conn=None,
+) -> None:
+    """Adds (hook_url, action, message_id, payload, entity_type, entity_id) rows to the outbox."""
+    await conn.executemany(
+        """
+        INSERT INTO webhook_outbox
+            (hook_url, action, message_id, payload, entity_type, entity_id)
+        VALUES ($1, $2, $3, $4::jsonb, $5, $6)
+        """,
+        [
+            (hook_url, action, message_id, json.dumps(payload), entity_type, entity_id)
+            for hook_url, action, message_id, payload, entity_type, entity_id in messages
+        ],
+    )
+
+
+@postgres
+async def claim_due_webhooks(limit: int, claim_for: float, conn=None) -> list[dict]:
+    """
+    Claims the messages that can be sent now for `claim_for` seconds, and returns them oldest first.
+    Messages queued after one that must be retried later, or that's claimed by someone else,
+    wait for it, so they're sent in order.
+    """
+    payload = await conn.fetch(
+        """
+        WITH due AS (
+            SELECT o.id
+            FROM webhook_outbox o
+            WHERE o.next_attempt <= NOW()
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM webhook_outbox prev
+                    WHERE prev.hook_url = o.hook_url
+                        AND prev.id < o.id
+                        AND prev.next_attempt > NOW()
+                )
+            ORDER BY o.id
+            LIMIT $1
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE webhook_outbox o
+        SET next_attempt = NOW() + MAKE_INTERVAL(secs => $2)
+        FROM due
+        WHERE o.id = due.id
+        RETURNING o.id, o.hook_url, o.action, o.message_id, o.payload, o.entity_type, o.entity_id, o.attempts
+        """,
+        limit, claim_for,
+    )
+    return sorted(
+        [
+            {**row, "payload": json.loads(row["payload"])}
+            for row in payload
+        ],
+        key=lambda message: message["id"],
+    )
+
+
+@postgres
+async def release_outbox_webhooks(outbox_ids: list[int], conn=None) -> None:
+    """Lets claimed messages that weren't sent be claimed again."""
+    await conn.execute(
+        "UPDATE webhook_outbox SET next_attempt = NOW() WHERE id = ANY($1::int[])",
+        outbox_ids,
+    )
+
+
+@postgres
+async def get_pending_webhook_post(entity_type: WebhookEntity, entity_id: int, conn=None) -> dict | None:
+    """The payload of the latest message about an entity that's yet to be posted."""
+    payload = await conn.fetchval(
+        """
+        SELECT payload
+        FROM webhook_outbox
+        WHERE entity_type = $1
+            AND entity_id = $2
+            AND action = 'post'
+        ORDER BY id DESC
+        LIMIT 1
+        """,
+        entity_type, entity_id,
+    )
+    return json.loads(payload) if payload is not None else None
+
+
+@postgres
+async def get_webhook_message_id(entity_type: WebhookEntity, entity_id: int, conn=None) -> str | None:
+    """The ID of the message posted about an entity, if it was posted."""
+    if entity_type == "completion":
+        return await conn.fetchval(
+            """
+            SELECT SPLIT_PART(subm_wh_payload, ';', 1)
+            FROM completions
+            WHERE id = $1
+                AND subm_wh_payload LIKE '%;%'
+            """,
+            entity_id,
+        )
+    return await conn.fetchval(
+        "SELECT wh_msg_id::text FROM map_submissions WHERE id = $1",
+        entity_id,
+    )
+
+
+@postgres
+async def get_next_webhook_delay(conn=None) -> float | None:
+    """Seconds until the next message can be sent, or None if the outbox is empty."""
+    return await conn.fetchval(
+        """
+        SELECT GREATEST(0, EXTRACT(EPOCH FROM MIN(next_attempt) - NOW()))::float
+        FROM webhook_outbox
+        """
+    )
+
+
+@postgres
+async def delete_outbox_webhook(outbox_id: int, conn=None) -> None:
+    await conn.execute("DELETE FROM webhook_outbox WHERE id = $1", outbox_id)
+
+
+@postgres
+async def retry_outbox_webhook(outbox_id: int, delay: float, count_attempt: bool = True, conn=None) -> None:
+    await conn.execute(
+        """
+        UPDATE webhook_outbox
+        SET
+            attempts = attempts + $3::int,
+            next_attempt = NOW() + MAKE_INTERVAL(secs => $2)
+        WHERE id = $1
+        """,
+        outbox_id, delay, int(count_attempt),
+    )
@@ -1,11 +1,296 @@
+import os
+import asyncio
+import aiohttp
 import aiohttp_client_cache
 import cryptography.hazmat.primitives.asymmetric.rsa
+from collections import OrderedDict
+from typing import AsyncIterable
+from aiohttp_client_cache.backends import BaseCache, CacheBackend, DictCache, ResponseOrKey
+from aiohttp_client_cache.backends.filesystem import FileCache
+from aiohttp_client_cache.cache_keys import create_key
+from aiohttp_client_cache.response import CachedResponse
 from cryptography.hazmat.primitives.serialization import load_pem_public_key
 
 http: aiohttp_client_cache.CachedSession
 bot_pubkey: cryptography.hazmat.primitives.asymmetric.rsa.RSAPublicKey | None = None
 
 
+class HttpCacheMetrics:
+    """Counters on responses looked up in `TieredBackend`."""
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def to_dict(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0,
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
+
+
+cache_metrics = HttpCacheMetrics()
+
+
+def is_private(headers) -> bool:
+    return any(key.lower() == "authorization" for key in headers)
+
+
+def response_size(response: CachedResponse) -> int:
+    return len(response._body or b"")
+
+
+class MemoryCache(BaseCache):
+    """LRU cache of responses, bounded by the total size of their bodies. Nothing is serialized."""
+
+    def __init__(self, max_bytes: int, **kwargs):
+        super().__init__(**kwargs)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries: OrderedDict[str, CachedResponse] = OrderedDict()
+
+    async def read(self, key: str) -> CachedResponse | None:
+        response = self.entries.get(key)
+        if response is None:
+            return None
+        if response.is_expired:
+            await self.delete(key)
+            cache_metrics.expired += 1
+            return None
+        self.entries.move_to_end(key)
+        # The same response is returned every time, and its stream might have been read already
+        response.reset()
+        return response
+
+    async def write(self, key: str, item: CachedResponse) -> None:
+        if response_size(item) > self.max_bytes:
+            return
+        await self.delete(key)
+        self.entries[key] = item
+        self.total_bytes += response_size(item)
+        while self.total_bytes > self.max_bytes:
+            _key, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= response_size(evicted)
+            cache_metrics.evicted += 1
+
+    async def delete(self, key: str) -> None:
+        response = self.entries.pop(key, None)
+        if response is not None:
+            self.total_bytes -= response_size(response)
+
+    async def bulk_delete(self, keys: set) -> None:
+        for key in keys:
+            await self.delete(key)
+
+    async def contains(self, key: str) -> bool:
+        return key in self.entries
+
+    async def clear(self) -> None:
+        self.entries.clear()
+        self.total_bytes = 0
+
+    async def keys(self) -> AsyncIterable[str]:
+        for key in list(self.entries):
+            yield key
+
+    async def values(self) -> AsyncIterable[CachedResponse]:
+        for response in list(self.entries.values()):
+            yield response
+
+    async def size(self) -> int:
+        return len(self.entries)
+
+    def expire(self) -> set[str]:
+        """Drops the expired responses and returns their keys."""
+        expired = {k for k, response in self.entries.items() if response.is_expired}
+        for key in expired:
+            response = self.entries.pop(key)
+            self.total_bytes -= response_size(response)
+        cache_metrics.expired += len(expired)
+        return expired
+
+
+class TieredCache(BaseCache):
+    """
+    Responses are looked up in memory first, then on disk. The ones found
+    on disk are kept in memory for the next time.
+    Private responses are only ever kept in memory.
+    """
+
+    def __init__(self, memory: MemoryCache, disk: BaseCache | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.memory = memory
+        self.disk = disk
+
+    async def read(self, key: str) -> ResponseOrKey:
+        if (response := await self.memory.read(key)) is not None:
+            cache_metrics.memory_hits += 1
+            return response
+        if self.disk is None:
+            return None
+
+        response = await self.disk.read(key)
+        if isinstance(response, CachedResponse) and not response.is_expired:
+            cache_metrics.disk_hits += 1
+            await self.memory.write(key, response)
+        return response
+
+    async def write(self, key: str, item: CachedResponse, private: bool = False) -> None:
+        await self.memory.write(key, item)
+        if self.disk is not None and not private:
+            await self.disk.write(key, item)
+
+    async def delete(self, key: str) -> None:
+        await self.memory.delete(key)
+        if self.disk is not None:
+            await self.disk.delete(key)
+
+    async def bulk_delete(self, keys: set) -> None:
+        for key in keys:
+            await self.delete(key)
+
+    async def contains(self, key: str) -> bool:
+        return await self.memory.contains(key) or \
+            self.disk is not None and await self.disk.contains(key)
+
+    async def clear(self) -> None:
+        await self.memory.clear()
+        if self.disk is not None:
+            await self.disk.clear()
+
+    async def keys(self) -> AsyncIterable[str]:
+        storage = self.disk if self.disk is not None else self.memory
+        async for key in storage.keys():
+            yield key
+
+    async def values(self) -> AsyncIterable[ResponseOrKey]:
+        storage = self.disk if self.disk is not None else self.memory
+        async for response in storage.values():
+            yield response
+
+    async def size(self) -> int:
+        return await (self.disk if self.disk is not None else self.memory).size()
+
+    async def close(self) -> None:
+        if self.disk is not None:
+            await self.disk.close()
+
+
+def trim_dir(path: str, max_bytes: int) -> int:
+    """Deletes the files written the longest ago in a folder until it's under `max_bytes`."""
+    files = sorted(
+        (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+        for entry in os.scandir(path)
+        if entry.is_file()
+    )
+    total = sum(size for _mtime, size, _path in files)
+    deleted = 0
+    for _mtime, size, fpath in files:
+        if total <= max_bytes:
+            break
+        os.remove(fpath)
+        total -= size
+        deleted += 1
+    return deleted
+
+
+class TieredBackend(CacheBackend):
+    """
+    Keeps responses in a size-bounded in-memory LRU cache, in front of an optional
+    folder on disk that persists them across restarts.
+
+    Requests with an Authorization header are always cached separately by its value,
+    and their responses are never written to disk.
+    """
+
+    def __init__(
+            self,
+            memory_bytes: int,
+            disk_path: str | None = None,
+            disk_bytes: int = 0,
+            **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.disk_bytes = disk_bytes
+        self.responses = TieredCache(
+            MemoryCache(memory_bytes),
+            FileCache(disk_path) if disk_path is not None else None,
+        )
+        self.redirects = DictCache()
+
+    def create_key(self, method: str, url, **kwargs) -> str:
+        headers = kwargs.pop("headers", None) or {}
+        return create_key(
+            method,
+            url,
+            headers=headers,
+            include_headers=self.include_headers or is_private(headers),
+            ignored_params=self.ignored_params,
+            **kwargs,
+        )
+
+    async def get_response(self, key: str) -> CachedResponse | None:
+        response = await super().get_response(key)
+        if response is None:
+            cache_metrics.misses += 1
+        return response
+
+    async def save_response(
+            self,
+            response: aiohttp.ClientResponse,
+            cache_key: str | None = None,
+            expires=None,
+    ) -> None:
+        cache_key = cache_key or self.create_key(response.method, response.url)
+        cached_response = await CachedResponse.from_client_response(response, expires)
+        await self.responses.write(cache_key, cached_response, private=is_private(response.request_info.headers))
+        for r in response.history:
+            await self.redirects.write(self.create_key(r.method, r.url), cache_key)
+
+    async def delete(self, key: str) -> None:
+        """
+        Deletes a response and its redirects. Doesn't go through `TieredCache.read`, which
+        would count the response as a hit and bring it back into memory.
+        """
+        redirect_key = await self.redirects.pop(key)
+        for response_key in [key] + ([str(redirect_key)] if redirect_key is not None else []):
+            response = self.responses.memory.entries.get(response_key)
+            if response is None and self.responses.disk is not None:
+                response = await self.responses.disk.read(response_key)
+            await self.responses.delete(response_key)
+            if isinstance(response, CachedResponse):
+                for r in response.history:
+                    await self.redirects.delete(self.create_key(r.method, r.url))
+
+    def expire_memory(self) -> set[str]:
+        return self.responses.memory.expire()
+
+    async def delete_expired_responses(self) -> None:
+        """Also trims the disk cache to its max size. Reads every response on disk, so should be run rarely."""
+        expired_in_memory = self.expire_memory()
+        disk = self.responses.disk
+        if disk is None:
+            return
+
+        expired = set()
+        async for key in disk.keys():
+            response = await disk.read(key)
+            if not isinstance(response, CachedResponse) or response.is_expired:
+                expired.add(key)
+        await self.bulk_delete(expired)
+        # Those also in memory were just counted
+        cache_metrics.expired += len(expired - expired_in_memory)
+        if self.disk_bytes:
+            cache_metrics.evicted += await asyncio.to_thread(trim_dir, disk.cache_dir, self.disk_bytes)
+
+
 def set_session(pool: aiohttp_client_cache.CachedSession) -> None:
     global http
     http = pool
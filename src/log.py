@@ -1,40 +1,162 @@
 import os
 import io
 import csv
+import gzip
 import json
+import shutil
+import contextlib
 import aiofiles
 import asyncio
-from typing import Literal
+from typing import AsyncIterator, Literal
 import config
+import src.db.connection
+import src.db.queries.maps
+import src.db.queries.users
+import src.utils.responsecache
+import src.utils.searchindex
+from src.db.queries.changes import insert_change_event, number_change_events
 from src.utils.colors import purple
 from datetime import datetime
 
-file: aiofiles.threadpool.text.AsyncTextIOWrapper | None = None
+LOG_NAME = "changes.log"
+# A batch is written once it's this big, or this many seconds after its first line
+BATCH_MAX_BYTES = 64 * 1024
+BATCH_MAX_DELAY = 1.0
+
+# Rows waiting to be written, None until the writer is started
+pending: list[list[str]] | None = None
+pending_size = 0
+new_rows = asyncio.Event()
+batch_full = asyncio.Event()
+write_lock = asyncio.Lock()
+
+
+def log_dir() -> str:
+    return os.path.join(config.PERSISTENT_DATA_PATH, "logs")
+
+
+def max_log_size() -> int:
+    return config.LOG_MAX_SIZE if hasattr(config, "LOG_MAX_SIZE") else 10 * 1024**2
+
+
+def compress_logs() -> bool:
+    return hasattr(config, "LOG_COMPRESS") and config.LOG_COMPRESS
+
+
+def rotate(path: str) -> None:
+    """Renames the current logfile after its last edit, compressing it if set in the config."""
+    modified = datetime.fromtimestamp(os.path.getmtime(path))
+    rotated = os.path.join(log_dir(), f"changes-{modified.strftime('%Y-%m-%d-%H%M%S')}.log")
+    i = 1
+    while os.path.exists(rotated) or os.path.exists(f"{rotated}.gz"):
+        rotated = os.path.join(log_dir(), f"changes-{modified.strftime('%Y-%m-%d-%H%M%S')}-{i}.log")
+        i += 1
+    os.rename(path, rotated)
+    if compress_logs():
+        with open(rotated, "rb") as fin, gzip.open(f"{rotated}.gz", "wb") as fout:
+            shutil.copyfileobj(fin, fout)
+        os.remove(rotated)
+
+
+def should_rotate(path: str, incoming: int) -> bool:
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return False
+    modified = datetime.fromtimestamp(os.path.getmtime(path))
+    return os.path.getsize(path) + incoming > max_log_size() or \
+        modified.date() != datetime.now().date()
+
+
+async def write_batch(rows: list[list[str]]) -> None:
+    if not len(rows):
+        return
+    out = io.StringIO()
+    csv.writer(out).writerows(rows)
+    batch = out.getvalue()
+
+    path = os.path.join(log_dir(), LOG_NAME)
+    async with write_lock:
+        if should_rotate(path, len(batch)):
+            await asyncio.to_thread(rotate, path)
+        async with aiofiles.open(path, "a") as logfile:
+            await logfile.write(batch)
 
 
 async def init_log():
-    global file
-    log_path = os.path.join(config.PERSISTENT_DATA_PATH, "logs")
-    os.makedirs(log_path, exist_ok=True)
-    async with aiofiles.open(os.path.join(log_path, "changes.log"), "a") as logfile:
-        file = logfile
-        print(f"{purple('[Log]')} Logfile open")
-        await asyncio.Future()
+    """Writes logged rows to the logfile in batches."""
+    global pending
+    os.makedirs(log_dir(), exist_ok=True)
+    pending = []
+    print(f"{purple('[Log]')} Logfile open")
+
+    while True:
+        await new_rows.wait()
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(batch_full.wait(), BATCH_MAX_DELAY)
+        await flush()
+
+
+async def flush() -> None:
+    """Writes every pending row. Should be called on shutdown."""
+    global pending, pending_size
+    if not pending:
+        return
+    rows = pending
+    pending = []
+    pending_size = 0
+    new_rows.clear()
+    batch_full.clear()
+    # Rows were already taken out of pending, so they must be written even if the writer is cancelled
+    await asyncio.shield(write_batch(rows))
+
+
+@contextlib.asynccontextmanager
+async def logged_edit(
+        etype: Literal["map", "config", "completion", "user"],
+        action: Literal["post", "put", "delete"],
+        eid: str | int | None,
+        new_entity: dict | list | str | None,
+        who: int | str,
+) -> AsyncIterator["asyncpg.pool.PoolConnectionProxy"]:
+    """
+    Yields a connection in a transaction to make an edit on. Its change event is inserted
+    in the same transaction, so it's recorded if and only if the edit is committed.
+    Once it is, the edit is logged with `log_action` and the event is given its place
+    in the feed, which only takes a lock for that short step.
+    """
+    async with src.db.connection.acquire() as conn:
+        async with conn.transaction():
+            yield conn
+            await insert_change_event(
+                etype,
+                action,
+                None if eid is None else str(eid),
+                new_entity,
+                None if who is None else str(who),
+                conn=conn,
+            )
+        await log_action(etype, action, eid, new_entity, who)
+        await number_change_events(conn=conn)
 
 
 async def log_action(
-        etype: Literal["map", "config", "completion"],
+        etype: Literal["map", "config", "completion", "user"],
         action: Literal["post", "put", "delete"],
         eid: str | int | None,
-        new_entity: dict | None,
+        new_entity: dict | list | str | None,
         who: int | str,
 ) -> None:
-    if file is None:
-        return
-    str_entity = json.dumps(new_entity)
-    out = io.StringIO()
-    writer = csv.writer(out)
-    writer.writerow([int(datetime.now().timestamp()), etype, action, str(eid), str_entity, str(who)])
-    await file.write(out.getvalue())
-    await file.flush()
-
+    """Drops the caches the edit affects and adds it to the changelog."""
+    global pending_size
+    src.utils.responsecache.invalidate(etype)
+    if etype == "user" and eid is not None:
+        src.db.queries.users.invalidate_user_perms(eid)
+    if etype == "map":
+        src.db.queries.maps.resolve_map_code.clear()
+        src.utils.searchindex.invalidate()
+    if pending is not None:
+        row = [str(int(datetime.now().timestamp())), etype, action, str(eid), json.dumps(new_entity), str(who)]
+        pending.append(row)
+        pending_size += sum(map(len, row))
+        new_rows.set()
+        if pending_size >= BATCH_MAX_BYTES:
+            batch_full.set()
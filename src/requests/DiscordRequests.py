@@ -1,11 +1,22 @@
+import http
+import time
+import asyncio
 import aiohttp
 import requests
 import src.http
 import config
 
 
+class WebhookRateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited for {retry_after}s")
+        self.retry_after = retry_after
+
+
 class DiscordRequests:
     bot_id = None
+    # Webhook URL -> when its rate limit bucket resets, in time.monotonic() seconds
+    webhook_reset_at: dict[str, float] = {}
 
     @staticmethod
     def setup():
@@ -23,23 +34,46 @@ class DiscordRequests:
             return await resp.json()
 
     @staticmethod
-    async def execute_webhook(hook_url: str, data: aiohttp.FormData, wait: bool = False) -> str:
-        if wait:
-            hook_url = f"{hook_url}?wait=true"
-        async with src.http.http.post(hook_url, data=data) as resp:
-            if wait:
-                return (await resp.json())["id"]
+    async def webhook_request(method: str, url: str, **kwargs) -> aiohttp.ClientResponse:
+        """
+        Waits for the webhook's rate limit bucket to reset if it's been used up.
+        Raises `WebhookRateLimited` on a 429 and `aiohttp.ClientResponseError` on other errors, except 404.
+        """
+        hook_url = url.split("?")[0].split("/messages/")[0]
+        if (wait := DiscordRequests.webhook_reset_at.get(hook_url, 0) - time.monotonic()) > 0:
+            await asyncio.sleep(wait)
+
+        async with src.http.http.request(method, url, **kwargs) as resp:
+            if resp.headers.get("X-RateLimit-Remaining") == "0":
+                DiscordRequests.webhook_reset_at[hook_url] = \
+                    time.monotonic() + float(resp.headers.get("X-RateLimit-Reset-After", 1))
+            if resp.status == http.HTTPStatus.TOO_MANY_REQUESTS:
+                retry_after = float((await resp.json()).get("retry_after", 1))
+                DiscordRequests.webhook_reset_at[hook_url] = time.monotonic() + retry_after
+                raise WebhookRateLimited(retry_after)
+            if resp.status != http.HTTPStatus.NOT_FOUND:
+                resp.raise_for_status()
+            await resp.read()
+            return resp
+
+    @staticmethod
+    async def execute_webhook(hook_url: str, data: dict, wait: bool = False) -> str | None:
+        resp = await DiscordRequests.webhook_request(
+            "POST",
+            f"{hook_url}?wait=true" if wait else hook_url,
+            json=data,
+        )
+        if wait and resp.ok:
+            return (await resp.json())["id"]
 
     @staticmethod
     async def patch_webhook(hook_url: str, message_id: str, data: dict) -> bool:
-        hook_url = f"{hook_url}/messages/{message_id}"
-        async with src.http.http.patch(hook_url, json=data) as resp:
-            return resp.ok
+        resp = await DiscordRequests.webhook_request("PATCH", f"{hook_url}/messages/{message_id}", json=data)
+        return resp.ok
 
     @staticmethod
     async def delete_webhook(hook_url: str, message_id: str) -> None:
-        async with src.http.http.delete(f"{hook_url}/messages/{message_id}"):
-            pass
+        await DiscordRequests.webhook_request("DELETE", f"{hook_url}/messages/{message_id}")
 
     @staticmethod
     async def get_user_guilds(access_token: str) -> list[dict]:
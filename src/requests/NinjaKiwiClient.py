@@ -0,0 +1,171 @@
+import http
+import time
+import asyncio
+import aiohttp
+import async_timeout
+from collections import OrderedDict
+from typing import Awaitable, Callable, Generic, TypeVar
+from src.exceptions import GenericErrorException
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class NinjaKiwiUnavailable(GenericErrorException):
+    def __init__(self):
+        super().__init__(
+            "Ninja Kiwi's API is unavailable, try again later",
+            status_code=http.HTTPStatus.SERVICE_UNAVAILABLE,
+        )
+
+
+class ResultCache(Generic[K, V]):
+    """LRU cache of request results. Results that are None are kept for `negative_ttl` seconds instead."""
+
+    def __init__(self, ttl: float, negative_ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self.entries: OrderedDict[K, tuple[V | None, float]] = OrderedDict()
+
+    def get(self, key: K) -> tuple[bool, V | None]:
+        """Returns whether the key was cached, and its value."""
+        if key not in self.entries:
+            return False, None
+        value, expires_at = self.entries[key]
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return False, None
+        self.entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: K, value: V | None) -> None:
+        ttl = self.ttl if value is not None else self.negative_ttl
+        self.entries[key] = (value, time.monotonic() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests after `threshold` failures in a row. After `cooldown`
+    seconds a single request is let through, and if it succeeds the others are too.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if self.probing or time.monotonic() - self.opened_at < self.cooldown:
+            return False
+        self.probing = True
+        return True
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self.probing or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+
+class NinjaKiwiClient:
+    """
+    Sends requests to Ninja Kiwi's API through `api`. Requests for the same map or OAK
+    that are already in flight are shared, and their results are cached.
+    Raises `NinjaKiwiUnavailable` if the API times out or errors, or if it's been doing
+    so lately and the circuit breaker is open.
+    """
+    MAX_CONCURRENT = 8
+    TIMEOUT = 5
+    BREAKER_THRESHOLD = 5
+    BREAKER_COOLDOWN = 30
+
+    def __init__(self, api):
+        self.api = api
+        self.semaphore = asyncio.Semaphore(self.MAX_CONCURRENT)
+        self.breaker = CircuitBreaker(self.BREAKER_THRESHOLD, self.BREAKER_COOLDOWN)
+        self.inflight: dict[tuple[str, str], asyncio.Future] = {}
+        self.users: ResultCache[str, dict] = ResultCache(60 * 5, 60)
+        self.saves: ResultCache[str, dict] = ResultCache(60 * 5, 60)
+        self.maps: ResultCache[str, dict] = ResultCache(3600, 60)
+
+    async def request(
+            self,
+            kind: str,
+            cache: ResultCache[str, V],
+            key: str,
+            fetch: Callable[[str], Awaitable[V | None]],
+    ) -> V | None:
+        cached, value = cache.get(key)
+        if cached:
+            return value
+
+        future = self.inflight.get((kind, key))
+        if future is None:
+            future = asyncio.ensure_future(self.load(cache, key, fetch))
+            # Nobody might be waiting on it
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            future.add_done_callback(lambda _f: self.inflight.pop((kind, key), None))
+            self.inflight[(kind, key)] = future
+        # Callers giving up don't cancel the request for the others
+        return await asyncio.shield(future)
+
+    async def load(
+            self,
+            cache: ResultCache[str, V],
+            key: str,
+            fetch: Callable[[str], Awaitable[V | None]],
+    ) -> V | None:
+        if not self.breaker.allow():
+            raise NinjaKiwiUnavailable()
+        try:
+            # Waiting for a free slot doesn't count towards the timeout
+            async with self.semaphore:
+                async with async_timeout.timeout(self.TIMEOUT):
+                    value = await fetch(key)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.breaker.failure()
+            raise NinjaKiwiUnavailable()
+        except BaseException:
+            # Not the API's fault, but the probe must be let go
+            self.breaker.probing = False
+            raise
+        self.breaker.success()
+        cache.set(key, value)
+        return value
+
+    async def get_btd6_user(self, oak: str) -> dict | None:
+        return await self.request("user", self.users, oak, self.api.get_btd6_user)
+
+    async def get_btd6_user_save(self, oak: str) -> dict | None:
+        return await self.request("save", self.saves, oak, self.api.get_btd6_user_save)
+
+    async def get_btd6_user_deco(self, oak: str) -> dict:
+        """The user's avatar and banner. Both are None if they can't be retrieved."""
+        try:
+            profile = await self.get_btd6_user(oak)
+        except NinjaKiwiUnavailable:
+            profile = None
+        return {
+            "avatarURL": profile["avatarURL"] if profile else None,
+            "bannerURL": profile["bannerURL"] if profile else None,
+        }
+
+    async def get_btd6_map(self, code: str) -> dict | None:
+        return await self.request("map", self.maps, code, self.api.get_btd6_map)
@@ -2,9 +2,16 @@ import src.http
 
 
 class NinjaKiwiRequests:
+    """
+    Requests to Ninja Kiwi's API. They return None if what's requested doesn't exist,
+    and raise `aiohttp.ClientResponseError` if the API is having problems.
+    Should be used through `NinjaKiwiClient`.
+    """
     @staticmethod
-    async def get_btd6_user(oak: str) -> dict | None:
-        async with src.http.http.get(f"https://data.ninjakiwi.com/btd6/users/{oak}") as resp:
+    async def get_body(url: str) -> dict | None:
+        async with src.http.http.get(url) as resp:
+            if resp.status >= 500 or resp.status == 429:
+                resp.raise_for_status()
             if resp.status != 200:
                 return None
             body = await resp.json()
@@ -13,30 +20,13 @@ class NinjaKiwiRequests:
             return body["body"]
 
     @staticmethod
-    async def get_btd6_user_save(oak: str) -> dict | None:
-        async with src.http.http.get(f"https://data.ninjakiwi.com/btd6/save/{oak}") as resp:
-            if resp.status != 200:
-                return None
-            body = await resp.json()
-            if not body["success"]:
-                return None
-            return body["body"]
+    async def get_btd6_user(oak: str) -> dict | None:
+        return await NinjaKiwiRequests.get_body(f"https://data.ninjakiwi.com/btd6/users/{oak}")
 
     @staticmethod
-    async def get_btd6_user_deco(oak: str) -> dict | None:
-        profile = await NinjaKiwiRequests.get_btd6_user(oak)
-        return {
-            "avatarURL": profile["avatarURL"] if profile else None,
-            "bannerURL": profile["bannerURL"] if profile else None,
-        }
+    async def get_btd6_user_save(oak: str) -> dict | None:
+        return await NinjaKiwiRequests.get_body(f"https://data.ninjakiwi.com/btd6/save/{oak}")
 
     @staticmethod
     async def get_btd6_map(code: str) -> dict | None:
-        async with src.http.http.get(f"https://data.ninjakiwi.com/btd6/maps/map/{code}") as resp:
-            if resp.status != 200:
-                return None
-            body = await resp.json()
-            if not body["success"]:
-                return None
-            return body["body"]
-
+        return await NinjaKiwiRequests.get_body(f"https://data.ninjakiwi.com/btd6/maps/map/{code}")
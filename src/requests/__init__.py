@@ -1,5 +1,6 @@
-from .DiscordRequests import DiscordRequests
+from .DiscordRequests import DiscordRequests, WebhookRateLimited
 from .NinjaKiwiRequests import NinjaKiwiRequests
+from .NinjaKiwiClient import NinjaKiwiClient, NinjaKiwiUnavailable
 
 __discord_api = None
 __ninja_kiwi_api = None
@@ -16,13 +17,14 @@ def set_discord_api(api_class):
         __discord_api.setup()
 
 
-def ninja_kiwi_api():
+def ninja_kiwi_api() -> NinjaKiwiClient:
     return __ninja_kiwi_api
 
 
 def set_ninja_kiwi_api(api_class):
+    """Sets what the client sends its requests through. Also clears its cache."""
     global __ninja_kiwi_api
-    __ninja_kiwi_api = api_class
+    __ninja_kiwi_api = NinjaKiwiClient(api_class)
 
 
 set_discord_api(DiscordRequests)
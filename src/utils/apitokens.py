@@ -0,0 +1,39 @@
+import os
+import time
+import config
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+
+TOKEN_PREFIX = "ml."
+TOKEN_TTL = config.API_TOKEN_TTL if hasattr(config, "API_TOKEN_TTL") else 3600
+
+# The last secret signs new tokens, all of them are accepted when verifying.
+# Without configured secrets, tokens only last until the server restarts.
+_serializer = URLSafeTimedSerializer(
+    config.API_TOKEN_SECRETS if hasattr(config, "API_TOKEN_SECRETS") else [os.urandom(32)],
+    salt="api-token",
+)
+
+
+def is_api_token(token: str) -> bool:
+    return token.startswith(TOKEN_PREFIX)
+
+
+def issue_token(profile: dict) -> tuple[str, int]:
+    """Signs a token for a Discord profile. Returns it along with its expiration timestamp."""
+    token = _serializer.dumps({
+        "id": str(profile["id"]),
+        "username": profile["username"],
+        "avatar": profile.get("avatar"),
+    })
+    return TOKEN_PREFIX + token, int(time.time()) + TOKEN_TTL
+
+
+def read_token(token: str) -> dict | None:
+    """Returns the profile a token was issued for, or None if it's invalid or expired."""
+    if not is_api_token(token):
+        return None
+    try:
+        payload = _serializer.loads(token[len(TOKEN_PREFIX):], max_age=TOKEN_TTL)
+    except (SignatureExpired, BadSignature):
+        return None
+    return payload
@@ -0,0 +1,127 @@
+import io
+import os
+import re
+import asyncio
+import hashlib
+import tempfile
+import aiofiles
+import config
+import src.http
+import src.utils.images
+from PIL import Image, ImageFont, ImageDraw
+from src.utils.cache import cache_for
+from src.exceptions import GenericErrorException
+
+BANNER_SIZE = (1536, 192)
+MEDAL_SIZE = 128
+MEDAL_SLOTS = 8
+TEXT_POS_REL = (-10, -10)
+MEDAL_KEYS = ("wins", "black_border", "no_geraldo", "lccs")
+# Counts are capped to what fits under a medal
+MEDAL_MAX = 9999
+BANNER_NAME = re.compile(r"^[\w.-]+$")
+BANNER_URL = "https://static-api.nkstatic.com/appdocs/4/assets/opendata/{}"
+OUTPUT_FORMATS = {"png": "image/png", "webp": "image/webp"}
+
+# Loaded once, and once per worker process
+LUCKIEST_GUY = ImageFont.truetype(os.path.join(os.getcwd(), "bin", "LuckiestGuy-Regular.ttf"), 60)
+MEDALS = {
+    key: Image.open(os.path.join(os.getcwd(), "bin", "img", f"medal_{key}.png")).convert("RGBA")
+    for key in MEDAL_KEYS
+}
+
+
+def banner_dir() -> str:
+    return os.path.join(config.PERSISTENT_DATA_PATH, "banners")
+
+
+def banner_dir_max_bytes() -> int:
+    return config.BANNER_DISK_BYTES if hasattr(config, "BANNER_DISK_BYTES") else 64 * 1024**2
+
+
+def prepare_base(banner: bytes) -> bytes:
+    """Decodes a banner and resizes it to BANNER_SIZE. Runs in a worker process."""
+    base_img = Image.open(io.BytesIO(banner)).convert("RGB")
+    if base_img.size != BANNER_SIZE:
+        base_img = base_img.resize(BANNER_SIZE)
+    return base_img.tobytes()
+
+
+def render(base: bytes, medals: dict[str, int], output: str) -> bytes:
+    """Draws the medals on a banner returned by `prepare_base`. Runs in a worker process."""
+    unused_space = BANNER_SIZE[0] - MEDAL_SIZE * MEDAL_SLOTS
+    padding = unused_space // (MEDAL_SLOTS+1)
+
+    base_img = Image.frombytes("RGB", BANNER_SIZE, base)
+    canvas = ImageDraw.Draw(base_img)
+
+    medal_x = padding
+    medal_y = (BANNER_SIZE[1]-MEDAL_SIZE) // 2
+    for key in MEDAL_KEYS:
+        if medals[key] <= 0:
+            continue
+        base_img.paste(MEDALS[key], (medal_x, medal_y), mask=MEDALS[key])
+        canvas.text(
+            (medal_x + MEDAL_SIZE + TEXT_POS_REL[0], medal_y + MEDAL_SIZE + TEXT_POS_REL[1]),
+            str(medals[key]),
+            font=LUCKIEST_GUY,
+            fill=(255, 255, 255),
+            stroke_fill=(0, 0, 0),
+            stroke_width=6,
+            anchor="mm",
+        )
+
+        medal_x += padding + MEDAL_SIZE
+
+    stream = io.BytesIO()
+    base_img.save(stream, format=output.upper())
+    return stream.getvalue()
+
+
+async def download_banner(banner: str) -> bytes | None:
+    async with src.http.http.get(BANNER_URL.format(banner)) as resp:
+        if not resp.ok:
+            return None
+        return await resp.read()
+
+
+@cache_for(3600 * 24, maxsize=16)
+async def get_base_banner(banner: str) -> bytes:
+    """Downloads a banner and resizes it. Banners that don't exist aren't cached."""
+    if (image := await download_banner(banner)) is None:
+        raise GenericErrorException("Banner not found")
+    base, _waited = await src.utils.images.run_in_pool(prepare_base, image)
+    return base
+
+
+def banner_key(banner: str, medals: tuple[int, ...], output: str) -> str:
+    """Identifies a rendered banner. Also used as its filename and ETag."""
+    return hashlib.sha256(f"{banner}-{'-'.join(map(str, medals))}.{output}".encode()).hexdigest()
+
+
+@cache_for(3600, maxsize=32)
+async def get_medal_banner(banner: str, medals: tuple[int, ...], output: str) -> bytes:
+    """
+    Renders a banner with the medals in MEDAL_KEYS order, or reads it from
+    the disk if the same one was rendered before. The oldest rendered banners
+    are deleted once they take up more than BANNER_DISK_BYTES.
+    """
+    if not BANNER_NAME.match(banner):
+        raise GenericErrorException("Invalid banner")
+
+    path = os.path.join(banner_dir(), f"{banner_key(banner, medals, output)}.{output}")
+    if os.path.exists(path):
+        async with aiofiles.open(path, "rb") as fin:
+            return await fin.read()
+
+    base = await get_base_banner(banner)
+    image, _waited = await src.utils.images.run_in_pool(render, base, dict(zip(MEDAL_KEYS, medals)), output)
+
+    os.makedirs(banner_dir(), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=banner_dir())
+    os.close(fd)
+    async with aiofiles.open(tmp_path, "wb") as fout:
+        await fout.write(image)
+    os.replace(tmp_path, path)
+    await asyncio.to_thread(src.http.trim_dir, banner_dir(), banner_dir_max_bytes())
+    return image
@@ -1,18 +1,102 @@
-from datetime import datetime, timedelta
+import time
+import asyncio
+import inspect
 from functools import wraps
+from collections import OrderedDict
 
 
-def cache_for(seconds: int):
-    cache = {}
+class _Entry:
+    __slots__ = ("value", "expires_at")
 
+    def __init__(self, value, expires_at: float):
+        self.value = value
+        self.expires_at = expires_at
+
+
+def cache_for(
+        seconds: int,
+        maxsize: int = 256,
+        ignore: tuple[str, ...] = ("conn",),
+):
+    """
+    Caches the results of a coroutine function for `seconds`, keyed on its bound arguments
+    except for the ones in `ignore`. Concurrent calls with the same key share a single await.
+
+    The wrapper exposes `invalidate(*args, **kwargs)` and `clear()`.
+    """
     def decorator(func):
+        signature = inspect.signature(func)
+        cache: OrderedDict[tuple, _Entry] = OrderedDict()
+        inflight: dict[tuple, asyncio.Future] = {}
+
+        def make_key(args, kwargs) -> tuple:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tuple(
+                (name, value)
+                for name, value in bound.arguments.items()
+                if name not in ignore
+            )
+
+        async def load(key: tuple, args, kwargs):
+            future = asyncio.get_running_loop().create_future()
+            # Nobody might be waiting on it
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            inflight[key] = future
+            try:
+                value = await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as exc:
+                future.set_exception(exc)
+                raise
+            finally:
+                # If it was invalidated in the meantime the value might be outdated
+                is_current = inflight.get(key) is future
+                if is_current:
+                    del inflight[key]
+
+            future.set_result(value)
+            if is_current:
+                cache[key] = _Entry(value, time.monotonic() + seconds)
+                cache.move_to_end(key)
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return value
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # TODO also put kwargs in the key but for now I dont need it
-            now = datetime.now()
-            if args not in cache or cache[args][1] < now:
-                cache[args] = (await func(*args, **kwargs), now + timedelta(seconds=seconds))
-            return cache[args][0]
+            key = make_key(args, kwargs)
+            while True:
+                entry = cache.get(key)
+                if entry is not None:
+                    if time.monotonic() < entry.expires_at:
+                        cache.move_to_end(key)
+                        return entry.value
+                    del cache[key]
+
+                future = inflight.get(key)
+                if future is None:
+                    return await load(key, args, kwargs)
+                try:
+                    return await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    # The call we were waiting on was cancelled, not this one
+                    if not future.cancelled():
+                        raise
+
+        def invalidate(*args, **kwargs) -> None:
+            key = make_key(args, kwargs)
+            cache.pop(key, None)
+            inflight.pop(key, None)
+
+        def clear() -> None:
+            cache.clear()
+            inflight.clear()
+
+        wrapper.invalidate = invalidate
+        wrapper.clear = clear
         return wrapper
 
     return decorator
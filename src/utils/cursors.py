@@ -0,0 +1,24 @@
+import json
+import base64
+import binascii
+from src.exceptions import ValidationException
+
+
+def encode_cursor(*values) -> str:
+    """Makes an opaque cursor out of the sort key of the last row of a page."""
+    raw = json.dumps(values, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """
+    Reads back a cursor made with `encode_cursor`, converting each value
+    with the respective callable in `types`.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("Wrong cursor length")
+        return tuple(cast(val) for cast, val in zip(types, values))
+    except (ValueError, TypeError, binascii.Error):
+        raise ValidationException({"after": "Invalid cursor"})
@@ -1,12 +1,10 @@
 import json
-import aiohttp
-from src.db.queries.completions import add_completion_wh_payload
-from src.db.queries.mapsubmissions import set_map_submission_wh, get_map_submissions
+import src.webhooks
+from src.db.queries.mapsubmissions import get_map_submissions
 from src.db.queries.format import get_format
+from src.db.queries.webhooks import get_pending_webhook_post
 from config import NK_PREVIEW_PROXY
 from src.utils.emojis import Emj
-import src.http
-from ..requests import discord_api
 from src.utils.formats.formatinfo import format_info
 from src.exceptions import ValidationException
 
@@ -111,21 +109,25 @@ async def get_runsubm_embed(
     return embeds
 
 
-async def send_run_webhook(run_id: int, format_id: int, form_data: aiohttp.FormData, payload_json: str) -> None:
+async def send_run_webhook(run_id: int, format_id: int, payload: dict) -> None:
     list_format = await get_format(format_id)
     hook_url = list_format.run_submission_wh if list_format else None
     if hook_url is None:
         return
 
-    msg_id = await discord_api().execute_webhook(hook_url, form_data, wait=True)
-    await add_completion_wh_payload(run_id, f"{msg_id};{payload_json}")
+    await src.webhooks.enqueue([(hook_url, "post", None, payload, "completion", run_id)])
 
 
 async def update_run_webhook(comp: "src.db.models.ListCompletionWithMeta", fail: bool = False) -> None:
-    if comp.subm_wh_payload is None or ";" not in comp.subm_wh_payload:
-        return
-    msg_id, payload = comp.subm_wh_payload.split(";", 1)
-    content = json.loads(payload)
+    if comp.subm_wh_payload is not None and ";" in comp.subm_wh_payload:
+        msg_id, payload = comp.subm_wh_payload.split(";", 1)
+        content = json.loads(payload)
+    else:
+        # Edited once it's posted
+        msg_id = None
+        content = await get_pending_webhook_post("completion", comp.id)
+        if content is None:
+            return
     content["embeds"][0]["color"] = FAIL_CLR if fail else ACCEPT_CLR
 
     list_format = await get_format(comp.format)
@@ -133,12 +135,22 @@ async def update_run_webhook(comp: "src.db.models.ListCompletionWithMeta", fail:
     if hook_url is None:
         return
 
-    if await discord_api().patch_webhook(hook_url, msg_id, content):
-        await add_completion_wh_payload(comp.id, None)
+    await src.webhooks.enqueue([(hook_url, "patch", msg_id, content, "completion", comp.id)])
+
+
+async def map_submission_wh_data(mapsubm: "src.db.models.MapSubmission") -> tuple[str | None, dict | None]:
+    """
+    The ID and content of the message about a map submission. If it's yet to be posted,
+    the ID is None and the content is the one it'll be posted with.
+    """
+    if mapsubm.wh_msg_id is not None:
+        return str(mapsubm.wh_msg_id), json.loads(mapsubm.wh_data)
+    return None, await get_pending_webhook_post("map_submission", mapsubm.id)
 
 
 async def update_map_submission_wh(mapsubm: "src.db.models.MapSubmission", fail: bool = False):
-    if mapsubm.wh_msg_id is None:
+    msg_id, wh_data = await map_submission_wh_data(mapsubm)
+    if wh_data is None:
         return
 
     list_format = await get_format(mapsubm.format_id)
@@ -146,10 +158,10 @@ async def update_map_submission_wh(mapsubm: "src.db.models.MapSubmission", fail:
     if hook_url is None:
         return
 
-    wh_data = json.loads(mapsubm.wh_data)
     wh_data["embeds"][0]["color"] = FAIL_CLR if fail else ACCEPT_CLR
-    if await discord_api().patch_webhook(hook_url, mapsubm.wh_msg_id, wh_data):
-        await set_map_submission_wh(mapsubm.id, None, None)
+    await src.webhooks.enqueue([
+        (hook_url, "patch", msg_id, wh_data, "map_submission", mapsubm.id),
+    ])
 
 
 async def send_map_submission_wh(
@@ -158,22 +170,18 @@ async def send_map_submission_wh(
         submission_id: int,
         wh_data: dict,
 ) -> None:
+    messages = []
     if prev_submission and prev_submission.wh_msg_id:
         old_list_format = await get_format(prev_submission.format_id)
         old_hook_url = old_list_format.map_submission_wh if old_list_format else None
-        await discord_api().delete_webhook(old_hook_url, prev_submission.wh_msg_id)
+        if old_hook_url is not None:
+            messages.append((old_hook_url, "delete", str(prev_submission.wh_msg_id), None, None, None))
 
     list_format = await get_format(format_id)
     hook_url = list_format.map_submission_wh if list_format else None
-    if hook_url is None:
-        return
-
-    form_data = aiohttp.FormData()
-    wh_data_str = json.dumps(wh_data)
-    form_data.add_field("payload_json", wh_data_str)
-
-    msg_id = await discord_api().execute_webhook(hook_url, form_data, wait=True)
-    await set_map_submission_wh(submission_id, msg_id, wh_data_str)
+    if hook_url is not None:
+        messages.append((hook_url, "post", None, wh_data, "map_submission", submission_id))
+    await src.webhooks.enqueue(messages)
 
 
 async def map_change_update_map_submission_wh(map_code: str, map_data: dict) -> None:
@@ -184,17 +192,19 @@ async def map_change_update_map_submission_wh(map_code: str, map_data: dict) ->
     ]
 
     _, submissions = await get_map_submissions(on_code=map_code, on_formats=new_formats)
+    messages = []
     for subm in submissions:
-        if subm is None or subm.wh_msg_id is None:
-            return
+        if subm is None:
+            continue
+        msg_id, wh_data = await map_submission_wh_data(subm)
+        if wh_data is None:
+            continue
 
-        list_format = await get_format(subm.wh_msg_id)
+        list_format = await get_format(subm.format_id)
         hook_url = list_format.map_submission_wh if list_format else None
         if hook_url is None:
-            return
+            continue
 
-        wh_data = json.loads(subm.wh_data)
         wh_data["embeds"][0]["color"] = ACCEPT_CLR
-        async with src.http.http.patch(hook_url + f"/messages/{subm.wh_msg_id}", json=wh_data) as resp:
-            if resp.ok:
-                await set_map_submission_wh(subm.id, None, None)
+        messages.append((hook_url, "patch", msg_id, wh_data, "map_submission", subm.id))
+    await src.webhooks.enqueue(messages)
@@ -1,14 +1,113 @@
-import io
 import os
+import http
 import hashlib
+import tempfile
+import contextlib
 import aiofiles
+import aiohttp
+import config
+import src.utils.images
+from dataclasses import dataclass
+from typing import Callable
+from src.exceptions import GenericErrorException
 from config import PERSISTENT_DATA_PATH
-from PIL import Image
 
 
 media_path = os.path.join(PERSISTENT_DATA_PATH, "media")
 os.makedirs(media_path, exist_ok=True)
 
+CHUNK_SIZE = 64 * 1024
+TRANSCODED_EXTS = ["png", "jpg", "jpeg"]
+
+
+def max_upload_size() -> int:
+    return config.MAX_UPLOAD_SIZE if hasattr(config, "MAX_UPLOAD_SIZE") else 5 * 1024**2
+
+
+@dataclass
+class SpooledFile:
+    """An upload waiting in a temporary file in the media folder."""
+    path: str
+    ext: str
+    sha256: str
+    size: int
+
+
+def spool_path() -> str:
+    fd, path = tempfile.mkstemp(dir=media_path, prefix=".upload-")
+    os.close(fd)
+    return path
+
+
+def discard(spooled: SpooledFile) -> None:
+    """Removes an upload that wasn't saved."""
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(spooled.path)
+
+
+async def spool_part(
+        part: aiohttp.BodyPartReader,
+        ext: str,
+        on_chunk: Callable[[bytes], None] | None = None,
+) -> SpooledFile:
+    """
+    Writes a multipart field to a temporary file one chunk at a time, hashing it
+    along the way, so uploads are never held in memory whole.
+    `on_chunk` is also called with every chunk.
+    """
+    fhash = hashlib.sha256()
+    size = 0
+    path = spool_path()
+    try:
+        async with aiofiles.open(path, "wb") as fout:
+            while chunk := await part.read_chunk(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_upload_size():
+                    raise GenericErrorException(
+                        f"Files must be smaller than {max_upload_size() // 1024**2}MB",
+                        status_code=http.HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                    )
+                fhash.update(chunk)
+                if on_chunk:
+                    on_chunk(chunk)
+                await fout.write(chunk)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        raise
+    return SpooledFile(path, ext, fhash.hexdigest(), size)
+
+
+async def save_spooled(spooled: SpooledFile) -> tuple[str, str]:
+    """
+    Moves an upload to a file named after the hash of its contents. PNGs and JPEGs are
+    converted to WebP off the event loop, unless they were already saved before.
+    Files only ever appear under their final name complete.
+    """
+    transcode = spooled.ext.lower() in TRANSCODED_EXTS
+    ext = "webp" if transcode else spooled.ext
+
+    fname = f"{spooled.sha256}.{ext}"
+    fpath = os.path.join(media_path, fname)
+    if os.path.exists(fpath):
+        src.utils.images.metrics.skipped += 1
+        discard(spooled)
+        return fname, fpath
+
+    if not transcode:
+        os.replace(spooled.path, fpath)
+        return fname, fpath
+
+    webp_path = f"{spooled.path}.webp"
+    try:
+        await src.utils.images.to_webp(spooled.path, webp_path)
+        os.replace(webp_path, fpath)
+    finally:
+        discard(spooled)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(webp_path)
+    return fname, fpath
+
 
 async def save_media(
         media: bytes,
@@ -26,17 +125,8 @@ async def save_image(
         media: bytes,
         ext: str,
 ) -> tuple[str, str]:
-    fhash = hashlib.sha256(media).hexdigest()
-    if ext.lower() in ["png", "jpg", "jpeg"]:
-        image = Image.open(io.BytesIO(media))
-        media_io = io.BytesIO()
-        ext = "webp"
-        image.save(media_io, format=ext)
-        media = media_io.getvalue()
-
-    fname = f"{fhash}.{ext}"
-    fpath = os.path.join(media_path, fname)
-    if not os.path.exists(fpath):
-        async with aiofiles.open(fpath, "wb") as fout:
-            await fout.write(media)
-    return fname, fpath
+    """Same as `save_spooled`, for images that are already in memory."""
+    path = spool_path()
+    async with aiofiles.open(path, "wb") as fout:
+        await fout.write(media)
+    return await save_spooled(SpooledFile(path, ext, hashlib.sha256(media).hexdigest(), len(media)))
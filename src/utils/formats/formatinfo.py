@@ -89,6 +89,7 @@ class MapGetter:
 
 class GetProposed:
     @staticmethod
+    @cache_for(300)
     async def nostalgia_pack(proposed: int) -> tuple[str, str]:
         remade_map = await src.db.queries.maps.get_retro_map(proposed)
         if remade_map is None:
@@ -145,5 +146,10 @@ if len(format_info.keys()) != len(format_keys.keys()):
 
 
 @cache_for(60)
-async def get_maplist_map_count():
-    return (await src.db.queries.misc.get_config())["map_count"].value
+async def get_points_table() -> "src.db.models.PointsTable":
+    """Kept in memory, must be invalidated when the config changes."""
+    return await src.db.queries.misc.get_points_table()
+
+
+async def get_maplist_map_count() -> int:
+    return (await get_points_table()).map_count
@@ -1,8 +1,9 @@
 from aiohttp import web
 import aiohttp
 import http
+import asyncio
 from src.utils.validators import validate_completion, validate_full_map, validate_completion_perms
-from src.utils.files import save_image
+from src.utils.files import spool_part, save_spooled
 from src.exceptions import ValidationException, GenericErrorException
 from config import MEDIA_BASE_URL
 
@@ -43,7 +44,7 @@ async def get_completion_request(
         while part := await reader.next():
             if part.name == "submission_proof":
                 ext = part.headers[aiohttp.hdrs.CONTENT_TYPE].split("/")[-1]
-                proof_fname, _fp = await save_image(await part.read(decode=False), ext)
+                proof_fname, _fp = await save_spooled(await spool_part(part, ext))
                 subm_proof = f"{MEDIA_BASE_URL}/{proof_fname}"
 
             elif part.name == "data":
@@ -78,6 +79,7 @@ async def get_map_form(
 
     data = None
     files = {"r6_start": None, "map_preview_url": None}
+    file_saves = {}
 
     if request.content_type.startswith("multipart/"):
         reader = await request.multipart()
@@ -86,8 +88,7 @@ async def get_map_form(
                 proof_ext = "png"
                 if aiohttp.hdrs.CONTENT_TYPE in part.headers:
                     proof_ext = part.headers[aiohttp.hdrs.CONTENT_TYPE].split("/")[-1]
-                fname, _fpath = await save_image(await part.read(decode=False), proof_ext)
-                files[part.name] = f"{MEDIA_BASE_URL}/{fname}"
+                file_saves[part.name] = asyncio.create_task(save_spooled(await spool_part(part, proof_ext)))
 
             elif part.name == "data":
                 data = await part.json()
@@ -101,6 +102,9 @@ async def get_map_form(
             status_code=http.HTTPStatus.BAD_REQUEST,
         )
 
+    for key, (fname, _fpath) in zip(file_saves, await asyncio.gather(*file_saves.values())):
+        files[key] = f"{MEDIA_BASE_URL}/{fname}"
+
     for fname in files:
         if data.get(fname, None) is None:
             data[fname] = files[fname]
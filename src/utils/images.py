@@ -0,0 +1,110 @@
+import os
+import time
+import asyncio
+import config
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+
+STAGES = ("queued", "decode", "resize", "encode")
+
+
+def max_dimension() -> int:
+    return config.IMAGE_MAX_DIMENSION if hasattr(config, "IMAGE_MAX_DIMENSION") else 4096
+
+
+def worker_count() -> int:
+    return config.IMAGE_WORKERS if hasattr(config, "IMAGE_WORKERS") else min(4, os.cpu_count() or 1)
+
+
+def transcode(src_path: str, dst_path: str, max_size: int) -> dict[str, float]:
+    """
+    Decodes an image, shrinks it to fit in `max_size`x`max_size` and encodes it to WebP.
+    Runs in a worker process, which reads and writes the files itself so the image
+    never goes through the event loop. Returns how long each stage took.
+    """
+    timings = {}
+    started = time.perf_counter()
+    image = Image.open(src_path)
+    image.load()
+    timings["decode"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if max(image.size) > max_size:
+        image.thumbnail((max_size, max_size))
+    timings["resize"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    image.save(dst_path, format="webp")
+    timings["encode"] = time.perf_counter() - started
+    return timings
+
+
+class ImageMetrics:
+    """Time spent on each stage of `transcode`, including waiting for a free worker."""
+    def __init__(self):
+        self.processed = 0
+        self.skipped = 0
+        self.in_progress = 0
+        self.stage_total = {stage: 0.0 for stage in STAGES}
+        self.stage_max = {stage: 0.0 for stage in STAGES}
+
+    def record(self, timings: dict[str, float]) -> None:
+        self.processed += 1
+        for stage, seconds in timings.items():
+            self.stage_total[stage] += seconds
+            self.stage_max[stage] = max(self.stage_max[stage], seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "in_progress": self.in_progress,
+            "stages": {
+                stage: {
+                    "avg_ms": self.stage_total[stage] / self.processed * 1000 if self.processed else 0,
+                    "max_ms": self.stage_max[stage] * 1000,
+                }
+                for stage in STAGES
+            },
+        }
+
+
+metrics = ImageMetrics()
+executor: ProcessPoolExecutor | None = None
+# Images sent to the workers at once. The others wait, instead of piling up in the executor's queue.
+slots: asyncio.Semaphore | None = None
+
+
+async def run_in_pool(func, *args):
+    """
+    Runs a function in the process pool, waiting for a free slot if they're all busy.
+    Returns its result and how long it waited for a slot.
+    """
+    global executor, slots
+    if executor is None:
+        executor = ProcessPoolExecutor(max_workers=worker_count())
+        slots = asyncio.Semaphore(worker_count() * 2)
+
+    queued = time.perf_counter()
+    async with slots:
+        waited = time.perf_counter() - queued
+        result = await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+    return result, waited
+
+
+async def to_webp(src_path: str, dst_path: str) -> None:
+    """Transcodes an image file in the process pool."""
+    metrics.in_progress += 1
+    try:
+        timings, waited = await run_in_pool(transcode, src_path, dst_path, max_dimension())
+    finally:
+        metrics.in_progress -= 1
+    metrics.record({"queued": waited, **timings})
+
+
+def shutdown() -> None:
+    global executor, slots
+    if executor is not None:
+        executor.shutdown(cancel_futures=True)
+    executor = None
+    slots = None
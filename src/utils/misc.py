@@ -1,5 +1,3 @@
-from functools import lru_cache
-
 list_to_int = ["list", "experts"]
 MAPLIST_FORMATS = [1, 2, 51]
 str_to_map_status = {
@@ -14,11 +12,6 @@ str_to_comp_status = {
 }
 
 
-@lru_cache()
-def point_formula(idx, points_btm, points_top, map_count, slope) -> float:
-    return points_btm * (points_top / points_btm) ** ((1 + (1 - idx) / (map_count - 1)) ** slope)
-
-
 def list_eq(l1, l2) -> bool:
     if len(l1) != len(l2):
         return False
@@ -0,0 +1,118 @@
+import time
+import hashlib
+from functools import wraps
+from dataclasses import dataclass
+from collections import OrderedDict
+from aiohttp import web
+import config
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    content_type: str
+    charset: str | None
+    etag: str
+    tags: frozenset[str]
+    expires_at: float
+
+    def to_response(self, request: web.Request) -> web.Response:
+        if request.headers.get("If-None-Match") == self.etag:
+            return web.Response(status=304, headers={"ETag": self.etag})
+        return web.Response(
+            body=self.body,
+            content_type=self.content_type,
+            charset=self.charset,
+            headers={"ETag": self.etag},
+        )
+
+
+class ResponseCache:
+    """LRU cache of serialized responses, bounded by the total size of their bodies."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.generation = 0
+        self.entries: OrderedDict[str, CachedResponse] = OrderedDict()
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self.pop(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CachedResponse, generation: int) -> None:
+        # Something was invalidated while the response was being computed
+        if generation != self.generation or len(entry.body) > self.max_bytes:
+            return
+
+        self.pop(key)
+        self.entries[key] = entry
+        self.size += len(entry.body)
+        while self.size > self.max_bytes:
+            _key, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted.body)
+
+    def pop(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry.body)
+
+    def invalidate(self, *tags: str) -> None:
+        self.generation += 1
+        for key in [k for k, entry in self.entries.items() if not entry.tags.isdisjoint(tags)]:
+            self.pop(key)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.entries.clear()
+        self.size = 0
+
+
+response_cache = ResponseCache(
+    config.RESPONSE_CACHE_BYTES if hasattr(config, "RESPONSE_CACHE_BYTES") else 32 * 1024**2
+)
+
+
+def invalidate(*tags: str) -> None:
+    """Drops every cached response of routes marked with any of the given tags."""
+    response_cache.invalidate(*tags)
+
+
+def cached_route(handler, ttl: int, tags: list[str]):
+    """
+    Caches successful responses of a GET handler by path and query string,
+    until `ttl` seconds pass or one of its `tags` is invalidated.
+    """
+    tags = frozenset(tags)
+
+    @wraps(handler)
+    async def inner(request: web.Request) -> web.StreamResponse:
+        key = request.path_qs
+        entry = response_cache.get(key)
+        if entry is not None:
+            return entry.to_response(request)
+
+        generation = response_cache.generation
+        response = await handler(request)
+        if response.status != 200 or not isinstance(response, web.Response) or \
+                not isinstance(response.body, bytes):
+            return response
+
+        entry = CachedResponse(
+            response.body,
+            response.content_type,
+            response.charset,
+            f'"{hashlib.sha1(response.body).hexdigest()}"',
+            tags,
+            time.monotonic() + ttl,
+        )
+        response_cache.set(key, entry, generation)
+        return entry.to_response(request)
+
+    return inner
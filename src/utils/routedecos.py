@@ -3,19 +3,36 @@ import json
 import random
 import string
 import aiohttp
+import aiofiles
 import base64
 import cryptography.exceptions
 from aiohttp import web
 from typing import Awaitable, Callable, Any
 from functools import wraps
 import src.http
+import src.db.connection
+import src.utils.apitokens
 from src.db.queries.users import create_user, get_user_min, get_user_perms
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric import padding, utils
+from src.utils.files import SpooledFile, spool_part, discard, CHUNK_SIZE
 from ..requests import discord_api
 from src.exceptions import GenericErrorException, ValidationException
 
 
+class RequestContext:
+    """Data resolved by the decorators, shared along the chain through `get_context`."""
+    def __init__(self):
+        self.user: "src.db.models.PartialUser | None" = None
+        self.permissions: "src.db.models.Permissions | None" = None
+
+
+def get_context(request: web.Request) -> RequestContext:
+    if "context" not in request:
+        request["context"] = RequestContext()
+    return request["context"]
+
+
 def validate_json_body(validator_function: Callable[[dict], Awaitable[dict]], **kwargs_deco):
     """Adds `json_body` to kwargs or returns 400."""
     def deco(handler: Callable[[web.Request, Any], Awaitable[web.Response]]):
@@ -48,7 +65,8 @@ def bearer_auth(handler: Callable[[web.Request, Any], Awaitable[web.Response]]):
 def with_discord_profile(handler: Callable[[web.Request, Any], Awaitable[web.Response]]):
     """
     Must be used with `bearer_auth` beforehand.
-    TODO Migrate to JWT and dont call an external service every auth call
+    Accepts either an API token issued by `/auth/token`, verified without any external call,
+    or a Discord token.
     Adds `discord_profile` to kwargs or returns 401.
     """
     @wraps(handler)
@@ -56,15 +74,25 @@ def with_discord_profile(handler: Callable[[web.Request, Any], Awaitable[web.Res
         if token == "":
             raise GenericErrorException("No Discord token found", status_code=http.HTTPStatus.UNAUTHORIZED)
 
-        try:
-            profile = await discord_api().get_user_profile(token)
-            return await handler(request, *args, **kwargs, token=token, discord_profile=profile)
-        except aiohttp.ClientResponseError:
-            raise GenericErrorException("Couldn't verify your Discord account", status_code=http.HTTPStatus.UNAUTHORIZED)
+        if src.utils.apitokens.is_api_token(token):
+            profile = src.utils.apitokens.read_token(token)
+            if profile is None:
+                raise GenericErrorException("Invalid or expired token", status_code=http.HTTPStatus.UNAUTHORIZED)
+        else:
+            profile = await get_discord_profile(token)
+        return await handler(request, *args, **kwargs, token=token, discord_profile=profile)
 
     return wrapper
 
 
+async def get_discord_profile(token: str) -> dict:
+    """Returns the Discord profile of the token's owner, or raises a 401."""
+    try:
+        return await discord_api().get_user_profile(token)
+    except aiohttp.ClientResponseError:
+        raise GenericErrorException("Couldn't verify your Discord account", status_code=http.HTTPStatus.UNAUTHORIZED)
+
+
 def validate_resource_exists(
         exist_check: Callable[[Any], Awaitable[Any]],
         *match_info_key: str,
@@ -98,7 +126,10 @@ def require_perms():
                 discord_profile = kwargs_caller["json_data"]["user"]
             if discord_profile is None:
                 return web.Response(status=http.HTTPStatus.UNAUTHORIZED)
-            permissions = await get_user_perms(discord_profile["id"])
+            context = get_context(request)
+            if context.permissions is None:
+                context.permissions = await get_user_perms(discord_profile["id"])
+            permissions = context.permissions
 
             return await handler(
                 request,
@@ -128,19 +159,32 @@ def register_user(handler: Callable[[web.Request, Any], Awaitable[web.Response]]
         if profile is None:
             return web.Response(status=http.HTTPStatus.INTERNAL_SERVER_ERROR)
 
-        possible_user = await get_user_min(profile["id"])
-        if not possible_user or possible_user.id != profile["id"]:
-            success = await create_user(profile["id"], profile["username"], if_not_exists=True)
-            if not success:
-                rand = random.choices(string.ascii_letters, k=10)
-                await create_user(profile["id"], profile["username"]+f"-{rand}", if_not_exists=True)
-
+        await _resolve_user(get_context(request), profile)
         return await handler(request, *args, **kwargs_caller)
     return wrapper
 
 
+@src.db.connection.postgres
+async def _resolve_user(context: RequestContext, profile: dict, conn=None) -> None:
+    """
+    Creates the user if needed and loads their permissions for `require_perms`,
+    all on the same connection.
+    """
+    possible_user = await get_user_min(profile["id"], conn=conn)
+    if not possible_user or str(possible_user.id) != str(profile["id"]):
+        success = await create_user(profile["id"], profile["username"], if_not_exists=True, conn=conn)
+        if not success:
+            rand = random.choices(string.ascii_letters, k=10)
+            await create_user(profile["id"], profile["username"]+f"-{rand}", if_not_exists=True, conn=conn)
+        possible_user = await get_user_min(profile["id"], conn=conn)
+
+    context.user = possible_user
+    context.permissions = await get_user_perms(profile["id"], conn=conn)
+
+
 # https://cryptography.io/en/latest/hazmat/primitives/asymmetric/rsa/#verification
-def _check_signature(signature: bytes, message: bytes) -> None:
+def _check_signature(signature: bytes, message: bytes, prehashed: bool = False) -> None:
+    """If prehashed, `message` is the SHA-256 digest of the signed message."""
     src.http.bot_pubkey.verify(
         signature,
         message,
@@ -148,10 +192,16 @@ def _check_signature(signature: bytes, message: bytes) -> None:
             mgf=padding.MGF1(hashes.SHA256()),
             salt_length=padding.PSS.MAX_LENGTH
         ),
-        algorithm=hashes.SHA256(),
+        algorithm=utils.Prehashed(hashes.SHA256()) if prehashed else hashes.SHA256(),
     )
 
 
+async def _hash_file(digest: hashes.Hash, path: str) -> None:
+    async with aiofiles.open(path, "rb") as fin:
+        while chunk := await fin.read(CHUNK_SIZE):
+            digest.update(chunk)
+
+
 def check_bot_signature(
         files: list[str] | None = None,
         path_params: list[str] | None = None,
@@ -168,8 +218,9 @@ def check_bot_signature(
 
     If no_content, checks the signature before getting to the body. The signature
     must be present in the "signature" query parameter.
-    Otherwise, checks also the body and adds `files: list[tuple[str, bytes]]` and
-    `json_data: dict` to kwargs.
+    Otherwise, checks also the body and adds `files: list[SpooledFile | None]` and
+    `json_data: dict` to kwargs. Files are spooled to disk and hashed as they're read;
+    the ones the handler doesn't save are deleted after it returns.
 
     Returns 403 if the signature doesn't match.
 
@@ -202,39 +253,65 @@ def check_bot_signature(
                     return web.Response(status=http.HTTPStatus.FORBIDDEN)
                 return await handler(request, *args, **kwargs)
 
-            req_files: list[tuple[str, bytes] | None] = [None for _ in range(len(files))]
+            req_files: list[SpooledFile | None] = [None for _ in range(len(files))]
             req_data = None
+            digest = hashes.Hash(hashes.SHA256())
+            digest.update(message)
+            # Files are hashed for the signature while they're read if everything that comes before
+            # them in the message was already. The others are read back from disk afterward.
+            data_signed = False
+            signed_files = 0
 
-            if request.content_type == "application/json":
-                req_data = json.loads(await request.text())
-            else:
-                reader = await request.multipart()
-                while part := await reader.next():
-                    if part.name == "data":
-                        req_data = await part.json()
-                    elif part.name in files:
-                        fext = part.headers[aiohttp.hdrs.CONTENT_TYPE].split("/")[-1]
-                        file_idx = files.index(part.name)
-                        req_files[file_idx] = (f"{part.name}.{fext}", await part.read(decode=False))
-
-            if req_data is None or "signature" not in req_data or "data" not in req_data:
-                return web.Response(status=http.HTTPStatus.UNAUTHORIZED)
+            try:
+                if request.content_type == "application/json":
+                    req_data = json.loads(await request.text())
+                else:
+                    reader = await request.multipart()
+                    while part := await reader.next():
+                        if part.name == "data":
+                            if req_data is not None:
+                                return web.Response(status=http.HTTPStatus.BAD_REQUEST)
+                            req_data = await part.json()
+                            if isinstance(req_data, dict) and isinstance(req_data.get("data"), str):
+                                digest.update(req_data["data"].encode())
+                                data_signed = True
+                        elif part.name in files:
+                            fext = part.headers[aiohttp.hdrs.CONTENT_TYPE].split("/")[-1]
+                            file_idx = files.index(part.name)
+                            if req_files[file_idx] is not None:
+                                return web.Response(status=http.HTTPStatus.BAD_REQUEST)
+                            sign_now = data_signed and file_idx == signed_files
+                            req_files[file_idx] = await spool_part(
+                                part,
+                                fext,
+                                on_chunk=digest.update if sign_now else None,
+                            )
+                            if sign_now:
+                                signed_files += 1
+
+                if req_data is None or "signature" not in req_data or "data" not in req_data:
+                    return web.Response(status=http.HTTPStatus.UNAUTHORIZED)
 
-            message += req_data["data"].encode()
-            for file in req_files:
-                if file is not None:
-                    message += file[1]
+                if not data_signed:
+                    digest.update(req_data["data"].encode())
+                for file in req_files[signed_files:]:
+                    if file is not None:
+                        await _hash_file(digest, file.path)
 
-            signature = base64.b64decode(req_data["signature"].encode())
-            try:
-                _check_signature(signature, message)
-                json_data = json.loads(req_data["data"])
-            except cryptography.exceptions.InvalidSignature:
-                return web.Response(status=http.HTTPStatus.FORBIDDEN)
-            except json.JSONDecodeError:
-                return web.Response(status=http.HTTPStatus.BAD_REQUEST)
-
-            return await handler(request, *args, **kwargs, files=req_files, json_data=json_data)
+                signature = base64.b64decode(req_data["signature"].encode())
+                try:
+                    _check_signature(signature, digest.finalize(), prehashed=True)
+                    json_data = json.loads(req_data["data"])
+                except cryptography.exceptions.InvalidSignature:
+                    return web.Response(status=http.HTTPStatus.FORBIDDEN)
+                except json.JSONDecodeError:
+                    return web.Response(status=http.HTTPStatus.BAD_REQUEST)
+
+                return await handler(request, *args, **kwargs, files=req_files, json_data=json_data)
+            finally:
+                for file in req_files:
+                    if file is not None:
+                        discard(file)
 
         return wrapper
     return deco
@@ -0,0 +1,82 @@
+import re
+import config
+from src.db.models import PartialMap
+from src.db.queries.search import get_searchable_maps
+from src.utils.cache import cache_for
+
+# Same as pg_trgm.similarity_threshold on the connection pool
+SIMILARITY_THRESHOLD = 0.1
+
+
+def trigrams(value: str) -> set[str]:
+    """Extracts trigrams the same way pg_trgm does."""
+    grams = set()
+    for word in re.findall(r"[^\W_]+", value.lower()):
+        word = f"  {word} "
+        grams.update(word[i:i+3] for i in range(len(word)-2))
+    return grams
+
+
+def similarity(grams_a: set[str], grams_b: set[str]) -> float:
+    if not len(grams_a) or not len(grams_b):
+        return 0.0
+    shared = len(grams_a & grams_b)
+    return shared / (len(grams_a) + len(grams_b) - shared)
+
+
+def rank(value: str, query: str, similar: float) -> float:
+    """Mirrors the search_rank SQL function."""
+    value = value.lower()
+    query = query.lower()
+    if value == query:
+        return 3 + similar
+    if value.startswith(query):
+        return 2 + similar
+    if f" {query}" in value:
+        return 1 + similar
+    return similar
+
+
+class MapSearchIndex:
+    """In-memory index of map names, codes and aliases, ranked like the search query."""
+
+    def __init__(self, maps: list[tuple[PartialMap, list[str]]]):
+        # (value, lowercase value, trigrams, map, can match by similarity)
+        self.entries: list[tuple[str, str, set[str], PartialMap, bool]] = []
+        for pmap, aliases in maps:
+            # Codes are only matched by prefix
+            self.entries.append((pmap.code, pmap.code.lower(), trigrams(pmap.code), pmap, False))
+            for value in [pmap.name, *aliases]:
+                self.entries.append((value, value.lower(), trigrams(value), pmap, True))
+
+    def search(self, query: str, limit: int) -> list[tuple[float, PartialMap]]:
+        query_grams = trigrams(query)
+        lower_query = query.lower()
+        best: dict[str, tuple[float, PartialMap]] = {}
+        for value, lower_value, grams, pmap, fuzzy in self.entries:
+            similar = similarity(grams, query_grams)
+            matches = lower_value.startswith(lower_query)
+            if fuzzy:
+                matches = matches or similar >= SIMILARITY_THRESHOLD or f" {lower_query}" in lower_value
+            if not matches:
+                continue
+
+            score = rank(value, query, similar)
+            if pmap.code not in best or best[pmap.code][0] < score:
+                best[pmap.code] = (score, pmap)
+
+        return sorted(best.values(), key=lambda x: (-x[0], x[1].name))[:limit]
+
+
+def is_enabled() -> bool:
+    return hasattr(config, "SEARCH_INDEX_IN_MEMORY") and config.SEARCH_INDEX_IN_MEMORY
+
+
+@cache_for(3600)
+async def get_map_index() -> MapSearchIndex:
+    return MapSearchIndex(await get_searchable_maps())
+
+
+def invalidate() -> None:
+    """Rebuilds the index on the next search, should be called whenever a map changes."""
+    get_map_index.clear()
@@ -0,0 +1,129 @@
+import io
+import csv
+import http
+import json
+import asyncio
+import contextlib
+import async_timeout
+import config
+from datetime import datetime
+from typing import AsyncIterator, Literal, get_args
+from aiohttp import web
+from src.exceptions import ValidationException, GenericErrorException
+
+ExportFormat = Literal["ndjson", "csv"]
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+# Bytes buffered before being sent to the client
+CHUNK_SIZE = 64 * 1024
+# Seconds the client can take to receive a chunk before the export is aborted
+WRITE_TIMEOUT = 30
+
+# Each export holds a database connection until it's over, None until the first one
+export_slots: asyncio.Semaphore | None = None
+
+
+def max_exports() -> int:
+    return config.EXPORT_MAX_CONCURRENT if hasattr(config, "EXPORT_MAX_CONCURRENT") else 4
+
+
+def get_export_params(request: web.Request) -> tuple[ExportFormat, datetime | None]:
+    """Reads the `output` and `since` query parameters of an export route."""
+    output = request.query.get("output", "ndjson")
+    if output not in get_args(ExportFormat):
+        raise ValidationException({"output": f"Must be one of: {', '.join(get_args(ExportFormat))}"})
+
+    since = None
+    if "since" in request.query:
+        try:
+            since = datetime.fromtimestamp(int(request.query["since"]))
+        except (ValueError, OverflowError, OSError):
+            raise ValidationException({"since": "Must be a timestamp, in seconds"})
+
+    return output, since
+
+
+def serialize_value(value, output: ExportFormat):
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, list) and output == "csv":
+        return ";".join(str(serialize_value(val, output)) for val in value)
+    return value
+
+
+async def stream_rows(
+        request: web.Request,
+        rows: AsyncIterator["asyncpg.Record"],
+        output: ExportFormat,
+        filename: str,
+) -> web.StreamResponse:
+    """
+    Writes rows to the client as they're read, so only one chunk of them
+    is ever kept in memory. CSV exports have a header with the column names.
+
+    Only `max_exports()` exports run at once, the others are rejected. If the
+    client stops reading for WRITE_TIMEOUT seconds, the connection is closed.
+    """
+    global export_slots
+    if export_slots is None:
+        export_slots = asyncio.Semaphore(max_exports())
+    if export_slots.locked():
+        raise GenericErrorException(
+            "Too many exports in progress, try again later",
+            status_code=http.HTTPStatus.SERVICE_UNAVAILABLE,
+        )
+
+    async with export_slots, contextlib.aclosing(rows):
+        # Errors in the query are raised here, while an error response can still be sent
+        first_row = await anext(rows, None)
+
+        resp = web.StreamResponse(
+            headers={
+                "Content-Type": f"{CONTENT_TYPES[output]}; charset=utf-8",
+                "Content-Disposition": f'attachment; filename="{filename}.{output}"',
+                **request.get("cors_headers", {}),
+            },
+        )
+        await resp.prepare(request)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+
+        async def write_buffer() -> None:
+            try:
+                async with async_timeout.timeout(WRITE_TIMEOUT):
+                    await resp.write(buffer.getvalue().encode())
+            except asyncio.TimeoutError:
+                # The client isn't reading, the response can't be finished
+                if request.transport is not None:
+                    request.transport.close()
+                raise ConnectionResetError("Client stopped reading the export")
+            buffer.seek(0)
+            buffer.truncate()
+
+        try:
+            if first_row is not None and output == "csv":
+                writer.writerow(first_row.keys())
+            row = first_row
+            while row is not None:
+                if output == "csv":
+                    writer.writerow([serialize_value(val, output) for val in row.values()])
+                else:
+                    buffer.write(json.dumps({
+                        key: serialize_value(val, output) for key, val in row.items()
+                    }))
+                    buffer.write("\n")
+
+                if buffer.tell() >= CHUNK_SIZE:
+                    await write_buffer()
+                row = await anext(rows, None)
+
+            if buffer.tell():
+                await write_buffer()
+        except ConnectionResetError:
+            return resp
+
+    await resp.write_eof()
+    return resp
@@ -3,7 +3,7 @@ import validators
 from typing import Type, Any, get_args, Literal
 import re
 import src.utils.routedecos
-import src.http
+from src.requests import ninja_kiwi_api
 from src.db.models import MapSubmission
 from src.db.queries.maps import map_exists, alias_exists, get_map, map_exists_in_format
 from src.db.queries.users import get_user_min
@@ -30,8 +30,7 @@ async def validate_map_code(
     if not isinstance(code, str) or not re.match("^[A-Z]{7}$", code):
         return "Must be a 7 uppercase letter code"
     elif validate_code_exists:
-        nk_response = await src.http.http.get(f"https://data.ninjakiwi.com/btd6/maps/map/{code}")
-        if not nk_response.ok or not (await nk_response.json())["success"]:
+        if await ninja_kiwi_api().get_btd6_map(code) is None:
             return f"There is no map with code {code}"
 
 
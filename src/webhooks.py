@@ -0,0 +1,133 @@
+import json
+import asyncio
+import aiohttp
+import contextlib
+from collections import defaultdict
+from src.db.queries.webhooks import (
+    enqueue_webhooks,
+    claim_due_webhooks,
+    release_outbox_webhooks,
+    get_next_webhook_delay,
+    get_pending_webhook_post,
+    get_webhook_message_id,
+    delete_outbox_webhook,
+    retry_outbox_webhook,
+)
+from src.db.queries.completions import add_completion_wh_payload
+from src.db.queries.mapsubmissions import set_map_submission_wh
+from src.requests import discord_api, WebhookRateLimited
+from src.utils.colors import purple, red
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 8
+# The outbox is checked at least this often, in case a wakeup was missed
+POLL_INTERVAL = 30
+BACKOFF_BASE = 5
+BACKOFF_MAX = 3600
+# Messages being sent can't be claimed by another worker for this long
+CLAIM_TIMEOUT = 300
+
+new_message = asyncio.Event()
+
+
+class MessageNotPosted(Exception):
+    """The message to edit is still in the outbox."""
+
+
+async def enqueue(
+        messages: list[tuple[str, str, str | None, dict | None, str | None, int | None]],
+) -> None:
+    """
+    Adds messages to the outbox and wakes up the worker.
+    Each is a (hook_url, action, message_id, payload, entity_type, entity_id) tuple.
+    Edits to an entity's message can leave message_id empty, to edit it once it's posted.
+    """
+    if not len(messages):
+        return
+    await enqueue_webhooks(messages)
+    new_message.set()
+
+
+async def on_sent(message: dict, msg_id: str | None) -> None:
+    """Stores the message ID of a new message, or forgets it once it's been edited."""
+    if message["entity_type"] == "completion":
+        payload = None
+        if message["action"] == "post":
+            payload = f"{msg_id};{json.dumps(message['payload'])}"
+        await add_completion_wh_payload(message["entity_id"], payload)
+    elif message["entity_type"] == "map_submission":
+        if message["action"] == "post":
+            await set_map_submission_wh(message["entity_id"], msg_id, json.dumps(message["payload"]))
+        else:
+            await set_map_submission_wh(message["entity_id"], None, None)
+
+
+async def deliver(message: dict) -> None:
+    msg_id = None
+    if message["action"] == "post":
+        msg_id = await discord_api().execute_webhook(message["hook_url"], message["payload"], wait=True)
+        if msg_id is None:
+            return
+    elif message["action"] == "patch":
+        message_id = message["message_id"]
+        if message_id is None:
+            message_id = await get_webhook_message_id(message["entity_type"], message["entity_id"])
+        if message_id is None:
+            if await get_pending_webhook_post(message["entity_type"], message["entity_id"]) is not None:
+                raise MessageNotPosted()
+            return
+        if not await discord_api().patch_webhook(message["hook_url"], message_id, message["payload"]):
+            return
+    elif message["action"] == "delete":
+        await discord_api().delete_webhook(message["hook_url"], message["message_id"])
+    await on_sent(message, msg_id)
+
+
+async def deliver_to(messages: list[dict]) -> None:
+    """
+    Sends the messages of a single webhook in order. Stops at the first one
+    that's rate limited or fails, so they're retried in the same order.
+    """
+    for i, message in enumerate(messages):
+        try:
+            await deliver(message)
+        except WebhookRateLimited as exc:
+            await retry_outbox_webhook(message["id"], exc.retry_after, count_attempt=False)
+        except MessageNotPosted:
+            await retry_outbox_webhook(message["id"], BACKOFF_BASE, count_attempt=False)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            if message["attempts"] + 1 >= MAX_ATTEMPTS:
+                print(f"{purple('[Webhooks]')} {red('Dropping message ' + str(message['id']))}: {exc}")
+                await delete_outbox_webhook(message["id"])
+                continue
+            await retry_outbox_webhook(message["id"], min(BACKOFF_MAX, BACKOFF_BASE * 2 ** message["attempts"]))
+        else:
+            await delete_outbox_webhook(message["id"])
+            continue
+        await release_outbox_webhooks([later["id"] for later in messages[i+1:]])
+        return
+
+
+async def drain_outbox() -> None:
+    """Sends the due messages, concurrently across webhooks."""
+    messages = await claim_due_webhooks(BATCH_SIZE, CLAIM_TIMEOUT)
+    by_hook = defaultdict(list)
+    for message in messages:
+        by_hook[message["hook_url"]].append(message)
+    await asyncio.gather(*[deliver_to(hook_messages) for hook_messages in by_hook.values()])
+
+
+async def run_outbox():
+    """Sends webhook messages in the background, waking up as soon as new ones are added."""
+    print(f"{purple('[Webhooks]')} Outbox worker started")
+    while True:
+        new_message.clear()
+        delay = POLL_INTERVAL
+        try:
+            await drain_outbox()
+            if (next_delay := await get_next_webhook_delay()) is not None:
+                delay = min(delay, next_delay)
+        except Exception as exc:
+            print(f"{purple('[Webhooks]')} {red('Error while sending webhooks')}: {exc}")
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(new_message.wait(), delay)
@@ -0,0 +1,129 @@
+import http
+import asyncio
+import async_timeout
+import pytest
+import src.changes
+import src.db.connection
+from src.db.queries.changes import insert_change_event, number_change_events
+from ..mocks import Permissions
+from ..testutils import HEADERS
+
+
+@src.db.connection.postgres
+async def get_latest_change_id(conn=None) -> int:
+    return await conn.fetchval("SELECT COALESCE(MAX(seq), 0) FROM change_events")
+
+
+async def get_changes(btd6ml_test_client, query: str) -> dict:
+    async with btd6ml_test_client.get(f"/changes?{query}") as resp:
+        assert resp.status == http.HTTPStatus.OK, f"Getting /changes?{query} returns {resp.status}"
+        return await resp.json()
+
+
+@pytest.mark.users
+class TestChanges:
+    async def test_edits_are_recorded(self, btd6ml_test_client, mock_auth):
+        """Test edits are returned as change events, in order"""
+        since = await get_latest_change_id()
+        await mock_auth(perms={None: {Permissions.misc.ban_user}})
+        async with btd6ml_test_client.post("/users/10/ban", headers=HEADERS), \
+                btd6ml_test_client.post("/users/10/unban", headers=HEADERS):
+            pass
+
+        changes = await get_changes(btd6ml_test_client, f"since={since}&timeout=5")
+        if len(changes["events"]) < 2:
+            changes["events"] += (await get_changes(
+                btd6ml_test_client,
+                f"since={changes['next']}&timeout=5",
+            ))["events"]
+
+        events = changes["events"]
+        assert [(ev["type"], ev["entity_id"], ev["data"]) for ev in events] == [
+            ("user", "10", {"is_banned": True}),
+            ("user", "10", {"is_banned": False}),
+        ], "Change events differ from the edits made"
+        assert events[0]["id"] < events[1]["id"], "Change events are not sorted by ID"
+        assert "author" not in events[0], "Change events show who made them"
+
+        changes = await get_changes(btd6ml_test_client, f"since={events[0]['id']}&timeout=0")
+        assert [ev["id"] for ev in changes["events"]] == [events[1]["id"]], \
+            "Change events are not filtered by since"
+
+    async def test_long_poll(self, btd6ml_test_client, mock_auth):
+        """Test waiting for a change wakes up as soon as one happens"""
+        since = await get_latest_change_id()
+        poll = asyncio.create_task(get_changes(btd6ml_test_client, f"since={since}&timeout=30"))
+        await asyncio.sleep(0.5)
+        assert not poll.done(), "Waiting for changes returned before any happened"
+
+        await mock_auth(perms={None: {Permissions.misc.ban_user}})
+        async with btd6ml_test_client.post("/users/11/ban", headers=HEADERS):
+            pass
+
+        changes = await asyncio.wait_for(poll, 5)
+        assert len(changes["events"]) == 1 and changes["events"][0]["entity_id"] == "11", \
+            "Waiting for changes didn't return the new one"
+        assert changes["next"] == changes["events"][0]["id"], "next is not the last event's ID"
+
+    async def test_timeout(self, btd6ml_test_client):
+        """Test waiting for a change returns nothing when none happens"""
+        since = await get_latest_change_id()
+        changes = await get_changes(btd6ml_test_client, f"since={since}&timeout=1")
+        assert changes == {"events": [], "next": since}, "Returned changes even though none happened"
+
+    async def test_invalid_since(self, btd6ml_test_client):
+        """Test getting changes with an invalid cursor"""
+        for since in ["abc", "-1"]:
+            async with btd6ml_test_client.get(f"/changes?since={since}") as resp:
+                assert resp.status == http.HTTPStatus.BAD_REQUEST, \
+                    f"Getting /changes?since={since} returns {resp.status}"
+
+    async def test_rolled_back_edit(self, btd6ml_test_client, mock_auth):
+        """Test edits that fail aren't recorded"""
+        since = await get_latest_change_id()
+        await mock_auth(perms={None: {"create:user"}})
+        async with btd6ml_test_client.post("/users", headers=HEADERS, json={"discord_id": "10", "name": "usr10"}) as resp:
+            assert resp.status == http.HTTPStatus.BAD_REQUEST, f"Adding a duplicate user returns {resp.status}"
+        assert await get_latest_change_id() == since, "A failed edit was recorded"
+
+    async def test_numbered_by_commit(self, btd6ml_test_client, mock_auth):
+        """Test an edit that's still being committed doesn't hold others up, and is numbered after them"""
+        since = await get_latest_change_id()
+        await mock_auth(perms={None: {Permissions.misc.ban_user}})
+        async with src.db.connection.acquire() as conn:
+            async with conn.transaction():
+                await insert_change_event("config", "put", None, {"map_count": 50}, "1", conn=conn)
+                async with async_timeout.timeout(5):
+                    async with btd6ml_test_client.post("/users/13/ban", headers=HEADERS) as resp:
+                        assert resp.status == http.HTTPStatus.NO_CONTENT, \
+                            f"Banning a user while another edit is open returns {resp.status}"
+            await number_change_events(conn=conn)
+
+        changes = await get_changes(btd6ml_test_client, f"since={since}&timeout=5")
+        assert [ev["type"] for ev in changes["events"]] == ["user", "config"], \
+            "Change events aren't numbered in the order they're committed"
+
+    async def test_listener_reconnects(self, btd6ml_test_client, mock_auth, monkeypatch):
+        """Test waiting for changes still works after the listening connection is lost"""
+        monkeypatch.setattr(src.changes, "RECONNECT_DELAY", 0)
+        old_pid = src.changes.listener.get_server_pid()
+        async with src.db.connection.acquire() as conn:
+            await conn.execute("SELECT pg_terminate_backend($1)", old_pid)
+
+        async with async_timeout.timeout(5):
+            while src.changes.listener is None or src.changes.listener.get_server_pid() == old_pid or \
+                    src.changes.listener.is_closed():
+                await asyncio.sleep(0.05)
+        # Until the listener is set up again
+        await asyncio.sleep(0.5)
+
+        since = await get_latest_change_id()
+        poll = asyncio.create_task(get_changes(btd6ml_test_client, f"since={since}&timeout=30"))
+        await asyncio.sleep(0.1)
+        await mock_auth(perms={None: {Permissions.misc.ban_user}})
+        async with btd6ml_test_client.post("/users/12/ban", headers=HEADERS):
+            pass
+
+        changes = await asyncio.wait_for(poll, 5)
+        assert [ev["entity_id"] for ev in changes["events"]] == ["12"], \
+            "Waiting for changes didn't return the new one after reconnecting"
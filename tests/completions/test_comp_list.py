@@ -176,6 +176,31 @@ class TestCompletionList:
 
         await self.assert_empty_pages(btd6ml_test_client, f"/users/42/completions?formats=1,51,2&page={expected_pages+1}")
 
+    async def test_user_completions_cursor(self, btd6ml_test_client):
+        """Test getting a user's completions, following the cursors"""
+        expected_total = 159 - (3+20)
+        endpoint = "/users/42/completions?formats=1,51,2"
+
+        paged_ids = []
+        for pg in range(1, math.ceil(expected_total/50)+1):
+            async with btd6ml_test_client.get(f"{endpoint}&page={pg}") as resp:
+                paged_ids += [compl["id"] for compl in (await resp.json())["completions"]]
+
+        cursor_ids = []
+        async with btd6ml_test_client.get(endpoint) as resp:
+            resp_data = await resp.json()
+        while True:
+            assert resp_data["total"] == expected_total, "Total completions differ from expected"
+            cursor_ids += [compl["id"] for compl in resp_data["completions"]]
+            if resp_data["next"] is None:
+                break
+            async with btd6ml_test_client.get(f"{endpoint}&after={resp_data['next']}") as resp:
+                assert resp.status == http.HTTPStatus.OK, \
+                    f"Getting a user's completions with a cursor returns {resp.status}"
+                resp_data = await resp.json()
+
+        assert cursor_ids == paged_ids, "Completions differ when following cursors"
+
     async def test_own_completions_on(self, btd6ml_test_client, mock_auth):
         """Test getting a user's own completions on a map"""
         TEST_UID = 8
@@ -237,3 +262,37 @@ class TestCompletionList:
                 )
 
         await self.assert_empty_pages(btd6ml_test_client, f"/completions/unapproved?page={expected_pages+1}")
+
+    async def test_unapproved_completions_cursor(self, btd6ml_test_client):
+        """Test getting unapproved runs, following the cursors"""
+        expected_total = 75
+
+        async with btd6ml_test_client.get("/completions/unapproved") as resp:
+            resp_data = await resp.json()
+        compl_ids = set()
+        pages = 0
+        while True:
+            pages += 1
+            assert resp_data["total"] == expected_total, "Total completions differ from expected"
+            compl_ids = self.validate_comp_list(
+                resp_data["completions"],
+                schema_completion_map,
+                only_pending=True,
+                allowed_formats=[1, 2, 51],
+                compl_ids=compl_ids,
+            )
+            if resp_data["next"] is None:
+                break
+            async with btd6ml_test_client.get(f"/completions/unapproved?after={resp_data['next']}") as resp:
+                assert resp.status == http.HTTPStatus.OK, \
+                    f"Getting unapproved completions with a cursor returns {resp.status}"
+                resp_data = await resp.json()
+
+        assert len(compl_ids) == expected_total, "Total completions differ from expected"
+        assert pages == math.ceil(expected_total/50), "Total pages differ from expected"
+
+    async def test_invalid_cursor(self, btd6ml_test_client):
+        """Test using a malformed cursor"""
+        async with btd6ml_test_client.get("/completions/unapproved?after=aaaaa") as resp:
+            assert resp.status == http.HTTPStatus.BAD_REQUEST, \
+                f"Getting unapproved completions with an invalid cursor returns {resp.status}"
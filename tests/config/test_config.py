@@ -219,3 +219,27 @@ class TestValidate:
                 assert resp.status == http.HTTPStatus.FORBIDDEN, \
                     f"Editing config without having perms returned {resp.status}"
 
+
+
+@pytest.mark.get
+async def test_config_cache(btd6ml_test_client, mock_auth):
+    """Test config responses are cached and refreshed after an edit"""
+    async with btd6ml_test_client.get("/config") as resp:
+        assert resp.status == http.HTTPStatus.OK, f"Getting config returned {resp.status}"
+        assert "ETag" in resp.headers, "ETag header not present when getting config"
+        etag = resp.headers["ETag"]
+
+    async with btd6ml_test_client.get("/config", headers={"If-None-Match": etag}) as resp:
+        assert resp.status == http.HTTPStatus.NOT_MODIFIED, \
+            f"Getting config with a matching If-None-Match returned {resp.status}"
+
+    await mock_auth(perms={1: {Permissions.edit.config}})
+    req_data = {"config": {"map_count": 43}}
+    async with btd6ml_test_client.put("/config", headers=HEADERS, json=req_data) as resp:
+        assert resp.status == http.HTTPStatus.OK, f"Editing config returned {resp.status}"
+
+    async with btd6ml_test_client.get("/config", headers={"If-None-Match": etag}) as resp:
+        assert resp.status == http.HTTPStatus.OK, \
+            f"Getting config with an outdated If-None-Match returned {resp.status}"
+        assert resp.headers["ETag"] != etag, "ETag did not change after editing config"
+        assert (await resp.json())["map_count"]["value"] == 43, "Cached config returned after editing it"
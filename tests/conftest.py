@@ -1,6 +1,7 @@
 import asyncio
 import json
 import aiohttp
+import async_timeout
 import os.path
 import pathlib
 import pytest
@@ -9,6 +10,13 @@ import importlib
 import requests
 import src.db.connection
 import src.requests
+import src.utils.responsecache
+import src.utils.searchindex
+import src.utils.formats.formatinfo
+import src.db.queries.users
+import src.db.queries.maps
+import src.changes
+import src.webhooks
 from .mocks.DiscordRequestMock import DiscordRequestMock, DiscordPermRoles
 from .mocks.NinjaKiwiMock import NinjaKiwiMock
 from aiohttp.test_utils import TestServer, TestClient
@@ -58,6 +66,13 @@ async def reset_database():
         await src.db.connection.init_database(test=True, conn=conn)
 
     await restore()
+    src.utils.responsecache.response_cache.clear()
+    src.db.queries.users.invalidate_user_perms()
+    src.utils.formats.formatinfo.get_points_table.clear()
+    src.utils.searchindex.invalidate()
+    src.db.queries.maps.resolve_map_code.clear()
+    # change_events was recreated, so its IDs start over
+    src.changes.latest_id = 0
 
 
 @pytest.fixture(autouse=True)
@@ -92,6 +107,7 @@ async def set_roles():
                 """,
                 uid, roles,
             )
+        src.db.queries.users.invalidate_user_perms(uid)
 
     return fixture
 
@@ -148,6 +164,7 @@ async def set_custom_role():
                 uid, role_id
             )
             inserted_roles.append(role_id)
+        src.db.queries.users.invalidate_user_perms(uid)
 
     @src.db.connection.postgres
     async def cleanup(
@@ -165,6 +182,7 @@ async def set_custom_role():
 
     yield fixture
     await cleanup(inserted_roles)
+    src.db.queries.users.invalidate_user_perms()
 
 
 @pytest_asyncio.fixture(scope="function")
@@ -191,6 +209,7 @@ async def add_role():
                 uid, role_id,
             )
             inserted_roles.append((uid, role_id))
+        src.db.queries.users.invalidate_user_perms(uid)
 
     @src.db.connection.postgres
     async def cleanup(
@@ -211,6 +230,7 @@ async def add_role():
 
     yield fixture
     await cleanup(inserted_roles)
+    src.db.queries.users.invalidate_user_perms()
 
 
 @pytest_asyncio.fixture(scope="function", autouse=True)
@@ -231,6 +251,7 @@ async def mock_auth(mock_discord_api, set_roles, set_custom_role):
             ;
             """
         )
+        src.db.queries.users.invalidate_user_perms()
 
     async def set_mock(**kwargs) -> None:
         mocker = mock_discord_api(**kwargs)
@@ -253,6 +274,22 @@ def mock_ninja_kiwi_api():
     return set_mock
 
 
+@pytest_asyncio.fixture(scope="function")
+async def pause_outbox(monkeypatch):
+    """
+    Stops the webhook outbox worker from using the pool in the background, and
+    waits for it to give back its connection if it's in the middle of a drain.
+    """
+    async def idle() -> None:
+        return None
+    monkeypatch.setattr(src.webhooks, "drain_outbox", idle)
+    monkeypatch.setattr(src.webhooks, "get_next_webhook_delay", idle)
+
+    async with async_timeout.timeout(5):
+        while src.db.connection.metrics.in_use > 0:
+            await asyncio.sleep(0.01)
+
+
 @pytest.fixture(scope="session")
 def btd6ml_app():
     """The main Application"""
@@ -362,6 +399,8 @@ def assert_state_unchanged(btd6ml_test_client):
 
         async def __aexit__(self, exception_type, exception_value, exception_traceback):
             if exception_type != AssertionError:
+                # Otherwise a write that forgot to invalidate would go unnoticed
+                src.utils.responsecache.response_cache.clear()
                 async with btd6ml_test_client.get(self.endpoint) as resp:
                     assert self.prev_code == resp.status, f"{self.endpoint} response code changed"
                     content_length = int(resp.headers.get("Content-Length", "0"))
@@ -0,0 +1,34 @@
+import asyncio
+import pytest
+import src.db.connection
+
+
+@pytest.mark.get
+class TestFanOut:
+    async def test_results(self, btd6ml_test_client, pause_outbox):
+        """Test results are returned in the order of the calls"""
+        async def query(value: int, conn=None) -> int:
+            await asyncio.sleep(0.01 * (3 - value))
+            return await conn.fetchval("SELECT $1::int", value)
+
+        calls = [lambda conn=None, i=i: query(i, conn=conn) for i in range(3)]
+        assert await src.db.connection.fan_out(*calls) == [0, 1, 2], "Results aren't in the order of the calls"
+
+    async def test_failure(self, btd6ml_test_client, pause_outbox):
+        """Test the other calls are cancelled and give back their connection if one fails"""
+        cancelled = []
+
+        async def slow(conn=None) -> None:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def failing(conn=None) -> None:
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            await src.db.connection.fan_out(slow, failing)
+        assert cancelled == [True], "The other calls weren't cancelled"
+        assert src.db.connection.metrics.in_use == 0, "Connections weren't given back"
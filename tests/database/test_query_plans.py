@@ -0,0 +1,111 @@
+import json
+import asyncpg.pool
+import pytest
+import src.db.connection
+import src.db.queries.maps
+import src.db.queries.users
+import src.db.queries.search
+
+# (description, call to the query functions, relations that must be read through an index)
+HOT_QUERIES = [
+    (
+        "Accepted completions of a map",
+        lambda: src.db.queries.maps.get_completions_for("MLXXXEE", [1, 51]),
+        {"completions", "completions_meta", "comp_players", "completion_proofs"},
+    ),
+    (
+        "Accepted completions of a user",
+        lambda: src.db.queries.users.get_completions_by("37", [1, 51]),
+        {"completions", "completions_meta", "comp_players", "completion_proofs"},
+    ),
+    (
+        "Accepted completions of a user, after a cursor",
+        lambda: src.db.queries.users.get_completions_by("37", [1, 51], after=("MLXXXAA", True, True, True, 1)),
+        {"completions", "completions_meta", "comp_players", "completion_proofs"},
+    ),
+    (
+        "Map by identifier",
+        lambda: src.db.queries.maps.resolve_map_code("ml45"),
+        {"map_lookup_keys"},
+    ),
+    (
+        "User by name",
+        lambda: src.db.queries.users.get_user_min("usr37"),
+        {"users"},
+    ),
+    (
+        "Search",
+        lambda: src.db.queries.search.search("maplist map", ["map", "user"], 10),
+        {"maps", "map_aliases", "users"},
+    ),
+    (
+        "Map details",
+        lambda: src.db.queries.maps.get_map("MLXXXEE"),
+        {"maps", "creators", "verifications", "mapver_compatibilities", "additional_codes", "map_aliases"},
+    ),
+]
+
+
+@pytest.fixture
+def captured_queries(monkeypatch, pause_outbox) -> list[tuple[str, tuple]]:
+    """Every statement run through a pooled connection, along with its arguments."""
+    captured = []
+
+    def capture(meth_name: str):
+        original = getattr(asyncpg.pool.PoolConnectionProxy, meth_name)
+
+        async def wrapper(self, query: str, *args, **kwargs):
+            captured.append((query, args))
+            return await original(self, query, *args, **kwargs)
+        return wrapper
+
+    for meth_name in ["execute", "fetch", "fetchrow", "fetchval"]:
+        monkeypatch.setattr(asyncpg.pool.PoolConnectionProxy, meth_name, capture(meth_name))
+    return captured
+
+
+def find_seq_scans(plan: dict) -> set[str]:
+    scans = set()
+    if plan["Node Type"] == "Seq Scan":
+        scans.add(plan["Relation Name"])
+    for subplan in plan.get("Plans", []):
+        scans |= find_seq_scans(subplan)
+    return scans
+
+
+@src.db.connection.postgres
+async def explain(statements: list[tuple[str, tuple]], conn=None) -> list[dict]:
+    """
+    Replays the settings changed by `statements` and returns the plan of every query among them.
+
+    The test dataset is a few hundred rows per table, where the planner rightly prefers
+    sequential scans, so plans on it with default settings say nothing about production.
+    With sequential scans disabled, one is only left in a plan if no index can serve
+    that part of the query, which is the regression this test looks for.
+    """
+    plans = []
+    async with conn.transaction():
+        await conn.execute("SET LOCAL enable_seqscan = off")
+        for query, args in statements:
+            if query.lstrip().upper().startswith("SET "):
+                await conn.execute(query, *args)
+                continue
+            plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *args)
+            plans.append(json.loads(plan)[0]["Plan"])
+    return plans
+
+
+@pytest.mark.get
+@pytest.mark.parametrize("description, call, relations", HOT_QUERIES)
+async def test_hot_queries_use_indexes(description, call, relations, btd6ml_test_client, captured_queries):
+    """Test the most frequent queries don't scan whole tables"""
+    src.db.queries.maps.resolve_map_code.clear()
+    await call()
+    statements = list(captured_queries)
+    captured_queries.clear()
+    assert len(statements), f"{description} didn't run any query"
+
+    seq_scans = set()
+    for plan in await explain(statements):
+        seq_scans |= find_seq_scans(plan) & relations
+    assert not len(seq_scans), f"{description} scans {', '.join(sorted(seq_scans))} sequentially"
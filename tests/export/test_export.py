@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+import http
+import time
+import pytest
+import src.db.connection
+import src.db.queries.exports
+import src.db.queries.completions
+import src.utils.streaming
+
+completion_keys = [
+    "id", "map", "format", "black_border", "no_geraldo", "lcc_leftover", "users",
+    "subm_proof_img", "subm_proof_vid", "submitted_on", "updated_on", "deleted_on",
+]
+map_keys = [
+    "code", "name", "placement_curver", "placement_allver", "difficulty", "botb_difficulty",
+    "remake_of", "optimal_heros", "r6_start", "map_data", "map_preview_url", "deleted_on",
+    "updated_on",
+]
+
+
+@src.db.connection.postgres
+async def count_accepted_completions(conn=None) -> int:
+    return await conn.fetchval(
+        """
+        SELECT COUNT(*)
+        FROM latest_completions
+        WHERE accepted_by IS NOT NULL
+            AND deleted_on IS NULL
+        """
+    )
+
+
+async def export(btd6ml_test_client, path: str) -> list[dict] | list[list[str]]:
+    async with btd6ml_test_client.get(path) as resp:
+        assert resp.status == http.HTTPStatus.OK, f"Exporting {path} returns {resp.status}"
+        body = await resp.text()
+        if resp.content_type == "text/csv":
+            return list(csv.reader(io.StringIO(body)))
+        assert resp.content_type == "application/x-ndjson", f"Exporting {path} has the wrong content type"
+        return [json.loads(line) for line in body.splitlines()]
+
+
+@pytest.mark.get
+class TestExport:
+    async def test_export_completions(self, btd6ml_test_client):
+        """Test exporting every accepted completion"""
+        rows = await export(btd6ml_test_client, "/export/completions")
+        assert len(rows) == await count_accepted_completions(), \
+            "Exported completions differ from the accepted ones"
+        assert list(rows[0].keys()) == completion_keys, "Exported completions have the wrong keys"
+        assert all(rows[i]["id"] < rows[i+1]["id"] for i in range(len(rows)-1)), \
+            "Exported completions are not sorted by ID"
+
+        csv_rows = await export(btd6ml_test_client, "/export/completions?output=csv")
+        assert csv_rows[0] == completion_keys, "CSV header differs from the column names"
+        assert len(csv_rows) == len(rows) + 1, "CSV export differs from the NDJSON one"
+        assert csv_rows[1][completion_keys.index("users")] == ";".join(str(u) for u in rows[0]["users"]), \
+            "Array fields are not joined in the CSV export"
+
+    async def test_export_since(self, btd6ml_test_client):
+        """Test only exporting rows edited after a timestamp"""
+        all_comps = await export(btd6ml_test_client, "/export/completions")
+        since = sorted(comp["updated_on"] for comp in all_comps)[len(all_comps) // 2]
+        recent_comps = await export(btd6ml_test_client, f"/export/completions?since={since}")
+        assert [comp for comp in recent_comps if comp["deleted_on"] is None] == \
+               [comp for comp in all_comps if comp["updated_on"] >= since], \
+            "Completions since a timestamp differ from the filtered export"
+        assert all(comp["updated_on"] >= since or comp["deleted_on"] >= since for comp in recent_comps), \
+            "Exported completions that didn't change after the timestamp"
+
+        all_maps = await export(btd6ml_test_client, "/export/maps")
+        latest = max(map_["updated_on"] for map_ in all_maps)
+        assert len(await export(btd6ml_test_client, f"/export/maps?since={latest+1}")) == 0, \
+            "Exported maps edited after the latest change"
+
+    async def test_export_deleted_since(self, btd6ml_test_client):
+        """Test completions deleted after a timestamp are exported with their deletion date"""
+        all_comps = await export(btd6ml_test_client, "/export/completions")
+        assert all(comp["deleted_on"] is None for comp in all_comps), "Full export has deleted completions"
+
+        since = int(time.time()) - 5
+        deleted_id = all_comps[0]["id"]
+        await src.db.queries.completions.delete_completion(deleted_id)
+
+        recent_comps = await export(btd6ml_test_client, f"/export/completions?since={since}")
+        deleted = [comp for comp in recent_comps if comp["id"] == deleted_id]
+        assert len(deleted) == 1 and deleted[0]["deleted_on"] >= since, \
+            "Completion deleted after the timestamp isn't exported as deleted"
+        assert deleted_id not in [comp["id"] for comp in await export(btd6ml_test_client, "/export/completions")], \
+            "Full export has a deleted completion"
+
+    async def test_export_maps(self, btd6ml_test_client):
+        """Test exporting every map"""
+        rows = await export(btd6ml_test_client, "/export/maps")
+        assert list(rows[0].keys()) == map_keys, "Exported maps have the wrong keys"
+
+        async with btd6ml_test_client.get(f"/maps/{rows[0]['code']}") as resp:
+            expected = await resp.json()
+            for key in ["name", "placement_curver", "placement_allver", "difficulty", "r6_start"]:
+                assert rows[0][key] == expected[key], f"Exported map differs in {key}"
+
+        async with btd6ml_test_client.get("/maps") as resp:
+            codes = {row["code"] for row in rows if row["deleted_on"] is None}
+            assert {map_["code"] for map_ in await resp.json()} <= codes, \
+                "Some list maps are not exported"
+
+    async def test_export_leaderboard(self, btd6ml_test_client):
+        """Test exporting the leaderboards"""
+        rows = await export(btd6ml_test_client, "/export/leaderboard")
+        points = [row for row in rows if row["lb_format"] == 1 and row["lb_type"] == "points"]
+
+        async with btd6ml_test_client.get("/maps/leaderboard?format=1") as resp:
+            entries = (await resp.json())["entries"]
+            assert [str(row["user_id"]) for row in points[:len(entries)]] == \
+                   [entry["user"]["id"] for entry in entries], \
+                "Exported leaderboard differs from the paginated one"
+
+    async def test_invalid_params(self, btd6ml_test_client):
+        """Test exporting with invalid parameters"""
+        for path, key in [
+            ("/export/completions?output=xml", "output"),
+            ("/export/maps?since=yesterday", "since"),
+            ("/export/leaderboard?since=0", "since"),
+        ]:
+            async with btd6ml_test_client.get(path) as resp:
+                assert resp.status == http.HTTPStatus.BAD_REQUEST, f"Exporting {path} returns {resp.status}"
+                assert key in (await resp.json())["errors"], f"Exporting {path} doesn't report {key}"
+
+    async def test_cors(self, btd6ml_test_client):
+        """Test streamed exports have CORS headers"""
+        async with btd6ml_test_client.get("/export/maps", headers={"Origin": "https://example.com"}) as resp:
+            assert resp.headers.get("Access-Control-Allow-Origin") == "https://example.com", \
+                "Streamed export has no CORS header"
+
+    async def test_too_many_exports(self, btd6ml_test_client, monkeypatch):
+        """Test exports are rejected while too many are in progress"""
+        monkeypatch.setattr(src.utils.streaming, "export_slots", src.utils.streaming.asyncio.Semaphore(0))
+        async with btd6ml_test_client.get("/export/maps") as resp:
+            assert resp.status == http.HTTPStatus.SERVICE_UNAVAILABLE, \
+                f"Exporting while too many exports are in progress returns {resp.status}"
+
+    async def test_query_error(self, btd6ml_test_client, monkeypatch):
+        """Test exports whose query fails return an error instead of an empty body"""
+        async def failing_query(_query: str, *_args):
+            raise ValueError("Query failed")
+            yield
+        monkeypatch.setattr(src.db.queries.exports, "stream_query", failing_query)
+        async with btd6ml_test_client.get("/export/completions") as resp:
+            assert resp.status == http.HTTPStatus.INTERNAL_SERVER_ERROR, \
+                f"Exporting with a failing query returns {resp.status}"
@@ -0,0 +1,100 @@
+import io
+import os
+import http
+import pytest
+import src.utils.banners
+from PIL import Image
+
+BANNER = "ProfileBanner43.png"
+
+
+def medal_query(wins: int, output: str = "png") -> str:
+    return f"wins={wins}&black_border=2&no_geraldo=0&lccs=1&output={output}"
+
+
+@pytest.fixture
+def mock_banner(tmp_path, monkeypatch):
+    downloads = []
+
+    async def download_banner(banner: str) -> bytes | None:
+        downloads.append(banner)
+        if banner != BANNER:
+            return None
+        media = io.BytesIO()
+        Image.new("RGB", (768, 96), "blue").save(media, format="png")
+        return media.getvalue()
+
+    monkeypatch.setattr(src.utils.banners, "download_banner", download_banner)
+    monkeypatch.setattr(src.utils.banners, "banner_dir", lambda: str(tmp_path))
+    src.utils.banners.get_base_banner.clear()
+    src.utils.banners.get_medal_banner.clear()
+    yield downloads
+    src.utils.banners.get_base_banner.clear()
+    src.utils.banners.get_medal_banner.clear()
+
+
+@pytest.mark.get
+class TestMedalBanner:
+    async def test_render(self, btd6ml_test_client, mock_banner, tmp_path):
+        """Test rendering banners, reusing the downloaded banner and saving the result"""
+        for wins, output in [(3, "png"), (5, "png"), (3, "webp")]:
+            async with btd6ml_test_client.get(f"/img/medal-banner/{BANNER}?{medal_query(wins, output)}") as resp:
+                assert resp.status == http.HTTPStatus.OK, f"Getting a medal banner returns {resp.status}"
+                assert resp.content_type == f"image/{output}", f"Banner has content type {resp.content_type}"
+                assert "ETag" in resp.headers and "Cache-Control" in resp.headers, "Banner is missing cache headers"
+                with Image.open(io.BytesIO(await resp.read())) as image:
+                    assert image.format == output.upper() and image.size == src.utils.banners.BANNER_SIZE, \
+                        "Banner wasn't rendered at the right size or format"
+        assert mock_banner == [BANNER], "Banner was downloaded more than once"
+        assert len(os.listdir(tmp_path)) == 3, "Rendered banners weren't saved to disk"
+
+    async def test_cached(self, btd6ml_test_client, mock_banner):
+        """Test getting a banner that was already rendered"""
+        url = f"/img/medal-banner/{BANNER}?{medal_query(4)}"
+        async with btd6ml_test_client.get(url) as resp:
+            etag = resp.headers["ETag"]
+            image = await resp.read()
+
+        src.utils.banners.get_base_banner.clear()
+        src.utils.banners.get_medal_banner.clear()
+        async with btd6ml_test_client.get(url) as resp:
+            assert await resp.read() == image, "Banner read from disk differs from the rendered one"
+        assert mock_banner == [BANNER], "Banner was rendered again"
+
+        async with btd6ml_test_client.get(url, headers={"If-None-Match": etag}) as resp:
+            assert resp.status == http.HTTPStatus.NOT_MODIFIED, \
+                f"Getting a banner with a matching ETag returns {resp.status}"
+
+    async def test_invalid(self, btd6ml_test_client, mock_banner):
+        """Test getting banners with invalid parameters"""
+        urls = [
+            f"/img/medal-banner/Missing.png?{medal_query(1)}",
+            f"/img/medal-banner/{BANNER}?{medal_query(1, 'gif')}",
+            f"/img/medal-banner/{BANNER}?wins=1",
+        ]
+        for url in urls:
+            async with btd6ml_test_client.get(url) as resp:
+                assert resp.status == http.HTTPStatus.BAD_REQUEST, f"Getting {url} returns {resp.status}"
+
+    async def test_clamped(self, btd6ml_test_client, mock_banner):
+        """Test medal counts are capped"""
+        etags = []
+        for wins in [src.utils.banners.MEDAL_MAX, 10**30]:
+            async with btd6ml_test_client.get(f"/img/medal-banner/{BANNER}?{medal_query(wins)}") as resp:
+                assert resp.status == http.HTTPStatus.OK, f"Getting a banner with {wins} wins returns {resp.status}"
+                etags.append(resp.headers["ETag"])
+        assert etags[0] == etags[1], "Medal count over the max wasn't capped"
+
+    async def test_disk_bounded(self, btd6ml_test_client, mock_banner, tmp_path, monkeypatch):
+        """Test the oldest rendered banners are deleted once they take up too much space"""
+        sizes = []
+        for wins in range(1, 4):
+            async with btd6ml_test_client.get(f"/img/medal-banner/{BANNER}?{medal_query(wins)}") as resp:
+                assert resp.status == http.HTTPStatus.OK, f"Getting a medal banner returns {resp.status}"
+                sizes.append(len(await resp.read()))
+            if wins == 1:
+                # Room for about two banners
+                monkeypatch.setattr(src.utils.banners, "banner_dir_max_bytes", lambda: int(sizes[0] * 2.5))
+        assert len(os.listdir(tmp_path)) == 2, "Rendered banners weren't deleted"
+        assert not os.path.exists(tmp_path / f"{src.utils.banners.banner_key(BANNER, (1, 2, 0, 1), 'png')}.png"), \
+            "Rendered banners weren't deleted oldest first"
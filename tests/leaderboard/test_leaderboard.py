@@ -1,12 +1,18 @@
 import pytest
 import http
-import src.utils.misc
+import src.db.connection
+import src.utils.formats.formatinfo
 from ..mocks import Permissions
 from ..testutils import to_formdata
 
 HEADERS = {"Authorization": "Bearer test_client"}
 
 
+def point_formula(idx, points_btm, points_top, map_count, slope) -> float:
+    """Points given by a placement, computed independently of listmap_points."""
+    return points_btm * (points_top / points_btm) ** ((1 + (1 - idx) / (map_count - 1)) ** slope)
+
+
 async def calc_ml_user_points(user_id: int, btd6ml_test_client) -> int:
     async with btd6ml_test_client.get("/config") as resp:
         config = await resp.json()
@@ -28,7 +34,7 @@ async def calc_ml_user_points(user_id: int, btd6ml_test_client) -> int:
             points += raw_pts * multiplier
             multiplier = 1
             if compl["map"]["placement_curver"] in range(1, config["map_count"]["value"]+1):
-                raw_pts = src.utils.misc.point_formula(
+                raw_pts = point_formula(
                     compl["map"]["placement_curver"],
                     config["points_bottom_map"]["value"],
                     config["points_top_map"]["value"],
@@ -205,6 +211,31 @@ class TestLeaderboard:
             "User Black Border count differs from expected"
 
 
+    async def test_leaderboard_cursor(self, btd6ml_test_client):
+        """Test following the leaderboard's cursors returns the same entries as its pages"""
+        async with btd6ml_test_client.get("/maps/leaderboard?format=2") as resp:
+            resp_data = await resp.json()
+        total = resp_data["total"]
+
+        paged_entries = []
+        for pg in range(1, resp_data["pages"]+1):
+            async with btd6ml_test_client.get(f"/maps/leaderboard?format=2&page={pg}") as resp:
+                paged_entries += (await resp.json())["entries"]
+
+        cursor_entries = []
+        while True:
+            assert resp_data["total"] == total, "Leaderboard total differs between pages"
+            cursor_entries += resp_data["entries"]
+            if resp_data["next"] is None:
+                break
+            async with btd6ml_test_client.get(f"/maps/leaderboard?format=2&after={resp_data['next']}") as resp:
+                assert resp.status == http.HTTPStatus.OK, \
+                    f"Getting the leaderboard with a cursor returns {resp.status}"
+                resp_data = await resp.json()
+
+        assert cursor_entries == paged_entries, "Leaderboard entries differ when following cursors"
+
+
 @pytest.mark.completions
 class TestRecalc:
     async def test_config_recalc(self, btd6ml_test_client, mock_auth):
@@ -241,6 +272,21 @@ class TestRecalc:
         assert await get_lb_score(user_id, 1, "points", btd6ml_test_client) == points, \
             "Maplist user points differ from expected"
 
+        src.utils.formats.formatinfo.get_points_table.clear()
+        points_table = await src.utils.formats.formatinfo.get_points_table()
+        async with btd6ml_test_client.get("/config") as resp:
+            map_count = (await resp.json())["map_count"]["value"]
+        expected_points = {
+            placement: round(
+                point_formula(placement, req_config["points_bottom_map"], req_config["points_top_map"],
+                              map_count, req_config["formula_slope"]),
+                req_config["decimal_digits"],
+            )
+            for placement in range(1, map_count+1)
+        }
+        assert points_table.points == pytest.approx(expected_points), \
+            "Points table differs from the formula"
+
         user_id = 39
         points = await calc_exp_user_points(user_id, btd6ml_test_client)
         assert await get_lb_score(user_id, 51, "points", btd6ml_test_client) == points, \
@@ -311,3 +357,43 @@ class TestRecalc:
         points = await calc_exp_user_points(USER_ID, btd6ml_test_client)
         assert await get_lb_score(USER_ID, 51, "points", btd6ml_test_client) == points, \
             "User points differ from expected"
+
+    async def test_deletion_recalc(self, btd6ml_test_client, mock_auth):
+        """Test the point leaderboards are updated when an accepted completion is deleted"""
+        USER_ID = 47
+        await mock_auth(perms={None: Permissions.mod()})
+
+        async with btd6ml_test_client.get(f"/users/{USER_ID}/completions?formats=1") as resp:
+            assert resp.status == http.HTTPStatus.OK, f"Get a user's completions returned {resp.status}"
+            completion_id = (await resp.json())["completions"][0]["id"]
+
+        async with btd6ml_test_client.delete(f"/completions/{completion_id}", headers=HEADERS) as resp:
+            assert resp.status == http.HTTPStatus.NO_CONTENT, f"Deleting a completion returned {resp.status}"
+
+        points = await calc_ml_user_points(USER_ID, btd6ml_test_client)
+        assert await get_lb_score(USER_ID, 1, "points", btd6ml_test_client) == pytest.approx(points), \
+            "User points differ from expected"
+
+    async def test_map_edit_marks_formats(self, btd6ml_test_client):
+        """Test map edits only mark the leaderboards of the formats they change as stale"""
+        async with src.db.connection.acquire() as conn:
+            tr = conn.transaction()
+            await tr.start()
+            try:
+                await conn.execute(
+                    """
+                    INSERT INTO map_list_meta
+                        (code, placement_curver, placement_allver, difficulty, botb_difficulty, optimal_heros)
+                    SELECT code, placement_curver, placement_allver, difficulty + 1, botb_difficulty, optimal_heros
+                    FROM current_map_list_meta
+                    WHERE difficulty IS NOT NULL
+                        AND deleted_on IS NULL
+                    LIMIT 1
+                    """
+                )
+                stale = await conn.fetch("SELECT lb_format, lb_type FROM leaderboard_stale")
+            finally:
+                await tr.rollback()
+
+        assert len(stale) and {row["lb_format"] for row in stale} == {51}, \
+            "A difficulty change marked other formats' leaderboards as stale"
@@ -0,0 +1,58 @@
+import os
+import csv
+import gzip
+import json
+import pytest
+import config
+import src.log
+
+
+def read_rows(path: str) -> list[list[str]]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt") as flog:
+        return list(csv.reader(flog))
+
+
+@pytest.mark.users
+class TestChangelog:
+    async def test_batched_writes(self, btd6ml_test_client, tmp_path, monkeypatch):
+        """Test logged actions are written in a single batch"""
+        # Rows logged by earlier tests
+        await src.log.flush()
+        monkeypatch.setattr(config, "PERSISTENT_DATA_PATH", str(tmp_path))
+        os.makedirs(os.path.join(tmp_path, "logs"))
+        batches = []
+        write_batch = src.log.write_batch
+
+        async def count_batches(rows):
+            batches.append(len(rows))
+            await write_batch(rows)
+        monkeypatch.setattr(src.log, "write_batch", count_batches)
+
+        for i in range(3):
+            await src.log.log_action("config", "put", None, {"map_count": i}, 1)
+        await src.log.flush()
+        assert batches == [3], f"Logged rows were written in batches of {batches}"
+
+        rows = read_rows(os.path.join(tmp_path, "logs", "changes.log"))
+        assert [(row[1], json.loads(row[4])) for row in rows] == [
+            ("config", {"map_count": i}) for i in range(3)
+        ], "Logged rows differ from the logged actions"
+
+    async def test_rotation(self, btd6ml_test_client, tmp_path, monkeypatch):
+        """Test the logfile is rotated and compressed once it's too big"""
+        monkeypatch.setattr(config, "PERSISTENT_DATA_PATH", str(tmp_path))
+        os.makedirs(os.path.join(tmp_path, "logs"))
+        monkeypatch.setattr(config, "LOG_MAX_SIZE", 1, raising=False)
+        monkeypatch.setattr(config, "LOG_COMPRESS", True, raising=False)
+        for i in range(2):
+            await src.log.log_action("map", "put", f"MLXXX0{i}", None, 1)
+            await src.log.flush()
+
+        log_path = os.path.join(tmp_path, "logs")
+        rotated = [fname for fname in os.listdir(log_path) if fname != "changes.log"]
+        assert len(rotated) == 1 and rotated[0].endswith(".log.gz"), "Logfile wasn't rotated and compressed"
+        assert read_rows(os.path.join(log_path, rotated[0]))[0][3] == "MLXXX00", \
+            "Rotated logfile doesn't have the older rows"
+        assert [row[3] for row in read_rows(os.path.join(log_path, "changes.log"))] == ["MLXXX01"], \
+            "Current logfile doesn't have only the newer rows"
@@ -1,5 +1,7 @@
 import http
 import pytest
+import src.db.connection
+from src.db.queries.maps import get_map
 from ..mocks import Permissions
 from ..testutils import to_formdata, fuzz_data, invalidate_field
 
@@ -74,6 +76,22 @@ class TestGetMaps:
         await self.assert_get_correct(btd6ml_test_client, "ml45", "MLXXXEE")
         await self.assert_get_correct(btd6ml_test_client, "deleted maplist map 0", "MLXXXEE")
 
+    async def test_uncommitted_alias(self, btd6ml_test_client):
+        """Test identifiers resolved in a transaction aren't cached"""
+        async with src.db.connection.acquire() as conn:
+            tr = conn.transaction()
+            await tr.start()
+            try:
+                await conn.execute("INSERT INTO map_aliases (map, alias) VALUES ('MLXXXEE', 'uncommitted_alias')")
+                assert (await get_map("uncommitted_alias", partial=True, conn=conn)).code == "MLXXXEE", \
+                    "Alias added in the transaction wasn't resolved"
+            finally:
+                await tr.rollback()
+
+        async with btd6ml_test_client.get("/maps/uncommitted_alias") as resp:
+            assert resp.status == http.HTTPStatus.NOT_FOUND, \
+                f"Getting a map by a rolled back alias returned {resp.status}"
+
     async def test_get_by_placement(self, btd6ml_test_client):
         """Test getting a map by its placement"""
         await self.assert_get_correct(btd6ml_test_client, "45", "MLXXXEE")
@@ -753,6 +771,48 @@ class TestEditMaps:
                 assert resp_map_data["aliases"] == ["other_deleted_map_alias1"], \
                     "Deleted alias still in old map's data"
 
+    @pytest.mark.put
+    async def test_edit_after_map_count_change(self, btd6ml_test_client, mock_auth, map_payload):
+        """Test a new map count is used right away when validating placements"""
+        async def edit_placement(expected: int):
+            form_data = to_formdata({**map_payload(code), "placement_curver": 52})
+            async with btd6ml_test_client.put(f"/maps/{code}", headers=HEADERS, data=form_data) as resp:
+                assert resp.status == http.HTTPStatus.NO_CONTENT, \
+                    f"Editing map placement returned {resp.status}"
+            async with btd6ml_test_client.get(f"/maps/{code}") as resp_get:
+                assert (await resp_get.json())["placement_curver"] == expected, \
+                    "Map.placement_curver differs from expected"
+
+        await mock_auth(perms={1: {Permissions.edit.config, *Permissions.curator()}})
+        async with btd6ml_test_client.get("/maps/56") as resp:
+            code = (await resp.json())["code"]
+
+        await edit_placement(56)
+        async with btd6ml_test_client.put("/config", headers=HEADERS, json={"config": {"map_count": 60}}) as resp:
+            assert resp.status == http.HTTPStatus.OK, f"Editing config returned {resp.status}"
+        await edit_placement(52)
+
+    @pytest.mark.put
+    async def test_edit_identifiers(self, btd6ml_test_client, mock_auth, map_payload):
+        """Test a map is found by its new name and placement right after editing them"""
+        await mock_auth(perms={None: Permissions.curator()})
+        async with btd6ml_test_client.get("/maps/30") as resp:
+            code = (await resp.json())["code"]
+        async with btd6ml_test_client.get("/maps/31") as resp:
+            pushed_code = (await resp.json())["code"]
+
+        req_map_data = {**map_payload(code), "name": "Renamed Map", "placement_curver": 31}
+        async with btd6ml_test_client.put(f"/maps/{code}", headers=HEADERS, data=to_formdata(req_map_data)) as resp:
+            assert resp.status == http.HTTPStatus.NO_CONTENT, \
+                f"Editing map returned {resp.status}"
+
+        for identifier, expected_code in [("renamed map", code), ("31", code), ("30", pushed_code)]:
+            async with btd6ml_test_client.get(f"/maps/{identifier}") as resp:
+                assert resp.status == http.HTTPStatus.OK, \
+                    f"GET /maps/{identifier} returned {resp.status}"
+                assert (await resp.json())["code"] == expected_code, \
+                    f"GET /maps/{identifier} did not return {expected_code}"
+
 
 @pytest.mark.put
 @pytest.mark.post
@@ -793,3 +853,36 @@ async def test_large_placements(btd6ml_test_client, mock_auth, map_payload, vali
     async with btd6ml_test_client.post("/maps", headers=HEADERS, data=to_formdata(req_map_data)) as resp:
         assert resp.status == http.HTTPStatus.BAD_REQUEST, \
             f"Adding map with large placements as a list moderator returns {resp.status}"
+
+
+@pytest.mark.get
+@pytest.mark.maps
+async def test_get_batch(btd6ml_test_client):
+    """Test getting several maps at once returns the same data as getting them one by one"""
+    def normalize(map_data: dict) -> dict:
+        # Proofs aren't in any particular order
+        for lcc in map_data["lccs"]:
+            lcc["subm_proof_img"].sort()
+            lcc["subm_proof_vid"].sort()
+        map_data["lccs"].sort(key=lambda x: x["id"])
+        return map_data
+
+    codes = ["MLXXXEE", "MLXXXAJ", "DELXXAJ", "MLXXXED"]
+    expected = []
+    for code in codes:
+        async with btd6ml_test_client.get(f"/maps/{code}") as resp:
+            expected.append(normalize(await resp.json()))
+
+    async with btd6ml_test_client.get(f"/maps/batch?codes={','.join(codes)},NOTAMAP,MLXXXEE") as resp:
+        assert resp.status == http.HTTPStatus.OK, f"Getting maps in batch returned {resp.status}"
+        assert [normalize(m) for m in await resp.json()] == expected, \
+            "Maps in batch differ from the ones got one by one"
+
+    async with btd6ml_test_client.get("/maps/batch?codes=") as resp:
+        assert resp.status == http.HTTPStatus.BAD_REQUEST, \
+            f"Getting maps in batch without codes returned {resp.status}"
+
+    too_many = ",".join(f"CODE{i}" for i in range(51))
+    async with btd6ml_test_client.get(f"/maps/batch?codes={too_many}") as resp:
+        assert resp.status == http.HTTPStatus.BAD_REQUEST, \
+            f"Getting too many maps in batch returned {resp.status}"
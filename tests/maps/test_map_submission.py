@@ -68,6 +68,29 @@ class TestGetSubmissions:
                 assert resp_page_data["total"] == 0, "Total submission count on overflown page differs from expected"
                 assert resp_page_data["pages"] == 0, "Total page count on overflown page differs from expected"
 
+    async def test_submissions_cursor(self, btd6ml_test_client):
+        """Test getting the submissions, following the cursors"""
+        expected_items = 120-9
+
+        paged_ids = []
+        for i in range(1, math.ceil(expected_items/50)+1):
+            async with btd6ml_test_client.get(f"/maps/submit?page={i}") as resp_page:
+                paged_ids += [(subm["code"], subm["format"]) for subm in (await resp_page.json())["submissions"]]
+
+        cursor_ids = []
+        async with btd6ml_test_client.get("/maps/submit") as resp:
+            resp_data = await resp.json()
+        while True:
+            assert resp_data["total"] == expected_items, "Total submission count differs from expected"
+            cursor_ids += [(subm["code"], subm["format"]) for subm in resp_data["submissions"]]
+            if resp_data["next"] is None:
+                break
+            async with btd6ml_test_client.get(f"/maps/submit?after={resp_data['next']}") as resp:
+                assert resp.status == http.HTTPStatus.OK, f"GET /maps/submit with a cursor returned {resp.status}"
+                resp_data = await resp.json()
+
+        assert cursor_ids == paged_ids, "Submissions differ when following cursors"
+
     async def test_all_submissions(self, btd6ml_test_client):
         """Test getting all submissions, even rejected ones"""
         async with btd6ml_test_client.get("/maps/submit?pending=all") as resp:
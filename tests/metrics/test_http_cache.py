@@ -0,0 +1,132 @@
+import pytest
+import aiohttp_client_cache
+import src.http
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+URL_TTL = 60
+
+
+@pytest.fixture
+async def remote_api():
+    """A server counting how many requests it gets, by path."""
+    calls = {}
+
+    async def handler(request: web.Request) -> web.Response:
+        calls[request.path] = calls.get(request.path, 0) + 1
+        return web.Response(body=b"x" * 100 + request.headers.get("Authorization", "").encode())
+
+    app = web.Application()
+    app.router.add_get("/{path}", handler)
+    server = TestServer(app)
+    await server.start_server()
+    yield server, calls
+    await server.close()
+
+
+def make_backend(tmp_path, memory_bytes: int = 1024, with_disk: bool = True) -> src.http.TieredBackend:
+    return src.http.TieredBackend(
+        memory_bytes=memory_bytes,
+        disk_path=str(tmp_path / "http") if with_disk else None,
+        disk_bytes=1024**2,
+        expire_after=URL_TTL,
+        allowed_codes=(200,),
+    )
+
+
+class TestHttpCache:
+    async def test_tiers(self, remote_api, tmp_path):
+        """Test responses are served from memory, then from disk once dropped from memory"""
+        server, calls = remote_api
+        cache = make_backend(tmp_path)
+        metrics = src.http.cache_metrics.to_dict()
+        async with aiohttp_client_cache.CachedSession(cache=cache) as session:
+            for _ in range(3):
+                async with session.get(server.make_url("/maps")) as resp:
+                    assert await resp.read() == b"x" * 100, "Cached response has a different body"
+            assert calls["/maps"] == 1, "Cached response was requested again"
+
+            await cache.responses.memory.clear()
+            async with session.get(server.make_url("/maps")) as resp:
+                await resp.read()
+            assert calls["/maps"] == 1, "Response wasn't read from the disk"
+
+        new_metrics = src.http.cache_metrics.to_dict()
+        assert new_metrics["misses"] == metrics["misses"] + 1, "Cache misses weren't counted"
+        assert new_metrics["memory_hits"] == metrics["memory_hits"] + 2, "Memory hits weren't counted"
+        assert new_metrics["disk_hits"] == metrics["disk_hits"] + 1, "Disk hits weren't counted"
+
+    async def test_private(self, remote_api, tmp_path):
+        """Test responses to requests with an Authorization header aren't shared or saved to disk"""
+        server, calls = remote_api
+        cache = make_backend(tmp_path)
+        cache.include_headers = False
+        async with aiohttp_client_cache.CachedSession(cache=cache) as session:
+            for token in ["Bearer a", "Bearer b", "Bearer a"]:
+                async with session.get(server.make_url("/users"), headers={"Authorization": token}) as resp:
+                    assert (await resp.read()).endswith(token.encode()), "Got another user's response"
+        assert calls["/users"] == 2, "Responses weren't cached per token"
+        assert await cache.responses.disk.size() == 0, "Private responses were saved to disk"
+
+    async def test_eviction(self, remote_api, tmp_path):
+        """Test the memory cache is bounded by size and drops expired responses"""
+        server, calls = remote_api
+        cache = make_backend(tmp_path, memory_bytes=250, with_disk=False)
+        async with aiohttp_client_cache.CachedSession(cache=cache) as session:
+            for path in ["/a", "/b", "/c", "/a"]:
+                async with session.get(server.make_url(path)) as resp:
+                    await resp.read()
+        assert calls["/a"] == 2, "Least recently used response wasn't evicted"
+        assert cache.responses.memory.total_bytes <= 250, "Memory cache is over its size"
+
+        for response in cache.responses.memory.entries.values():
+            response.expires = response.created_at
+        cache.expire_memory()
+        assert len(cache.responses.memory.entries) == 0, "Expired responses weren't dropped"
+
+    async def test_stream_reread(self, remote_api, tmp_path):
+        """Test responses served from memory can be streamed every time"""
+        server, _calls = remote_api
+        cache = make_backend(tmp_path, with_disk=False)
+        async with aiohttp_client_cache.CachedSession(cache=cache) as session:
+            for _ in range(3):
+                async with session.get(server.make_url("/maps")) as resp:
+                    assert await resp.content.read() == b"x" * 100, "Cached response was streamed empty"
+
+    async def test_expired_counted_once(self, remote_api, tmp_path):
+        """Test responses that expire both in memory and on disk are counted once"""
+        server, _calls = remote_api
+        cache = make_backend(tmp_path)
+        async with aiohttp_client_cache.CachedSession(cache=cache) as session:
+            for path in ["/a", "/b"]:
+                async with session.get(server.make_url(path)) as resp:
+                    await resp.read()
+
+        async for key in cache.responses.disk.keys():
+            response = await cache.responses.disk.read(key)
+            response.expires = response.created_at
+            await cache.responses.disk.write(key, response)
+        for response in cache.responses.memory.entries.values():
+            response.expires = response.created_at
+
+        expired = src.http.cache_metrics.expired
+        await cache.delete_expired_responses()
+        assert await cache.responses.disk.size() == 0, "Expired responses weren't deleted from disk"
+        assert src.http.cache_metrics.expired == expired + 2, "Expired responses weren't counted once each"
+
+    async def test_delete_not_counted(self, remote_api, tmp_path):
+        """Test deleting a response doesn't count it as a hit or bring it back into memory"""
+        server, _calls = remote_api
+        cache = make_backend(tmp_path)
+        async with aiohttp_client_cache.CachedSession(cache=cache) as session:
+            async with session.get(server.make_url("/maps")) as resp:
+                await resp.read()
+        await cache.responses.memory.clear()
+
+        metrics = src.http.cache_metrics.to_dict()
+        async for key in cache.responses.disk.keys():
+            await cache.delete(key)
+        new_metrics = src.http.cache_metrics.to_dict()
+        assert new_metrics["disk_hits"] == metrics["disk_hits"], "Deleted response was counted as a hit"
+        assert len(cache.responses.memory.entries) == 0, "Deleted response was brought into memory"
+        assert await cache.responses.disk.size() == 0, "Response wasn't deleted from disk"
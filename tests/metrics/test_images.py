@@ -0,0 +1,58 @@
+import io
+import os
+import http
+import pytest
+import config
+import src.utils.files
+import src.utils.images
+from PIL import Image
+
+
+def make_png(width: int, height: int, color: str) -> bytes:
+    media = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(media, format="png")
+    return media.getvalue()
+
+
+@pytest.mark.post
+class TestImages:
+    async def test_save_image(self, btd6ml_test_client, tmp_path, monkeypatch):
+        """Test images are converted to WebP and resized in the worker processes"""
+        monkeypatch.setattr(src.utils.files, "media_path", str(tmp_path))
+        monkeypatch.setattr(config, "IMAGE_MAX_DIMENSION", 100, raising=False)
+        processed = src.utils.images.metrics.processed
+
+        fname, fpath = await src.utils.files.save_image(make_png(400, 200, "red"), "png")
+        assert fname.endswith(".webp") and os.path.exists(fpath), "Image wasn't saved as WebP"
+        with Image.open(fpath) as image:
+            assert image.format == "WEBP", "Saved image isn't a WebP"
+            assert image.size == (100, 50), "Image wasn't resized to the max dimensions"
+        assert src.utils.images.metrics.processed == processed + 1, "Converted image wasn't counted"
+
+    async def test_skip_existing(self, btd6ml_test_client, tmp_path, monkeypatch):
+        """Test images that were already saved aren't converted again"""
+        monkeypatch.setattr(src.utils.files, "media_path", str(tmp_path))
+        media = make_png(50, 50, "blue")
+        await src.utils.files.save_image(media, "png")
+
+        async def fail_to_webp(_src_path: str, _dst_path: str) -> None:
+            raise AssertionError("Image was converted again")
+        monkeypatch.setattr(src.utils.images, "to_webp", fail_to_webp)
+        skipped = src.utils.images.metrics.skipped
+        await src.utils.files.save_image(media, "png")
+        assert src.utils.images.metrics.skipped == skipped + 1, "Skipped image wasn't counted"
+
+    async def test_image_metrics(self, btd6ml_test_client, tmp_path, monkeypatch):
+        """Test getting the duration of each image processing stage"""
+        monkeypatch.setattr(src.utils.files, "media_path", str(tmp_path))
+        monkeypatch.setattr(config, "METRICS_TOKEN", "metrics_token", raising=False)
+        await src.utils.files.save_image(make_png(80, 80, "green"), "png")
+
+        async with btd6ml_test_client.get("/metrics", headers={"Authorization": "Bearer metrics_token"}) as resp:
+            assert resp.status == http.HTTPStatus.OK, f"Getting metrics returned {resp.status}"
+            resp_data = (await resp.json())["images"]
+            assert resp_data["processed"] > 0 and resp_data["in_progress"] == 0, \
+                "Converted images weren't counted"
+            assert set(resp_data["stages"]) == {"queued", "decode", "resize", "encode"}, \
+                "Image processing stages are missing"
+            assert resp_data["stages"]["encode"]["max_ms"] > 0, "Encoding time wasn't recorded"
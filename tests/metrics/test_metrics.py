@@ -0,0 +1,30 @@
+import http
+import pytest
+import config
+
+
+@pytest.mark.get
+async def test_pool_metrics(btd6ml_test_client, monkeypatch, pause_outbox):
+    """Test getting the connection pool metrics, only with the right token"""
+    monkeypatch.delattr(config, "METRICS_TOKEN", raising=False)
+    async with btd6ml_test_client.get("/metrics", headers={"Authorization": "Bearer metrics_token"}) as resp:
+        assert resp.status == http.HTTPStatus.NOT_FOUND, \
+            f"Getting metrics without setting a token returned {resp.status}"
+
+    monkeypatch.setattr(config, "METRICS_TOKEN", "metrics_token", raising=False)
+    async with btd6ml_test_client.get("/metrics", headers={"Authorization": "Bearer wrong_token"}) as resp:
+        assert resp.status == http.HTTPStatus.UNAUTHORIZED, \
+            f"Getting metrics with the wrong token returned {resp.status}"
+    async with btd6ml_test_client.get("/metrics", headers={"Authorization": "Bearer tökén"}) as resp:
+        assert resp.status == http.HTTPStatus.UNAUTHORIZED, \
+            f"Getting metrics with a non-ASCII token returned {resp.status}"
+
+    async with btd6ml_test_client.get("/config"):
+        pass
+    async with btd6ml_test_client.get("/metrics", headers={"Authorization": "Bearer metrics_token"}) as resp:
+        assert resp.status == http.HTTPStatus.OK, f"Getting metrics returned {resp.status}"
+        resp_data = (await resp.json())["database"]
+        assert resp_data["acquired"] > 0, "No acquired connections were counted"
+        assert resp_data["waiting"] == 0 and resp_data["in_use"] == 0, \
+            "Connections are counted as in use after the requests ended"
+        assert 0 <= resp_data["saturation"] <= 1, "Pool saturation is out of range"
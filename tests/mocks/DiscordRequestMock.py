@@ -67,11 +67,11 @@ class DiscordRequestMock:
             return str(wh_id)
 
     async def patch_webhook(self, _hook_url: str, message_id: int, *args) -> bool:
-        self.wh_events.append({"action": "patch", "msg_id": message_id})
+        self.wh_events.append({"action": "patch", "msg_id": int(message_id)})
         return True
 
     async def delete_webhook(self, _hook_url: str, message_id: int) -> None:
-        self.wh_events.append({"action": "delete", "msg_id": message_id})
+        self.wh_events.append({"action": "delete", "msg_id": int(message_id)})
 
     async def get_user_guilds(self, *args, **kwargs) -> list[dict]:
         return [g.to_dict() for g in self.user_guilds]
@@ -0,0 +1,97 @@
+import time
+import asyncio
+import aiohttp
+import pytest
+import src.requests
+from src.requests import NinjaKiwiClient, NinjaKiwiUnavailable
+from ..mocks.NinjaKiwiMock import NinjaKiwiMock
+
+
+class CountingMock(NinjaKiwiMock):
+    def __init__(self, delay: float = 0, fail: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def get_btd6_map(self, code: str) -> dict | None:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise aiohttp.ClientError("Ninja Kiwi is down")
+        return await super().get_btd6_map(code)
+
+
+class TestNinjaKiwiClient:
+    async def test_coalesce(self):
+        """Test concurrent requests for the same map are sent once"""
+        mock = CountingMock(delay=0.05)
+        client = NinjaKiwiClient(mock)
+        maps = await asyncio.gather(*[client.get_btd6_map("ZFKTGXC") for _ in range(5)])
+        assert all(btd6_map is not None for btd6_map in maps), "Some requests didn't get the map"
+        assert mock.calls == 1, f"Concurrent requests for the same map were sent {mock.calls} times"
+
+        await client.get_btd6_map("ZFKTGXC")
+        assert mock.calls == 1, "Cached map was requested again"
+        await client.get_btd6_map("ABCDEFG")
+        assert mock.calls == 2, "A different map wasn't requested"
+
+    async def test_negative_cache(self):
+        """Test maps that don't exist are cached for less time"""
+        mock = CountingMock(error_on_map=True)
+        client = NinjaKiwiClient(mock)
+        assert await client.get_btd6_map("ZFKTGXC") is None, "Missing map was returned"
+        assert await client.get_btd6_map("ZFKTGXC") is None, "Missing map was returned"
+        assert mock.calls == 1, "Missing map wasn't cached"
+
+        client.maps.negative_ttl = 0
+        await client.get_btd6_map("ABCDEFG")
+        await client.get_btd6_map("ABCDEFG")
+        assert mock.calls == 3, "Missing map wasn't requested again after its TTL"
+
+    async def test_circuit_breaker(self, monkeypatch):
+        """Test requests aren't sent while Ninja Kiwi's API is failing"""
+        monkeypatch.setattr(NinjaKiwiClient, "TIMEOUT", 0.05)
+        mock = CountingMock(delay=1)
+        client = NinjaKiwiClient(mock)
+        with pytest.raises(NinjaKiwiUnavailable):
+            await client.get_btd6_map("ZFKTGXC")
+
+        mock.delay = 0
+        mock.fail = True
+        for i in range(1, NinjaKiwiClient.BREAKER_THRESHOLD):
+            with pytest.raises(NinjaKiwiUnavailable):
+                await client.get_btd6_map(f"CODE{i:03}")
+        assert client.breaker.is_open, "Circuit breaker didn't open"
+
+        calls = mock.calls
+        with pytest.raises(NinjaKiwiUnavailable):
+            await client.get_btd6_map("ZFKTGXC")
+        assert mock.calls == calls, "Request was sent while the circuit breaker was open"
+
+        client.breaker.cooldown = 0
+        mock.fail = False
+        assert await client.get_btd6_map("ZFKTGXC") is not None, "Request after the cooldown failed"
+        assert not client.breaker.is_open, "Circuit breaker didn't close after a successful request"
+
+    async def test_queued_timeout(self, monkeypatch):
+        """Test requests waiting for a free slot don't time out"""
+        monkeypatch.setattr(NinjaKiwiClient, "MAX_CONCURRENT", 1)
+        monkeypatch.setattr(NinjaKiwiClient, "TIMEOUT", 0.1)
+        mock = CountingMock(delay=0.06)
+        client = NinjaKiwiClient(mock)
+        maps = await asyncio.gather(*[client.get_btd6_map(f"CODE{i:03}") for i in range(3)])
+        assert all(btd6_map is not None for btd6_map in maps), "Queued requests timed out"
+
+    async def test_unavailable_deco(self):
+        """Test profiles don't fail if Ninja Kiwi's API is down"""
+        client = NinjaKiwiClient(NinjaKiwiMock())
+        client.breaker.opened_at = time.monotonic()
+        assert await client.get_btd6_user_deco("oak_test") == {"avatarURL": None, "bannerURL": None}, \
+            "Profile decorations aren't empty when Ninja Kiwi is unavailable"
+
+    async def test_set_api(self, monkeypatch):
+        """Test setting the API sends requests through the client"""
+        monkeypatch.setattr(src.requests, "__ninja_kiwi_api", src.requests.ninja_kiwi_api())
+        src.requests.set_ninja_kiwi_api(NinjaKiwiMock())
+        assert isinstance(src.requests.ninja_kiwi_api(), NinjaKiwiClient), "API isn't wrapped in the client"
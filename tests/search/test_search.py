@@ -1,5 +1,7 @@
 import http
 import pytest
+import config
+import src.db.connection
 import src.utils.validators
 
 user_schema = {
@@ -81,3 +83,47 @@ class TestSearch:
             resp_data = await resp.json()
             assert "errors" in resp_data and "q" in resp_data["errors"], \
                 "query not in response.errors when providing a query too short"
+
+    async def test_ranking(self, btd6ml_test_client):
+        """Tests exact matches and prefixes being ranked first"""
+        async with btd6ml_test_client.get("/search?q=maplist%20map%204&type=map&limit=20") as resp:
+            assert resp.status == http.HTTPStatus.OK, \
+                f"Searching returned {resp.status}"
+            names = [res["data"]["name"] for res in await resp.json()]
+            assert names[0] == "Maplist Map 4", "Exact match isn't the first result"
+            prefixed = [name.startswith("Maplist Map 4") for name in names]
+            assert prefixed == sorted(prefixed, reverse=True), "Prefix matches aren't ranked first"
+
+        for query, code in [("MLXXXEE", "MLXXXEE"), ("mlxxxe", "MLXXXEA"), ("ml45", "MLXXXEE")]:
+            async with btd6ml_test_client.get(f"/search?q={query}&type=map") as resp:
+                assert resp.status == http.HTTPStatus.OK, \
+                    f"Searching returned {resp.status}"
+                assert (await resp.json())[0]["data"]["code"] == code, \
+                    f"Searching {query} doesn't return {code} first"
+
+    async def test_in_memory_index(self, btd6ml_test_client, monkeypatch, pause_outbox):
+        """Tests the in-memory map index returning the same results without querying the database"""
+        queries = ["maplist%20map%204", "map%2012", "MLXXXE", "ml45", "mlp", "4"]
+        expected = {}
+        for query in queries:
+            async with btd6ml_test_client.get(f"/search?q={query}&type=map&limit=50") as resp:
+                expected[query] = [res["data"] for res in await resp.json()]
+
+        monkeypatch.setattr(config, "SEARCH_INDEX_IN_MEMORY", True, raising=False)
+        async with btd6ml_test_client.get("/search?q=usr&type=map"):
+            pass
+
+        acquired = src.db.connection.metrics.acquired
+        for query in queries:
+            async with btd6ml_test_client.get(f"/search?q={query}&type=map&limit=50") as resp:
+                assert resp.status == http.HTTPStatus.OK, \
+                    f"Searching in memory returned {resp.status}"
+                results = [res["data"] for res in await resp.json()]
+                assert sorted(results, key=lambda x: x["code"]) == sorted(expected[query], key=lambda x: x["code"]), \
+                    f"Searching {query} in memory returns different maps"
+                assert results[:1] == expected[query][:1], \
+                    f"Searching {query} in memory ranks a different map first"
+        async with btd6ml_test_client.get("/search?q=mlp&type=map,map&limit=50") as resp:
+            results = [res["data"]["code"] for res in await resp.json()]
+            assert len(results) == len(set(results)), "Repeating a type returns duplicate results"
+        assert src.db.connection.metrics.acquired == acquired, "Searching maps in memory queried the database"
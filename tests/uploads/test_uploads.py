@@ -0,0 +1,113 @@
+import io
+import os
+import http
+import json
+import hashlib
+import aiohttp
+import pytest
+import config
+import src.utils.files
+from PIL import Image
+
+MAP_CODE = "MLXXXCC"
+SUBMITTER_ID = 31
+
+
+def make_png(color: str) -> bytes:
+    media = io.BytesIO()
+    Image.new("RGB", (60, 40), color).save(media, format="png")
+    return media.getvalue()
+
+
+@pytest.fixture
+def sign_data(partial_sign, finish_sign):
+    def sign(data_str: str, files: list[bytes]) -> str:
+        contents_hash = partial_sign((MAP_CODE + data_str).encode())
+        for media in files:
+            contents_hash = partial_sign(media, current=contents_hash)
+        return json.dumps({"data": data_str, "signature": finish_sign(contents_hash)})
+    return sign
+
+
+def make_form(data: str, files: list[tuple[str, bytes]], data_first: bool = True) -> aiohttp.FormData:
+    form_data = aiohttp.FormData()
+    if data_first:
+        form_data.add_field("data", data)
+    for name, media in files:
+        form_data.add_field(name, io.BytesIO(media), content_type="image/png")
+    if not data_first:
+        form_data.add_field("data", data)
+    return form_data
+
+
+@pytest.fixture
+def subm_data():
+    return json.dumps({
+        "user": {"id": str(SUBMITTER_ID), "username": f"usr{SUBMITTER_ID}", "avatar_url": "https://image.com"},
+        "format": 1,
+        "notes": None,
+        "black_border": False,
+        "no_geraldo": False,
+        "current_lcc": False,
+        "leftover": None,
+        "video_proof_url": [],
+    })
+
+
+def spooled_files() -> list[str]:
+    return [fname for fname in os.listdir(src.utils.files.media_path) if fname.startswith(".upload-")]
+
+
+@pytest.mark.bot
+@pytest.mark.post
+class TestUploads:
+    async def test_signature_any_order(self, btd6ml_test_client, mock_auth, sign_data, subm_data,
+                                       tmp_path, monkeypatch):
+        """Test files are checked against the signature whether they're sent before or after the data"""
+        monkeypatch.setattr(src.utils.files, "media_path", str(tmp_path))
+        await mock_auth()
+        for data_first, colors in [(True, ["red", "blue"]), (False, ["green", "yellow"])]:
+            images = [make_png(color) for color in colors]
+            files = [(f"proof_completion[{i}]", media) for i, media in enumerate(images)]
+            req_form = make_form(sign_data(subm_data, images), files, data_first)
+            async with btd6ml_test_client.post(f"/maps/{MAP_CODE}/completions/submit/bot", data=req_form) as resp:
+                assert resp.status == http.HTTPStatus.CREATED, \
+                    f"Submitting with the data {'before' if data_first else 'after'} the files returns {resp.status}"
+                async with btd6ml_test_client.get(resp.headers["Location"]) as resp_get:
+                    assert (await resp_get.json())["subm_proof_img"] == [
+                        f"{config.MEDIA_BASE_URL}/{hashlib.sha256(media).hexdigest()}.webp"
+                        for media in images
+                    ], "Proof images aren't named after their contents"
+            assert len(spooled_files()) == 0, "Temporary files were left behind"
+
+        images = [make_png("purple"), make_png("orange")]
+        files = [("proof_completion[1]", images[1]), ("proof_completion[0]", images[0])]
+        req_form = make_form(sign_data(subm_data, images), files)
+        async with btd6ml_test_client.post(f"/maps/{MAP_CODE}/completions/submit/bot", data=req_form) as resp:
+            assert resp.status == http.HTTPStatus.CREATED, \
+                f"Submitting the files out of order returns {resp.status}"
+
+    async def test_invalid_signature(self, btd6ml_test_client, mock_auth, sign_data, subm_data,
+                                     tmp_path, monkeypatch):
+        """Test files sent with an invalid signature aren't saved"""
+        monkeypatch.setattr(src.utils.files, "media_path", str(tmp_path))
+        await mock_auth()
+        media = make_png("black")
+        req_form = make_form(sign_data(subm_data, [media + b"tampered"]), [("proof_completion[0]", media)])
+        async with btd6ml_test_client.post(f"/maps/{MAP_CODE}/completions/submit/bot", data=req_form) as resp:
+            assert resp.status == http.HTTPStatus.FORBIDDEN, \
+                f"Submitting a file that doesn't match the signature returns {resp.status}"
+        assert len(os.listdir(tmp_path)) == 0, "Files with an invalid signature were saved"
+
+    async def test_upload_too_large(self, btd6ml_test_client, mock_auth, sign_data, subm_data,
+                                    tmp_path, monkeypatch):
+        """Test uploading a file over the size limit"""
+        monkeypatch.setattr(src.utils.files, "media_path", str(tmp_path))
+        monkeypatch.setattr(config, "MAX_UPLOAD_SIZE", 64, raising=False)
+        await mock_auth()
+        media = make_png("white")
+        req_form = make_form(sign_data(subm_data, [media]), [("proof_completion[0]", media)])
+        async with btd6ml_test_client.post(f"/maps/{MAP_CODE}/completions/submit/bot", data=req_form) as resp:
+            assert resp.status == http.HTTPStatus.REQUEST_ENTITY_TOO_LARGE, \
+                f"Uploading a file over the size limit returns {resp.status}"
+        assert len(os.listdir(tmp_path)) == 0, "Files over the size limit were saved"
@@ -140,3 +140,29 @@ class TestAuth:
             assert resp_data == expected_maplist_profile, \
                 "Initial empty profile differs from expected"
 
+
+    async def test_api_token(self, btd6ml_test_client, mock_auth):
+        """Test exchanging a Discord token for an API token, and using it without Discord"""
+        USER_ID = 37
+        await mock_auth(user_id=USER_ID)
+        async with btd6ml_test_client.post("/auth/token", headers=HEADERS) as resp:
+            assert resp.status == http.HTTPStatus.OK, \
+                f"Exchanging a Discord token returns {resp.status}"
+            api_token = (await resp.json())["token"]
+
+        await mock_auth(unauthorized=True)
+        async with btd6ml_test_client.post("/auth", headers={"Authorization": f"Bearer {api_token}"}) as resp:
+            assert resp.status == http.HTTPStatus.OK, \
+                f"Logging in with an API token returns {resp.status}"
+            assert (await resp.json())["id"] == str(USER_ID), \
+                "Logged in as a different user than the API token's"
+
+        # The last character might only carry padding bits
+        tampered_token = api_token[:-5] + ("A" if api_token[-5] != "A" else "B") + api_token[-4:]
+        async with btd6ml_test_client.post("/auth", headers={"Authorization": f"Bearer {tampered_token}"}) as resp:
+            assert resp.status == http.HTTPStatus.UNAUTHORIZED, \
+                f"Logging in with a tampered API token returns {resp.status}"
+
+        async with btd6ml_test_client.post("/auth/token", headers={"Authorization": f"Bearer {api_token}"}) as resp:
+            assert resp.status == http.HTTPStatus.UNAUTHORIZED, \
+                f"Exchanging an API token for another returns {resp.status}"
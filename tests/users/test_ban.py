@@ -1,5 +1,7 @@
 import http
 import pytest
+import src.log
+from src.db.queries.users import ban_user, get_user_perms
 from ..mocks import Permissions
 from ..testutils import HEADERS
 
@@ -48,3 +50,29 @@ class TestBans:
                 f"Banning a user without the necessary perms returns {resp_ban.status}"
             assert resp_unban.status == http.HTTPStatus.FORBIDDEN, \
                 f"Unanning a user without the necessary perms returns {resp_unban.status}"
+
+    async def test_banned_loses_perms(self, btd6ml_test_client, mock_auth, mock_discord_api):
+        """Test a banned user can't use their permissions anymore, even if they were just used"""
+        await mock_auth(user_id=10, perms={None: {Permissions.misc.ban_user}})
+        async with btd6ml_test_client.post("/users/20/unban", headers=HEADERS) as resp:
+            assert resp.status == http.HTTPStatus.NO_CONTENT, \
+                f"Successfully unbanning a user returns {resp.status}"
+
+        await mock_auth(user_id=20, perms={None: {Permissions.misc.ban_user}})
+        async with btd6ml_test_client.post("/users/10/ban", headers=HEADERS) as resp:
+            assert resp.status == http.HTTPStatus.NO_CONTENT, \
+                f"Successfully banning a user returns {resp.status}"
+
+        mock_discord_api(user_id=10)
+        async with btd6ml_test_client.post("/users/20/ban", headers=HEADERS) as resp:
+            assert resp.status == http.HTTPStatus.FORBIDDEN, \
+                f"Banning a user right after being banned returns {resp.status}"
+
+    async def test_perms_loaded_during_ban(self, btd6ml_test_client, mock_auth):
+        """Test permissions loaded while a ban is being committed aren't kept"""
+        await mock_auth(user_id=30, perms={None: {Permissions.misc.ban_user}})
+        async with src.log.logged_edit("user", "put", 30, {"is_banned": True}, 1) as conn:
+            await ban_user(30, conn=conn)
+            assert (await get_user_perms(30)).has_any_perms(), "Ban was visible before being committed"
+        assert not (await get_user_perms(30)).has_any_perms(), \
+            "Permissions loaded before the ban was committed were kept"
@@ -0,0 +1,104 @@
+import asyncio
+from src.utils.cache import cache_for
+
+
+class Counter:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, key: str, conn=None) -> tuple[str, int]:
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay)
+        return key, call
+
+
+class TestCacheFor:
+    async def test_ttl(self):
+        """Test values are reloaded after they expire"""
+        counter = Counter()
+        cached = cache_for(0.05)(counter)
+        assert await cached("a") == ("a", 1)
+        assert await cached("a") == ("a", 1), "Value wasn't cached"
+        await asyncio.sleep(0.06)
+        assert await cached("a") == ("a", 2), "Expired value was returned"
+
+    async def test_lru(self):
+        """Test the least recently used value is evicted"""
+        counter = Counter()
+        cached = cache_for(60, maxsize=2)(counter)
+        await cached("a")
+        await cached("b")
+        await cached("a")
+        await cached("c")
+        assert counter.calls == 3
+        await cached("a")
+        assert counter.calls == 3, "Recently used value was evicted"
+        await cached("b")
+        assert counter.calls == 4, "Least recently used value wasn't evicted"
+
+    async def test_single_flight(self):
+        """Test concurrent calls with the same arguments share a single call"""
+        counter = Counter(delay=0.05)
+        cached = cache_for(60)(counter)
+        results = await asyncio.gather(*[cached("a") for _ in range(5)], cached("b"))
+        assert results == [("a", 1)] * 5 + [("b", 2)], "Concurrent calls got different values"
+        assert counter.calls == 2, f"Concurrent calls were run {counter.calls} times"
+
+    async def test_cancel_waiter(self):
+        """Test a call being cancelled doesn't cancel the others waiting on it"""
+        counter = Counter(delay=0.05)
+        cached = cache_for(60)(counter)
+        first = asyncio.create_task(cached("a"))
+        second = asyncio.create_task(cached("a"))
+        await asyncio.sleep(0.01)
+        second.cancel()
+        assert await first == ("a", 1)
+        assert second.cancelled()
+
+    async def test_ignore(self):
+        """Test ignored arguments aren't part of the key"""
+        counter = Counter()
+        cached = cache_for(60)(counter)
+        await cached("a", conn=object())
+        await cached("a", conn=object())
+        assert counter.calls == 1, "Connection was used as part of the key"
+
+        counter = Counter()
+        cached = cache_for(60, ignore=())(counter)
+        await cached("a", conn=1)
+        await cached("a", conn=2)
+        assert counter.calls == 2, "Argument that isn't ignored wasn't part of the key"
+
+    async def test_invalidate(self):
+        """Test invalidating a key only reloads that key"""
+        counter = Counter()
+        cached = cache_for(60)(counter)
+        await cached("a")
+        await cached("b")
+        cached.invalidate("a")
+        assert await cached("a") == ("a", 3), "Invalidated value was returned"
+        assert await cached("b") == ("b", 2), "Value that wasn't invalidated was reloaded"
+
+    async def test_invalidate_inflight(self):
+        """Test a value being loaded while it's invalidated isn't cached"""
+        counter = Counter(delay=0.05)
+        cached = cache_for(60)(counter)
+        loading = asyncio.create_task(cached("a"))
+        await asyncio.sleep(0.01)
+        cached.invalidate("a")
+        assert await loading == ("a", 1)
+        counter.delay = 0
+        assert await cached("a") == ("a", 2), "Value loaded before invalidating was cached"
+
+    async def test_clear(self):
+        """Test clearing reloads every key"""
+        counter = Counter()
+        cached = cache_for(60)(counter)
+        await cached("a")
+        await cached("b")
+        cached.clear()
+        await cached("a")
+        await cached("b")
+        assert counter.calls == 4, "Values were returned after clearing the cache"
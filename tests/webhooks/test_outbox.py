@@ -0,0 +1,131 @@
+import asyncio
+import aiohttp
+import async_timeout
+import pytest
+import src.webhooks
+import src.db.connection
+from src.db.queries.webhooks import claim_due_webhooks, release_outbox_webhooks
+from src.requests import WebhookRateLimited
+
+HOOK_URL = "https://discord.com/api/webhooks/1/test"
+
+
+@src.db.connection.postgres
+async def get_outbox(conn=None) -> list:
+    return await conn.fetch("SELECT * FROM webhook_outbox ORDER BY id")
+
+
+@src.db.connection.postgres
+async def clear_outbox(conn=None) -> None:
+    await conn.execute("DELETE FROM webhook_outbox")
+
+
+@src.db.connection.postgres
+async def get_submission_wh(submission_id: int, conn=None):
+    return await conn.fetchrow("SELECT wh_msg_id, wh_data FROM map_submissions WHERE id = $1", submission_id)
+
+
+async def wait_for_empty_outbox(timeout: float = 3) -> None:
+    async with async_timeout.timeout(timeout):
+        while len(await get_outbox()):
+            await asyncio.sleep(0.05)
+
+
+@pytest.mark.submissions
+class TestOutbox:
+    async def test_delivery(self, btd6ml_test_client, mock_discord_api):
+        """Test queued messages are sent in order, and their result is saved"""
+        mocker = mock_discord_api()
+        payload = {"embeds": [{"title": "Test"}]}
+        await src.webhooks.enqueue([
+            (HOOK_URL, "post", None, payload, "map_submission", 1),
+            (HOOK_URL, "patch", "1000", payload, None, None),
+            (HOOK_URL, "delete", "1001", None, None, None),
+        ])
+        await wait_for_empty_outbox()
+
+        assert [ev["action"] for ev in mocker.wh_events] == ["post", "patch", "delete"], \
+            "Messages were not sent in order"
+        submission = await get_submission_wh(1)
+        assert submission["wh_msg_id"] == mocker.wh_events[0]["msg_id"], \
+            "Message ID was not saved on the submission"
+
+    async def test_rate_limited(self, btd6ml_test_client, mock_discord_api):
+        """Test rate limited messages are retried after the reset, before newer ones"""
+        mocker = mock_discord_api()
+        execute_webhook = mocker.execute_webhook
+        calls = []
+
+        async def rate_limited_once(*args, **kwargs):
+            calls.append(args[1]["content"])
+            if len(calls) == 1:
+                raise WebhookRateLimited(0.3)
+            return await execute_webhook(*args, **kwargs)
+        mocker.execute_webhook = rate_limited_once
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await src.webhooks.enqueue([
+            (HOOK_URL, "post", None, {"content": "first"}, None, None),
+            (HOOK_URL, "post", None, {"content": "second"}, None, None),
+        ])
+        await wait_for_empty_outbox()
+
+        assert calls == ["first", "first", "second"], "Rate limited messages were not retried in order"
+        assert loop.time() - started >= 0.3, "Rate limited message was retried before the reset"
+
+    async def test_retry_backoff(self, btd6ml_test_client, mock_discord_api, monkeypatch):
+        """Test failed messages are retried later, and dropped after too many attempts"""
+        monkeypatch.setattr(src.webhooks, "BACKOFF_BASE", 0.1)
+        monkeypatch.setattr(src.webhooks, "MAX_ATTEMPTS", 3)
+        mocker = mock_discord_api()
+        attempts = []
+
+        async def failing(*_args, **_kwargs):
+            attempts.append(asyncio.get_running_loop().time())
+            raise aiohttp.ClientConnectionError()
+        mocker.patch_webhook = failing
+
+        await src.webhooks.enqueue([(HOOK_URL, "patch", "1000", {"content": "test"}, None, None)])
+        await wait_for_empty_outbox()
+        assert len(attempts) == 3, "Failed message wasn't retried until the max attempts"
+        assert attempts[2] - attempts[1] > attempts[1] - attempts[0], "Retries don't back off"
+
+    async def test_edit_before_posted(self, btd6ml_test_client, mock_discord_api, monkeypatch):
+        """Test edits queued before their message is posted are sent once it is"""
+        monkeypatch.setattr(src.webhooks, "BACKOFF_BASE", 0.1)
+        mocker = mock_discord_api()
+        execute_webhook = mocker.execute_webhook
+
+        async def slow_post(*args, **kwargs):
+            await asyncio.sleep(0.3)
+            return await execute_webhook(*args, **kwargs)
+        mocker.execute_webhook = slow_post
+
+        payload = {"embeds": [{"title": "Test"}]}
+        await src.webhooks.enqueue([
+            (HOOK_URL, "post", None, payload, "map_submission", 2),
+            (f"{HOOK_URL}/other", "patch", None, payload, "map_submission", 2),
+        ])
+        await wait_for_empty_outbox()
+
+        assert [ev["action"] for ev in mocker.wh_events] == ["post", "patch"], \
+            "Edit wasn't sent after its message was posted"
+        assert mocker.wh_events[0]["msg_id"] == mocker.wh_events[1]["msg_id"], \
+            "Edit wasn't sent to the posted message"
+
+    async def test_claimed(self, btd6ml_test_client, pause_outbox):
+        """Test messages being sent aren't sent by someone else"""
+        await src.webhooks.enqueue([
+            (HOOK_URL, "post", None, {"content": "first"}, None, None),
+            (HOOK_URL, "post", None, {"content": "second"}, None, None),
+        ])
+        claimed = await claim_due_webhooks(1, 60)
+        assert [msg["payload"]["content"] for msg in claimed] == ["first"]
+        assert await claim_due_webhooks(10, 60) == [], \
+            "Claimed message, or one queued after it, was claimed again"
+
+        await release_outbox_webhooks([msg["id"] for msg in claimed])
+        assert [msg["payload"]["content"] for msg in await claim_due_webhooks(10, 60)] == ["first", "second"], \
+            "Released message wasn't claimed again"
+        await clear_outbox()